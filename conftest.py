@@ -0,0 +1,28 @@
+"""pytest setup: the code lives in src/ and imports its modules top-level (run
+from src/ as ``python play.py``), so put src/ on the path. config.py is each
+user's own, untracked file; without one the tests get quiet defaults."""
+
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+try:
+    import config  # noqa: F401
+except ImportError:
+    sys.modules["config"] = types.SimpleNamespace(
+        VERBOSE=False,
+        AIS_PLAY=True,
+        SEED=0,
+        N_GAMES=100,
+        ALGOS=["dp", "simple", "random"],
+        HAND_AVAILABLE=[1, 4, 2, 3, 5, 1],
+        HAND_KEPT=[],
+        HAND_ACCUMULATED=0,
+        TD_INTERP="td_small",
+    )
+
+import log  # noqa: E402
+
+log.VERBOSE = False  # whatever config.py says, the tests run silent
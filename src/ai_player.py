@@ -4,20 +4,29 @@ its configured algorithm."""
 from __future__ import annotations
 
 import random
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
+import numpy as np
+
 from algorithms.dp import action_value as dp_action_value
+from algorithms.game_value import action_value as game_action_value
 from algorithms.heuristic import MoveEvaluator
-from algorithms.nn import NN_ALGORITHMS, nn_action_score
-from algorithms.td import TD_ALGORITHMS, td_action_score
+from algorithms.nn import NN_ALGORITHMS, nn_action_scores
+from algorithms.td import TD_ALGORITHMS, td_action_scores
 from game.game import Player
 from game.rules import Action
+from game_state import StateExtractor
 
 if TYPE_CHECKING:
     from game_state import GameState
 
 _HEURISTIC = MoveEvaluator()
 
+# Algorithms whose value of an action depends only on the afterstate it leads to,
+# so actions sharing one (see StateExtractor.afterstate_key) are valued once.
+_AFTERSTATE_ALGORITHMS = {"dp", "game_dp"}
+
 
 class AIPlayer(Player):
     """A player whose decisions come from one of the algorithms in src/algorithms."""
@@ -35,15 +44,50 @@ class AIPlayer(Player):
             raise ValueError("No valid actions available for the current state.")
         if self.ai_type == "random":
             return random.choice(actions)
-        return max(actions, key=lambda action: self._action_value(state, action))
+        return actions[int(np.argmax(self._action_values(state, actions)))]
+
+    def _action_values(self, state: GameState, actions: list[Action]):
+        """Every action's value; the learned models score them in one batch, the
+        lookahead searches all of them together, rollouts play them all out in
+        one simulation batch."""
+        if self.ai_type in TD_ALGORITHMS:
+            return td_action_scores(state, actions, self.ai_type)
+        if self.ai_type in NN_ALGORITHMS:
+            return nn_action_scores(state, actions)
+        if self.ai_type in _AFTERSTATE_ALGORITHMS:
+            seen: dict[tuple, float] = {}
+            values = []
+            keys = StateExtractor.afterstate_keys(state, actions)
+            for action, key in zip(actions, keys):
+                if key not in seen:
+                    seen[key] = self._action_value(state, action)
+                values.append(seen[key])
+            return values
+        if self.ai_type == "simple":
+            return [self._action_value(state, action) for action in actions]
+        return _search_values(self.ai_type)(state, actions, self.ai_type)
 
     def _action_value(self, state: GameState, action: Action) -> float:
         if self.ai_type == "simple":
             return _HEURISTIC.evaluate_action(state, action)
         if self.ai_type == "dp":
             return dp_action_value(state, action)
-        if self.ai_type in TD_ALGORITHMS:
-            return td_action_score(state, action, self.ai_type)
-        if self.ai_type in NN_ALGORITHMS:
-            return nn_action_score(state, action)
+        if self.ai_type == "game_dp":
+            return game_action_value(state, action)
         raise ValueError(f"Unknown AI type: {self.ai_type}")
+
+
+@lru_cache(maxsize=None)
+def _search_values(ai_type: str):
+    """The action-value function of a search player, lookahead or rollouts. Their
+    modules are imported here, on first use, so games without them (a tournament
+    of other algorithms, say) never load them."""
+    from algorithms.rollout import ROLLOUT_ALGORITHMS, rollout_action_values
+
+    if ai_type in ROLLOUT_ALGORITHMS:
+        return rollout_action_values
+    from algorithms.expectimax import LOOKAHEAD_ALGORITHMS, lookahead_action_values
+
+    if ai_type in LOOKAHEAD_ALGORITHMS:
+        return lookahead_action_values
+    raise ValueError(f"Unknown AI type: {ai_type}")
@@ -6,8 +6,9 @@ not a minimax). We compute the expected final turn score under optimal play.
 
 State = (kept_config, prev):
   - ``kept_config``: the groups of dice kept in the *current* set, exactly as the
-    game stores them. Carrying the full configuration (not just its score) is what
-    lets the DP value the specials correctly:
+    game stores them (packed into an int, see game.rules). Carrying the full
+    configuration (not just its score) is what lets the DP value the specials
+    correctly:
       * extending a kept triplet -- a 4th of a kind doubles the group (via merge_kept
         + score_groups), an 8th... etc.;
       * completing a Talheim (three pairs, 500 / 1000 consecutive) -- which ends the turn;
@@ -23,38 +24,97 @@ means a bust branch returns 0 (you lose prev + current set), and
     continue = V(kept_config, prev)   # already accounts for busting it all away
 
 so max(stop, continue) trades off correctly.
+
+The state graph is a DAG ordered by total-at-risk, so ``precompute`` solves it
+bottom-up rather than by recursion: prev levels from the top down, and within a
+level, configurations from most dice kept to fewest. Each such step is a handful
+of NumPy gathers and reductions over precomputed transition arrays (see
+_Transitions), vectorized over a whole block of prev levels at once.
 """
 
-import pickle
+import mmap
+import os
+import struct
+import zlib
 from collections import Counter
 from functools import lru_cache
-from itertools import combinations_with_replacement
+from itertools import combinations_with_replacement, product
 from math import factorial
 from pathlib import Path
 
+import numpy as np
+
+import game.rules
 from game.rules import (
+    LOOSE_SHIFT,
     NUM_DICE,
     STOP_MIN,
-    flatten,
-    merge_kept,
-    score_groups,
-    talheim_score,
-    valid_keeps,
+    keep_options,
+    kept_dice,
+    merge_packed,
+    pack,
+    pack_groups,
+    score_packed,
+    talheim_score_packed,
+    unpack,
 )
 
 T_MAX = 4000  # at/above this we assume optimal play banks (keeps the DAG finite)
+PREV_STEP = 50  # every score is a multiple of 50, so prev lives on this grid
+
+
+def _kept_configs() -> tuple[int, ...]:
+    """Every kept configuration of fewer than six dice the rules can produce, as
+    packed codes, fewest dice first: triplet-or-larger groups plus loose 1s/5s
+    (other loose dice only appear in a completed six-dice Talheim/Strasse)."""
+    configs = []
+    for sizes in product((0, 3, 4, 5), repeat=6):
+        for ones, fives in product(range(6), repeat=2):
+            if sum(sizes) + ones + fives >= NUM_DICE:
+                continue
+            triplets = pack(face for face, size in enumerate(sizes, 1) for _ in range(size))
+            loose = pack([1] * ones + [5] * fives)
+            configs.append(triplets | loose << LOOSE_SHIFT)
+    return tuple(sorted(configs, key=lambda config: (kept_dice(config) % 7, config)))
+
+
+# --- the value table -------------------------------------------------------- #
+# V(kept_config, prev) for every in-table state, as one dense float array: rows are
+# the kept configurations above (indexed densely), columns prev / PREV_STEP for
+# prev < T_MAX. States off the grid (a prev that isn't a multiple of 50, a
+# configuration the rules can't reach) are still valued, just computed on demand
+# instead of stored. NaN until precompute/load_cache fills it.
+_CONFIGS = _kept_configs()
+_CONFIG_INDEX = {config: i for i, config in enumerate(_CONFIGS)}
+N_PREV = T_MAX // PREV_STEP
+_VALUES = np.full((len(_CONFIGS), N_PREV), np.nan)
+_CONFIG_SCORES = np.array([score_packed(config) for config in _CONFIGS], dtype=np.int64)
+_OFF_TABLE: dict[tuple[int, int], float] = {}
 
 # --- persisted value cache -------------------------------------------------- #
-# Building the table takes a few seconds, so we pickle it and start warm next run.
-# The header records everything the values depend on; a mismatch (rules or params
-# changed) means the file is ignored and rebuilt rather than silently trusted.
-_CACHE: dict[tuple, float] = {}
-_CACHE_PATH = Path(__file__).with_name("turn_value_cache.pkl")
+# Building the table takes a few seconds, so we save it and start warm next run.
+# The file is a fixed header followed by the raw config and value arrays, and is
+# mapped into memory rather than read: every process using the table (simulation
+# workers, training, hand_eval) shares one page-cache copy, and loading is
+# instant. The header records everything the values depend on -- including a
+# checksum of the rules module -- and a mismatch means the file is ignored and
+# rebuilt rather than silently trusted.
+_CACHE_PATH = Path(__file__).with_name("turn_value_cache.bin")
+_CACHE_MAGIC = b"LSDP"
+_CACHE_VERSION = 2
+# magic, version, NUM_DICE, STOP_MIN, T_MAX, rules checksum, table shape (3 dims)
+_CACHE_HEADER = struct.Struct("<4s8I4x")  # padded to keep the arrays 8-aligned
 _ready = False
 
 
 def _header() -> tuple:
-    return (NUM_DICE, STOP_MIN, T_MAX)
+    return (NUM_DICE, STOP_MIN, T_MAX, _rules_checksum())
+
+
+@lru_cache(maxsize=None)
+def _rules_checksum() -> int:
+    """CRC32 of the rules source: any edit to the rules invalidates the cache."""
+    return zlib.crc32(Path(game.rules.__file__).read_bytes())
 
 
 @lru_cache(maxsize=None)
@@ -71,128 +131,453 @@ def _roll_distribution(n: int) -> tuple[tuple[tuple[int, ...], float], ...]:
 
 
 @lru_cache(maxsize=None)
-def _legal_keeps(
-    roll: tuple[int, ...], kept_values: tuple[int, ...]
-) -> tuple[tuple[int, ...], ...]:
-    """Legal keeps of `roll` (as value-tuples) given the already-kept values.
+def _legal_keeps(roll: tuple[int, ...], kept: int) -> tuple[int, ...]:
+    """Legal keeps of `roll` (as multiset codes) given the already-kept dice (a
+    multiset code).
 
-    Reuses the game's own enumeration so the DP can never disagree with the rules.
+    Reads the game's own action table so the DP can never disagree with the rules.
     Depends only on the kept *values* (not their grouping), so it caches broadly.
     Empty iff the roll busts.
     """
-    combos = valid_keeps(list(roll), list(kept_values))
-    return tuple(tuple(combo) for combo in combos)
+    return tuple(pack(keep) for keep in keep_options(roll, unpack(kept)))
 
 
-def _canon(kept_groups) -> tuple[tuple[int, ...], ...]:
-    """Order-independent, hashable key for a kept configuration."""
-    return tuple(sorted(tuple(sorted(group)) for group in kept_groups))
-
-
-def continue_value(kept_key: tuple[tuple[int, ...], ...], prev: int) -> float:
-    """Expected final turn score from rolling on with config `kept_key` and `prev` banked."""
-    total = prev + score_groups([list(group) for group in kept_key])
+def continue_value(config: int, prev: int) -> float:
+    """Expected final turn score from rolling on with `config` kept and `prev` banked."""
+    total = prev + score_packed(config)
     if total >= T_MAX:
         # Boundary: with this much at stake optimal play banks. Returning the total
         # (instead of recursing) keeps the state space finite; such states are reached
         # with negligible probability, so the effect is tiny.
         return float(total)
-    return _value(kept_key, prev)
+    return _value(config, prev)
 
 
-def _value(kept_key: tuple[tuple[int, ...], ...], prev: int) -> float:
+def _value(config: int, prev: int) -> float:
     """Expected final turn score: about to roll the remaining dice from this state.
 
-    Memoized in the module-level _CACHE dict (which is what we pickle). The state
-    graph is a DAG ordered by total-at-risk, so there are no cycles and storing the
-    result after computing it is safe.
+    A table lookup for every state the table holds. The rest (a prev off the 50
+    grid, a configuration the rules can't reach, e.g. a hand typed into
+    hand_eval) is expanded one roll deep on demand and memoized in _OFF_TABLE.
     """
-    memo_key = (kept_key, prev)
-    cached = _CACHE.get(memo_key)
+    row = _CONFIG_INDEX.get(config)
+    col, off_grid = divmod(prev, PREV_STEP)
+    if row is not None and not off_grid:
+        return float(_VALUES[row, col])
+
+    memo_key = (config, prev)
+    cached = _OFF_TABLE.get(memo_key)
     if cached is not None:
         return cached
 
-    kept_groups = [list(group) for group in kept_key]
-    kept_values = tuple(sorted(flatten(kept_groups)))
-    n = NUM_DICE - len(kept_values)
+    kept = kept_dice(config)
+    n = NUM_DICE - kept % 7
 
     ev = 0.0
     for roll, prob in _roll_distribution(n):
-        keeps = _legal_keeps(roll, kept_values)
+        keeps = _legal_keeps(roll, kept)
         if not keeps:
             best = 0.0  # bust -> lose everything at risk
         else:
-            best = max(_keep_value(kept_groups, prev, keep) for keep in keeps)
+            best = max(_keep_value(config, prev, keep) for keep in keeps)
         ev += prob * best
 
-    _CACHE[memo_key] = ev
+    _OFF_TABLE[memo_key] = ev
     return ev
 
 
-def _keep_value(kept_groups, prev: int, keep: tuple[int, ...]) -> float:
-    """Value of keeping `keep`, then playing on optimally."""
-    new_kept = merge_kept(kept_groups, keep)
-    values = flatten(new_kept)
-    total = prev + score_groups(new_kept)
+def _keep_value(config: int, prev: int, keep: int) -> float:
+    """Value of keeping `keep` (a multiset code), then playing on optimally."""
+    new_config = merge_packed(config, keep)
+    dice = kept_dice(new_config)
+    total = prev + score_packed(new_config)
 
     # Talheim ends the turn on the spot (banked, no choice to continue).
-    if talheim_score(values) > 0:
+    if talheim_score_packed(dice) > 0:
         return float(total)
 
-    if len(values) == NUM_DICE:
+    if dice % 7 == NUM_DICE:
         # Hot dice (includes a Lange Strasse): all six kept -> roll a fresh six.
-        return continue_value((), total)
+        return continue_value(0, total)
 
     set_score = total - prev
     stop_value = float(total) if set_score >= STOP_MIN else float("-inf")
-    return max(stop_value, continue_value(_canon(new_kept), prev))
+    return max(stop_value, continue_value(new_config, prev))
 
 
 def action_value(state, action) -> float:
     """DP value of taking `action` in `state` (higher is better).
 
-    ``state`` is a GameState, ``action`` an Action. Uses merge_kept so keeping a die
-    that extends an existing triplet is scored as the doubled group, matching the game.
+    ``state`` is a GameState, ``action`` an Action. Uses merge_packed so keeping a
+    die that extends an existing triplet is scored as the doubled group, matching
+    the game.
     """
     ensure_ready()
-    new_kept = merge_kept(state.kept_groups, action.dice_to_keep)
-    values = flatten(new_kept)
-    prev = state.turn_accumulated_score
-    total = prev + score_groups(new_kept)
+    config, points = _action_outcome(state, action)
+    if config is None:
+        return float(points)
+    return continue_value(config, points)
+
+
+def packed_action_value(config: int, prev: int, keep: int, stop: bool) -> float:
+    """``action_value`` on packed codes: keeping ``keep`` (and stopping, if
+    ``stop``) with ``config`` kept and ``prev`` banked. Call ``ensure_ready``
+    first."""
+    config, points = _packed_outcome(config, prev, keep, stop)
+    if config is None:
+        return float(points)
+    return continue_value(config, points)
+
+
+def _action_outcome(state, action) -> tuple[int | None, int]:
+    """Where taking `action` in `state` leaves the turn: ``(config, prev)`` to roll
+    on from, or ``(None, total)`` if it ends the turn with `total` banked."""
+    config, prev = pack_groups(state.kept_groups), state.turn_accumulated_score
+    return _packed_outcome(config, prev, pack(action.dice_to_keep), action.stop_after)
+
+
+def _packed_outcome(config, prev, keep, stop) -> tuple[int | None, int]:
+    new_config = merge_packed(config, keep)
+    dice = kept_dice(new_config)
+    total = prev + score_packed(new_config)
 
     # Stopping banks the total; a Talheim also ends the turn at the total.
-    if action.stop_after or talheim_score(values) > 0:
-        return float(total)
+    if stop or talheim_score_packed(dice) > 0:
+        return None, total
 
-    if len(values) == NUM_DICE:
-        return continue_value((), total)  # hot dice / Lange Strasse
-    return continue_value(_canon(new_kept), prev)
+    if dice % 7 == NUM_DICE:
+        return 0, total  # hot dice / Lange Strasse: a fresh six
+    return new_config, prev
+
+
+# --- the bottom-up solver -------------------------------------------------- #
+class _Transitions:
+    """Every (configuration, roll, legal keep) transition, flattened into arrays.
+
+    One entry per legal keep. Entries are grouped into *segments* -- one per
+    non-busting (configuration, roll) pair, where the best keep is chosen -- and
+    segments are grouped by configuration, where the rolls are averaged. Each
+    configuration level (dice kept) is one contiguous slice of rows and entries.
+    Built once; it depends on the rules only, never on the values.
+    """
+
+    def __init__(self):
+        gain, next_row, hot, can_stop, terminal = [], [], [], [], []
+        seg_start, seg_prob, row_start, bust_prob = [], [], [], []
+        self.levels = []  # (first row, end row, first entry, end entry) per level
+        for level in range(NUM_DICE):
+            rows = [i for i, c in enumerate(_CONFIGS) if kept_dice(c) % 7 == level]
+            first_entry = len(gain)
+            for row in rows:
+                config = _CONFIGS[row]
+                kept = kept_dice(config)
+                row_start.append(len(seg_start))
+                bust_prob.append(0.0)
+                for roll, prob in _roll_distribution(NUM_DICE - level):
+                    keeps = _legal_keeps(roll, kept)
+                    if not keeps:
+                        bust_prob[-1] += prob  # no choice to make: see _solve_columns
+                        continue
+                    seg_start.append(len(gain))
+                    seg_prob.append(prob)
+                    for keep in keeps:
+                        new_config = merge_packed(config, keep)
+                        dice = kept_dice(new_config)
+                        points = score_packed(new_config)
+                        talheim = talheim_score_packed(dice) > 0
+                        is_hot = not talheim and dice % 7 == NUM_DICE
+                        gain.append(points)
+                        hot.append(is_hot)
+                        terminal.append(talheim)
+                        can_stop.append(talheim or (not is_hot and points >= STOP_MIN))
+                        # Where rolling on leads: the fresh six, or the new set.
+                        rolls_fresh = is_hot or talheim
+                        next_row.append(0 if rolls_fresh else _CONFIG_INDEX[new_config])
+            self.levels.append((rows[0], rows[-1] + 1, first_entry, len(gain)))
+
+        self.gain = np.array(gain, dtype=np.int64)
+        self.hot = np.array(hot)
+        self.terminal = np.array(terminal)
+        self.can_stop = np.array(can_stop)
+        self.next_row = np.array(next_row, dtype=np.int64)
+        self.seg_start = np.array(seg_start, dtype=np.int64)
+        self.seg_prob = np.array(seg_prob)
+        self.row_start = np.array([*row_start, len(seg_start)], dtype=np.int64)
+        self.bust_prob = np.array(bust_prob)
+        # A Talheim can't roll on: point it at an all -inf row of the work table.
+        self.next_row[self.terminal] = len(_CONFIGS)
+        # Hot dice jump to a higher prev column by the set's score.
+        self.col_shift = np.where(self.hot, self.gain // PREV_STEP, 0)
+        # The smallest jump bounds how many prev levels are mutually independent.
+        self.block = int(self.col_shift[self.hot].min())
+
+
+def _solve_columns(
+    trans: _Transitions,
+    work: np.ndarray,
+    cols: np.ndarray,
+    payoff=None,
+    bust: np.ndarray | None = None,
+    follow: np.ndarray | None = None,
+) -> np.ndarray:
+    """Values for every configuration at a block of prev columns whose hot-dice
+    successors (at least ``trans.block`` columns up) are already in ``work``.
+
+    ``payoff`` maps banked turn totals to a trailing axis of objectives -- by
+    default the total itself (expected score); other solvers (see
+    algorithms.reach) plug in their own. A bust pays ``bust[config]`` (default 0
+    for every objective). Each objective is maximized on its own, unless
+    ``follow`` -- the finished work table of the expected-score solve -- is given:
+    then every keep/stop choice is the expected-score one, and the objectives are
+    just evaluated under that policy.
+
+    ``work`` holds *continue* values (the T_MAX boundary applied) on an extended
+    prev grid, plus a trailing -inf row; each level's result is written back into
+    it as the sweep goes, since the next level down reads it.
+    """
+    payoff = payoff or _banked_total
+    prev = cols * PREV_STEP
+    values = np.empty((len(_CONFIGS), len(cols), work.shape[2]))
+    for first_row, end_row, first_entry, end_entry in reversed(trans.levels):
+        entries = slice(first_entry, end_entry)
+        total = prev[None, :] + trans.gain[entries, None]
+        can_stop = trans.can_stop[entries, None]
+        next_cell = (
+            trans.next_row[entries, None],
+            cols[None, :] + trans.col_shift[entries, None],
+        )
+        segments = slice(trans.row_start[first_row], trans.row_start[end_row])
+        seg_start = trans.seg_start[segments] - first_entry
+
+        if follow is None:
+            stop = np.where(can_stop[..., None], payoff(total), -np.inf)
+            best_keep = np.maximum(stop, work[next_cell])
+            best = np.maximum.reduceat(best_keep, seg_start, axis=0)
+        else:
+            best = _policy_choice(
+                total, can_stop, work, follow, next_cell, seg_start, payoff
+            )
+
+        weighted = best * trans.seg_prob[segments, None, None]
+        row_start = trans.row_start[first_row:end_row] - trans.row_start[first_row]
+
+        rows = slice(first_row, end_row)
+        values[rows] = np.add.reduceat(weighted, row_start, axis=0)
+        if bust is not None:
+            values[rows] += trans.bust_prob[rows, None, None] * bust[rows, None, :]
+        work[rows, cols] = _continue_values(
+            values[rows], _CONFIG_SCORES[rows], prev, payoff
+        )
+    return values
+
+
+def _policy_choice(total, can_stop, work, follow, next_cell, seg_start, payoff):
+    """Per segment (and column), the objectives of the expected-score-optimal keep.
+
+    Scores every keep by expected score -- stop or roll on, whichever is worth
+    more -- takes the first best keep of each segment (ties go to the first, as
+    in AIPlayer), and reads that keep's objectives: its banked payoff if it
+    stops, else the work table where it rolls on to.
+    """
+    ev_stop = np.where(can_stop, total, -np.inf)
+    ev_roll = follow[next_cell][..., 0]
+    ev_keep = np.maximum(ev_stop, ev_roll)
+    ev_best = np.maximum.reduceat(ev_keep, seg_start, axis=0)
+
+    n_entries, n_cols = ev_keep.shape
+    seg_len = np.diff(np.append(seg_start, n_entries))
+    is_best = ev_keep == np.repeat(ev_best, seg_len, axis=0)
+    index = np.where(is_best, np.arange(n_entries)[:, None], n_entries)
+    chosen = np.minimum.reduceat(index, seg_start, axis=0)  # (segments, columns)
+
+    col = np.arange(n_cols)[None, :]
+    stops = ev_stop[chosen, col] >= ev_roll[chosen, col]
+    banked = payoff(total[chosen, col])
+    rolled = work[next_cell[0][chosen, 0], next_cell[1][chosen, col]]
+    return np.where(stops[..., None], banked, rolled)
+
+
+def _banked_total(totals: np.ndarray) -> np.ndarray:
+    """The expected-score payoff: the banked total itself, as one objective."""
+    return totals[..., None].astype(np.float64)
+
+
+def _continue_values(
+    values: np.ndarray, scores: np.ndarray, prev: np.ndarray, payoff=None
+) -> np.ndarray:
+    """``continue_value`` over a block: the total is banked at/above T_MAX."""
+    totals = prev[None, :] + scores[:, None]
+    return np.where((totals >= T_MAX)[..., None], (payoff or _banked_total)(totals), values)
+
+
+def _work_table(trans: _Transitions, payoff=None) -> np.ndarray:
+    """Continue-value table for the solver: the in-grid columns to be filled, then
+    enough boundary columns (prev >= T_MAX, where the total is banked) for the
+    largest hot-dice jump, then a trailing -inf row for Talheims."""
+    cols = N_PREV + int(trans.col_shift.max()) + 1
+    prev = np.arange(cols) * PREV_STEP
+    totals = prev[None, :] + _CONFIG_SCORES[:, None]
+    banked = (payoff or _banked_total)(totals)
+    work = np.full((len(_CONFIGS) + 1, cols, banked.shape[2]), -np.inf)
+    work[:-1] = banked
+    return work
+
+
+def _column_blocks(trans: _Transitions, width: int | None = None):
+    """Blocks of mutually independent prev columns, highest first (at most
+    ``width`` columns each, to bound memory for wide objectives)."""
+    width = min(width or trans.block, trans.block)
+    for top in range(N_PREV, 0, -width):
+        yield np.arange(max(0, top - width), top)
+
+
+def _solve(
+    trans: _Transitions, payoff=None, bust=None, follow=None, width=None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Run the whole bottom-up sweep: ``(values[config, prev, objective], work)``,
+    where the finished work table can be passed on as another solve's ``follow``."""
+    work = _work_table(trans, payoff)
+    values = np.empty((len(_CONFIGS), N_PREV, work.shape[2]))
+    for cols in _column_blocks(trans, width):
+        values[:, cols] = _solve_columns(trans, work, cols, payoff, bust, follow)
+    return values, work
 
 
 def precompute() -> None:
-    """Fill the value cache from the start of a turn (every reachable state)."""
-    continue_value((), 0)
+    """Fill the value table for every state, bottom-up: blocks of prev columns from
+    the top down, each block solved in one vectorized sweep over the levels."""
+    global _VALUES
+    _VALUES = _solve(_Transitions())[0][..., 0]
+
+
+# --- parallel build --------------------------------------------------------- #
+# The columns of one block only read higher blocks, so a block's columns can be
+# split across worker processes. The work table lives in shared memory: each
+# worker maps it and builds the transition arrays once (the pool initializer),
+# then is sent only the column chunks to solve; the parent writes the solved
+# columns back into the table before the next block.
+# Transition entries x prev columns below which a pool costs more than it saves
+# (about 2 s of in-process solving; the standard rules are some 450 thousand).
+PARALLEL_MIN_WORK = 50_000_000
+
+_WORKER_TRANSITIONS: _Transitions | None = None
+_WORKER_WORK: np.ndarray | None = None
+
+
+def _init_build_worker(shared, shape: tuple) -> None:
+    global _WORKER_TRANSITIONS, _WORKER_WORK
+    _WORKER_TRANSITIONS = _Transitions()
+    _WORKER_WORK = np.frombuffer(shared, dtype=np.float64).reshape(shape)
+
+
+def _solve_chunk(cols: np.ndarray) -> np.ndarray:
+    return _solve_columns(_WORKER_TRANSITIONS, _WORKER_WORK, cols)
+
+
+def build(workers: int = 1, path: Path = _CACHE_PATH) -> int:
+    """``precompute`` with each block's columns partitioned across ``workers``
+    processes, then save the table to ``path``. Returns the workers used.
+
+    A block holds at most ``_Transitions.block`` independent columns, which
+    caps the useful workers, and starting the processes costs more than a small
+    solve: below PARALLEL_MIN_WORK the table is solved in-process whatever
+    ``workers`` says. The standard rules are far below it (the whole solve takes
+    a few hundredths of a second); larger rule variants (a higher T_MAX, say)
+    are what the pool is for."""
+    global _VALUES
+    trans = _Transitions()
+    if len(trans.gain) * N_PREV < PARALLEL_MIN_WORK:
+        workers = 1
+    if workers <= 1:
+        _VALUES = _solve(trans)[0][..., 0]
+    else:
+        _VALUES = _solve_parallel(trans, workers)
+    save_cache(path)
+    return workers
+
+
+def _solve_parallel(trans: _Transitions, workers: int) -> np.ndarray:
+    """The value table, each block's columns solved across ``workers`` processes."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    table = _work_table(trans)
+    shared = multiprocessing.RawArray("d", table.size)
+    work = np.frombuffer(shared, dtype=np.float64).reshape(table.shape)
+    work[:] = table
+    values = np.empty((len(_CONFIGS), N_PREV))
+    pool = ProcessPoolExecutor(
+        workers, initializer=_init_build_worker, initargs=(shared, work.shape)
+    )
+    with pool:
+        for cols in _column_blocks(trans):
+            chunks = np.array_split(cols, min(workers, len(cols)))
+            for chunk, solved in zip(chunks, pool.map(_solve_chunk, chunks)):
+                values[:, chunk] = solved[..., 0]
+                prev = chunk * PREV_STEP
+                work[:-1, chunk] = _continue_values(solved, _CONFIG_SCORES, prev)
+    return values
 
 
 def load_cache(path: Path = _CACHE_PATH) -> bool:
-    """Populate the in-memory cache from `path`. Returns False if missing or stale."""
-    if not path.exists():
+    """Map the value table in from `path`. Returns False if missing or stale.
+
+    The mapping is copy-on-write, so the (rare) on-demand fill of a state the
+    file doesn't hold stays private to this process.
+    """
+    global _VALUES
+    table = _load_table(path, _CACHE_MAGIC, (len(_CONFIGS), N_PREV), np.float64)
+    if table is None:
         return False
-    try:
-        with open(path, "rb") as f:
-            data = pickle.load(f)
-    except (pickle.UnpicklingError, EOFError, OSError, AttributeError):
-        return False  # corrupt/partial file -> rebuild
-    if not isinstance(data, dict) or data.get("header") != _header():
-        return False  # rules/params changed -> rebuild
-    _CACHE.update(data["values"])
+    _VALUES = table
     return True
 
 
 def save_cache(path: Path = _CACHE_PATH) -> None:
-    """Write the current in-memory cache to `path`."""
-    with open(path, "wb") as f:
-        pickle.dump({"header": _header(), "values": _CACHE}, f)
+    """Write the current value table to `path`."""
+    _save_table(path, _CACHE_MAGIC, _VALUES.astype(np.float64, copy=False))
+
+
+def _load_table(path: Path, magic: bytes, shape: tuple, dtype) -> np.ndarray | None:
+    """Map a table saved by ``_save_table`` (copy-on-write), or None if the file is
+    missing, partial, or stale (header, shape or configuration index mismatch)."""
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError):
+        return None  # missing or empty file -> rebuild
+    rows = len(_CONFIGS)
+    data_offset = _CACHE_HEADER.size + rows * 8
+    if len(buffer) != data_offset + int(np.prod(shape)) * np.dtype(dtype).itemsize:
+        return None  # partial or foreign file -> rebuild
+    file_magic, version, *header = _CACHE_HEADER.unpack_from(buffer)
+    if (
+        file_magic != magic
+        or version != _CACHE_VERSION
+        or tuple(header[:4]) != _header()
+        or tuple(header[4:]) != _padded_shape(shape)
+    ):
+        return None  # rules/params changed -> rebuild
+    configs = np.frombuffer(buffer, np.int64, rows, _CACHE_HEADER.size)
+    if tuple(configs.tolist()) != _CONFIGS:
+        return None
+    return np.frombuffer(buffer, dtype, int(np.prod(shape)), data_offset).reshape(shape)
+
+
+def _save_table(path: Path, magic: bytes, table: np.ndarray) -> None:
+    """Write `table` after the header and configuration index, atomically (via a
+    temp file, so a reader never maps a half-written table)."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        header = (*_header(), *_padded_shape(table.shape))
+        f.write(_CACHE_HEADER.pack(magic, _CACHE_VERSION, *header))
+        f.write(np.asarray(_CONFIGS, dtype=np.int64).tobytes())
+        f.write(np.ascontiguousarray(table).tobytes())
+    os.replace(tmp, path)
+
+
+def _padded_shape(shape: tuple) -> tuple:
+    return (1,) * (3 - len(shape)) + tuple(shape)
 
 
 def ensure_ready() -> None:
@@ -207,3 +592,28 @@ def ensure_ready() -> None:
     if not load_cache():
         precompute()
         save_cache()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Turn-value DP table tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_cmd = commands.add_parser("build", help="rebuild the cached value table")
+    build_cmd.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="worker processes (used only for rule variants larger than standard)",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    workers = build(args.workers)
+    elapsed = time.perf_counter() - start
+    states = _VALUES.size
+    print(
+        f"Built {states} states with {workers} worker(s) in {elapsed:.2f}s "
+        f"({states / elapsed:,.0f} states/s), saved to {_CACHE_PATH.name}."
+    )
@@ -0,0 +1,324 @@
+"""Expectimax lookahead: search the rest of the turn a roll or two deep, then
+score the frontier with another algorithm's afterstate value.
+
+The one-ply players value each action by its afterstate alone. Here an action
+that rolls on is worth the expectation, over every outcome of the next roll
+(exact, from dp._roll_distribution), of the best action at that roll --
+searched the same way down to ``depth`` rolls, below which the leaf
+algorithm's afterstate value stands in. An action that ends the turn, and a
+roll that busts, are leaves at any depth. The leaf can be any afterstate
+scorer: "dp" (turn score), "game_dp", "nn" or a TD variant (expected final
+money). A search compares values of its leaf only, so the scales never mix.
+
+With "dp" leaves the search reproduces dp, which is already the exact optimum
+over the turn; the lookahead pays off on the game-aware leaves, whose one-ply
+values are approximations that a roll of exact expectation sharpens.
+
+Cost. A roll of n dice has up to 462 distinct outcomes, but every outcome only
+leads to one of its legal keeps, and a kept configuration offers a few dozen
+distinct ``(keep, stop)`` choices over all its rolls. So a chance node is a
+precomputed table per configuration (``_chance_table``): its children are
+valued once, each roll takes the max over its options by index, and NumPy sums
+the rolls by probability. Children that are leaves are scored in one batch.
+Every value is memoized by the afterstate it belongs to (kept configuration,
+banked points, roll count, money), a transposition table that lives as long as
+the position around the turn (scores, strich flags, seats, round) is the same:
+across every decision of one turn, so the subtrees searched for a roll are
+already there when it comes up.
+
+Each decision searches by iterative deepening -- the one-ply values, then one
+roll deep, up to DEPTH (NETWORK_DEPTH above nn and TD leaves) -- within
+NODE_BUDGET newly computed nodes (and TIME_BUDGET seconds, if set); when the
+budget runs out, the deepest completed search decides.
+
+Play as algorithm ``look_<leaf>``, e.g. "look_game_dp" or "look_td_min".
+"""
+
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from algorithms import dp, game_value
+from algorithms.dp import action_value as dp_action_value
+from algorithms.game_value import action_value as game_action_value
+from algorithms.nn import NN_ALGORITHMS, nn_action_scores
+from algorithms.td import TD_ALGORITHMS, td_action_scores
+from game.rules import (
+    NUM_DICE,
+    Action,
+    is_lange_strasse_packed,
+    kept_dice,
+    may_stop_packed,
+    merge_packed,
+    pack,
+    pack_groups,
+    score_packed,
+    talheim_score_packed,
+    unpack,
+    unpack_groups,
+)
+from game_state import GameState, PlayerState, StateExtractor
+
+DEPTH = 2  # rolls searched, at most
+# Above network leaves (nn, TD) every leaf is a fresh feature encoding, ten
+# times a table leaf's cost: one roll keeps a 10k-game arena within reach.
+NETWORK_DEPTH = 1
+NODE_BUDGET = 20_000  # newly computed nodes per decision
+TIME_BUDGET: float | None = None  # seconds per decision, if set
+
+TOTALE_CENTS = 50  # a Totale pays each opponent this (Game.handle_totale)
+
+PREFIX = "look_"
+LEAVES = ("dp", "game_dp", *sorted(NN_ALGORITHMS), *sorted(TD_ALGORITHMS))
+# Algorithm strings that dispatch here (see ai_player).
+LOOKAHEAD_ALGORITHMS = {PREFIX + leaf for leaf in LEAVES}
+
+_CONTEXT_FREE = {"dp"}  # leaves blind to the position around the turn
+_MAX_ENTRIES = 1 << 20  # transposition entries kept before starting over
+
+
+def _leaf_scorer(leaf: str):
+    """``(state, actions) -> values`` for the leaf algorithm."""
+    if leaf in TD_ALGORITHMS:
+        return lambda state, actions: td_action_scores(state, actions, leaf)
+    if leaf in NN_ALGORITHMS:
+        return nn_action_scores
+    single = dp_action_value if leaf == "dp" else game_action_value
+    return lambda state, actions: [single(state, action) for action in actions]
+
+
+@lru_cache(maxsize=None)
+def _chance_table(config: int):
+    """The next roll with ``config`` kept: ``(children, options, starts, probs,
+    p_bust)`` -- the distinct ``(keep, stop)`` choices any roll offers, every
+    non-busting roll's options as indices into them (roll i's from
+    ``starts[i]``), those rolls' probabilities, and the probability of a bust."""
+    kept = kept_dice(config)
+    children: dict[tuple[int, bool], int] = {}
+    options, starts, probs, p_bust = [], [], [], 0.0
+    for roll, prob in dp._roll_distribution(NUM_DICE - kept % 7):
+        keeps = dp._legal_keeps(roll, kept)
+        if not keeps:
+            p_bust += prob
+            continue
+        starts.append(len(options))
+        probs.append(prob)
+        for keep in keeps:
+            options.append(children.setdefault((keep, False), len(children)))
+            if may_stop_packed(config, keep):
+                options.append(children.setdefault((keep, True), len(children)))
+    return tuple(children), np.array(options), np.array(starts), np.array(probs), p_bust
+
+
+@lru_cache(maxsize=None)
+def _child(config: int, keep: int, stop: bool):
+    """What keeping ``keep`` onto ``config`` (and stopping, if ``stop``) leads
+    to: ``(new config, its score, ends the turn, hot dice, pays a Strasse)``."""
+    new = merge_packed(config, keep)
+    dice = kept_dice(new)
+    ends_turn = stop or talheim_score_packed(dice) > 0
+    hot = not ends_turn and dice % 7 == NUM_DICE
+    pays = (
+        hot
+        and is_lange_strasse_packed(dice)
+        and not is_lange_strasse_packed(kept_dice(config))
+    )
+    return new, score_packed(new), ends_turn, hot, pays
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+class Lookahead:
+    """Expectimax over the rest of the turn with ``leaf``'s values at the frontier
+    (see the module docstring). One per algorithm; it keeps its transposition
+    table between decisions."""
+
+    def __init__(self, leaf: str):
+        self.leaf = leaf
+        self._score = _leaf_scorer(leaf)
+        self._context = None
+        self._values: dict[tuple, float] = {}
+        self._nodes = 0
+        self._deadline: float | None = None
+        self._network = leaf in NN_ALGORITHMS or leaf in TD_ALGORITHMS
+        # dp and game_dp value leaves straight from their packed turn outcomes,
+        # without building the Actions and GameState the generic scorers take.
+        outcomes = {"dp": self._dp_outcome, "game_dp": self._game_outcome}
+        self._outcome = outcomes.get(leaf)
+        self._position = None
+
+    def action_values(self, state: GameState, actions) -> np.ndarray:
+        """Every action's value, from the deepest search the budget allows."""
+        context = None
+        if self.leaf not in _CONTEXT_FREE:
+            context = (
+                tuple((p.total_score, p.has_strich) for p in state.players),
+                state.current_player_idx,
+                state.starting_player_idx,
+                state.turn_number,
+                state.is_final_round,
+            )
+        if context != self._context or len(self._values) > _MAX_ENTRIES:
+            self._values.clear()  # a new turn: nothing searched so far recurs
+            self._context = context
+        if self.leaf == "dp":
+            dp.ensure_ready()
+        elif self.leaf == "game_dp":
+            game_value.ensure_ready()
+            self._position = game_value._position(state)
+
+        choices = [(pack(a.dice_to_keep), a.stop_after) for a in actions]
+        config = pack_groups(state.kept_groups)
+        prev, rc = state.turn_accumulated_score, state.roll_count
+        self._nodes = float("inf")  # the one-ply values always complete
+        self._deadline = None
+        values = self._children(state, config, prev, rc, choices, 0)
+        self._nodes = NODE_BUDGET
+        if TIME_BUDGET is not None:
+            self._deadline = time.perf_counter() + TIME_BUDGET
+        for depth in range(1, (NETWORK_DEPTH if self._network else DEPTH) + 1):
+            try:
+                values = self._children(state, config, prev, rc, choices, depth)
+            except _OutOfBudget:
+                break
+        return values
+
+    def _spend(self, nodes: int) -> None:
+        self._nodes -= nodes
+        if self._nodes < 0:
+            raise _OutOfBudget
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _OutOfBudget
+
+    def _children(self, base, config, prev, rc, choices, depth) -> np.ndarray:
+        """Values of the ``(keep, stop)`` ``choices`` at a decision with ``config``
+        kept, ``prev`` banked and ``rc`` rolls made; ``base`` is that decision's
+        state (its dice never matter: leaves value afterstates)."""
+        money = tuple(p.money for p in base.players)
+        values = np.empty(len(choices))
+        leaves: list[tuple] = []
+        for i, (keep, stop) in enumerate(choices):
+            new, score, ends_turn, hot, pays = _child(config, keep, stop)
+            total = prev + score
+            if ends_turn:
+                key = ("banked", money, total)
+                outcome = None, total
+            elif hot:  # maybe with a Lange Strasse paid out
+                key = ("hot", money, total, pays and 1 + (rc >= 3), depth)
+                outcome = 0, total
+            else:
+                key = (money, new, prev, rc, depth)
+                outcome = new, prev
+            deeper = depth > 0 and not ends_turn
+            value = self._values.get(key)
+            if value is None:
+                if not deeper:
+                    leaves.append((i, key, keep, stop, outcome, pays))
+                    continue
+                if hot:
+                    # Hot dice: the afterstate (with any Strasse money) rolls six.
+                    action = Action(unpack(keep), False)
+                    after, _ends_turn = StateExtractor._afterstate(base, action)
+                    value = self._chance(after, 0, total, 0, depth - 1)
+                else:
+                    value = self._chance(base, new, prev, rc, depth - 1)
+                self._values[key] = value
+            values[i] = value
+
+        if leaves:
+            self._spend(len(leaves))
+            if self._outcome is not None:
+                scores = self._outcome(base, leaves)
+            else:
+                actions = [Action(unpack(leaf[2]), leaf[3]) for leaf in leaves]
+                scores = self._score(base, actions)
+            for (i, key, *_), score in zip(leaves, scores):
+                values[i] = self._values[key] = float(score)
+        return values
+
+    def _dp_outcome(self, base, leaves) -> list[float]:
+        return [
+            points if config is None else dp.continue_value(config, points)
+            for *_, (config, points), _pays in leaves
+        ]
+
+    def _game_outcome(self, base, leaves) -> np.ndarray:
+        outcomes = [outcome for *_, outcome, _pays in leaves]
+        values = game_value.outcome_values(self._position, outcomes)
+        values += base.players[base.current_player_idx].money
+        for j, (_i, _key, keep, _stop, _outcome, pays) in enumerate(leaves):
+            if pays:
+                action = Action(unpack(keep), False)
+                values[j] += game_value._strasse_money(base, action)
+        return values
+
+    def _chance(self, base, config, prev, rc, depth) -> float:
+        """Expected value of rolling on with ``config`` kept, ``prev`` banked and
+        ``rc`` rolls made in this set; ``base`` holds the players."""
+        self._spend(1)
+        children, options, starts, probs, p_bust = _chance_table(config)
+        state = GameState(
+            available_dice=[],
+            kept_groups=unpack_groups(config),
+            turn_accumulated_score=prev,
+            roll_count=rc + 1,
+            players=base.players,
+            current_player_idx=base.current_player_idx,
+            starting_player_idx=base.starting_player_idx,
+            turn_number=base.turn_number,
+            is_final_round=base.is_final_round,
+        )
+        value = 0.0
+        if len(probs):
+            child = self._children(state, config, prev, rc + 1, children, depth)
+            value = float(probs @ np.maximum.reduceat(child[options], starts))
+        if p_bust:
+            value += p_bust * self._bust(state, totale=rc == 0)
+        return value
+
+    def _bust(self, state: GameState, totale: bool) -> float:
+        """The leaf value of busting out of ``state``'s turn: nothing banked, a
+        strich, and on a fresh six (a Totale) money to every opponent."""
+        key = ("bust", tuple(p.money for p in state.players), totale)
+        value = self._values.get(key)
+        if value is None:
+            me = state.current_player_idx
+            fine = TOTALE_CENTS if totale else 0
+            players = [
+                PlayerState(p.total_score, p.has_strich, p.money + fine)
+                for p in state.players
+            ]
+            mine = state.players[me]
+            players[me] = PlayerState(
+                mine.total_score, True, mine.money - fine * (len(players) - 1)
+            )
+            busted = GameState(
+                available_dice=[],
+                kept_groups=[],
+                turn_accumulated_score=0,
+                roll_count=state.roll_count,
+                players=players,
+                current_player_idx=me,
+                starting_player_idx=state.starting_player_idx,
+                turn_number=state.turn_number,
+                is_final_round=state.is_final_round,
+            )
+            # Ending the turn with nothing kept is exactly the bust afterstate.
+            value = float(self._score(busted, [Action([], True)])[0])
+            self._values[key] = value
+        return value
+
+
+# --- play-time searchers (one per algorithm, lazily built) ------------------- #
+_SEARCHERS: dict[str, Lookahead] = {}
+
+
+def lookahead_action_values(state: GameState, actions, algorithm: str) -> np.ndarray:
+    """Values of every action of one decision (used by AIPlayer's look_ algorithms)."""
+    searcher = _SEARCHERS.get(algorithm)
+    if searcher is None:
+        searcher = _SEARCHERS[algorithm] = Lookahead(algorithm[len(PREFIX) :])
+    return searcher.action_values(state, actions)
@@ -0,0 +1,337 @@
+"""Whole-game value table: expected final money from any between-turn position.
+
+The DP in algorithms.dp optimizes one turn for expected *score*; the money is
+paid out by Game.finish_game, which looks only at the final scores, the strich
+flags, the turn number and the seats. So the game one level up -- from turn to
+turn -- is small enough to solve outright once it is coarsened:
+
+    (turn, mover's seat offset, three scores on SCORE_GRID, three strich flags)
+
+The final-round flag needs no axis of its own: it is on exactly when some score
+is at or above FINAL_SCORE, and the grid never mixes the two sides of that line.
+Between two positions sits one turn, played turn-optimally (the EV policy of the
+DP) by whoever moves. That policy ignores the game state, so the turn is a fixed
+chance node: bust (a strich), Totale (a strich and 50¢ to each opponent), or a
+banked total on the 50-point grid (see ``turn_outcomes``). Backward induction
+over the turns then gives every seat's expected remaining money:
+
+  * a score that lands between two grid points is split between them so its
+    expectation is kept (linear interpolation, which is also how positions are
+    read back at play time);
+  * after round 10 the early-win bonus is gone and the game is stationary, so
+    that tail is solved by value iteration; rounds 10 down to 1 back up from it;
+  * settlement is Game.finish_game, vectorized over the whole grid.
+
+Strasse money is left out: it is paid mid-turn whatever the position, so it
+shifts every seat's value by about the same amount and never changes a choice
+between positions.
+
+Two tables are cached on disk like the turn-value table: the turn-outcome
+distribution of every DP state (so a keep can be scored by where it leads), and
+the game values themselves. Of those only one seat per position is ever read --
+the seat that has just moved, valuing the position its turn left (see
+``_after_turn``) -- so that is all the table keeps, as float16 (at most 1/8¢
+off, the values being a few hundred cents). Play with it as algorithm "game_dp": each action is
+worth the mover's expected final money after it.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from algorithms import dp
+from algorithms.dp import N_PREV, PREV_STEP, T_MAX
+from game.rules import flatten, is_lange_strasse, merge_kept, score_packed
+
+FINAL_SCORE = 10000  # reaching it starts the final round
+EARLY_WIN_TURN = 10  # a game over by this round pays the early-win bonus
+N_TURNS = EARLY_WIN_TURN + 1  # turn axis: 1..10, then one stationary "11+" layer
+N_SEATS = 3
+
+# Scores are kept on this grid: 1000-point steps up to 4000 (the values are close
+# to linear down there: 500-point steps move them by 0.35¢ on average), 500-point
+# steps from there, one point just short of the final round (where a single 50
+# matters), and the final-round scores up to a cap (above it only the ranking
+# among finishers is lost).
+SCORE_GRID = np.array(
+    [
+        *range(0, 4000, 1000),
+        *range(4000, FINAL_SCORE, 500),
+        9950,
+        *range(FINAL_SCORE, 12001, 500),
+    ]
+)
+_N_BELOW = int((SCORE_GRID < FINAL_SCORE).sum())  # grid points before the final round
+N_GRID = len(SCORE_GRID)
+
+# Turn outcomes: bust, Totale, then a banked total of 0, 50, ..., T_MAX (a total
+# past the DP boundary is counted at T_MAX).
+BUST, TOTALE = 0, 1
+N_OUTCOMES = 2 + N_PREV + 1
+
+_TOLERANCE = 1e-4  # value iteration stops when no value moves more (cents)
+
+_OUTCOMES: np.ndarray | None = None  # [kept_config, prev, outcome], float32
+_TABLE: np.ndarray | None = None  # [turn, mover, strich mask, s0, s1, s2], float16
+_OUTCOME_PATH = Path(__file__).with_name("turn_outcome_cache.bin")
+_OUTCOME_MAGIC = b"LSTO"
+_TABLE_PATH = Path(__file__).with_name("game_value_cache.bin")
+_TABLE_MAGIC = b"LSGV"
+_TABLE_SHAPE = (N_TURNS, N_SEATS, 1 << N_SEATS, N_GRID, N_GRID, N_GRID)
+
+
+# --- the turn as a chance node ---------------------------------------------- #
+def _banked_outcome(totals: np.ndarray) -> np.ndarray:
+    """The payoff: a one-hot over the outcomes, at the banked total's slot."""
+    slot = 2 + np.minimum(totals, T_MAX) // PREV_STEP
+    return (slot[..., None] == np.arange(N_OUTCOMES)).astype(np.float64)
+
+
+def turn_outcomes() -> np.ndarray:
+    """Distribution of the turn's outcome from every DP state, under the EV policy.
+
+    Same sweep as the DP, evaluating the expected-score policy rather than
+    optimizing: every objective is one outcome's probability. A bust off a fresh
+    six (the first roll, or the roll after hot dice) is a Totale.
+    """
+    trans = dp._Transitions()
+    _values, follow = dp._solve(trans)
+    bust = np.zeros((len(dp._CONFIGS), N_OUTCOMES))
+    bust[:, BUST] = 1.0
+    bust[0] = 0.0
+    bust[0, TOTALE] = 1.0
+    outcomes, _work = dp._solve(trans, _banked_outcome, bust, follow)
+    return outcomes.astype(np.float32)
+
+
+# --- settlement --------------------------------------------------------------- #
+def _settlement(scores: np.ndarray, strich: np.ndarray, early: bool) -> np.ndarray:
+    """Every seat's end-of-game money, as Game.finish_game pays it.
+
+    ``scores`` and ``strich`` have a trailing seat axis. Ties rank the earlier seat
+    higher, as the stable sort in finish_game does.
+    """
+    scores, strich = np.broadcast_arrays(scores, strich)
+    seat = np.arange(N_SEATS)
+    ahead = (scores[..., None, :] > scores[..., :, None]) | (
+        (scores[..., None, :] == scores[..., :, None]) & (seat < seat[:, None])
+    )
+    rank = ahead.sum(-1)
+    winner = rank == 0
+
+    money = np.select([winner, rank == 1], [120.0, -50.0], -70.0)
+    if early:
+        money += np.where(winner, 100.0, -50.0)
+    clean = ~strich
+    money += 100.0 * clean - 50.0 * (clean.sum(-1, keepdims=True) - clean)
+    poor = ~winner & (scores < 5000)
+    money -= 50.0 * poor
+    money += winner * 50.0 * poor.sum(-1, keepdims=True)
+    return money
+
+
+# --- the grid -------------------------------------------------------------- #
+def _grid_weights(scores) -> tuple[np.ndarray, np.ndarray]:
+    """Interpolation onto SCORE_GRID: ``(lower index, weight of the next point)``,
+    staying on the score's side of FINAL_SCORE and clamped to the grid's ends."""
+    scores = np.asarray(scores)
+    final = scores >= FINAL_SCORE
+    first = np.where(final, _N_BELOW, 0)
+    last = np.where(final, N_GRID - 1, _N_BELOW - 1)
+    x = np.clip(scores, SCORE_GRID[first], SCORE_GRID[last])
+    lower = np.clip(np.searchsorted(SCORE_GRID, x, "right") - 1, first, last - 1)
+    span = SCORE_GRID[lower + 1] - SCORE_GRID[lower]
+    return lower, (x - SCORE_GRID[lower]) / span
+
+
+def _bank_operator(p_bank: np.ndarray) -> np.ndarray:
+    """``[i, j]``: probability that the mover, on grid point i, banks a total that
+    lands them on grid point j (split between neighbours, so it keeps the mean)."""
+    scores = SCORE_GRID[:, None] + np.arange(N_PREV + 1) * PREV_STEP
+    lower, weight = _grid_weights(scores)
+    rows = np.broadcast_to(np.arange(N_GRID)[:, None], scores.shape)
+    op = np.zeros((N_GRID, N_GRID))
+    np.add.at(op, (rows, lower), p_bank * (1 - weight))
+    np.add.at(op, (rows, lower + 1), p_bank * weight)
+    return op
+
+
+def _grid_positions() -> tuple[np.ndarray, np.ndarray]:
+    """Scores ``[s0, s1, s2, seat]`` and strich flags ``[mask, seat]`` of the grid."""
+    scores = np.stack(np.meshgrid(SCORE_GRID, SCORE_GRID, SCORE_GRID, indexing="ij"), -1)
+    strich = (np.arange(1 << N_SEATS)[:, None] >> np.arange(N_SEATS)) & 1 == 1
+    return scores, strich
+
+
+# --- backward induction -------------------------------------------------------- #
+def solve(p_turn: np.ndarray) -> np.ndarray:
+    """Every seat's expected remaining money from every position, full float64
+    ``[turn, mover, mask, s0, s1, s2, seat]`` (all three seats).
+
+    ``p_turn`` is the outcome distribution of a fresh turn. A position's value is
+    taken just before the mover's turn; after the last seat's turn in the final
+    round the game settles, otherwise the next seat (the next round) moves.
+    """
+    scores, strich = _grid_positions()
+    finished = (scores >= FINAL_SCORE).any(-1)[None, ..., None]
+    settled = {
+        early: _settlement(scores[None], strich[:, None, None, None], early)
+        for early in (True, False)
+    }
+    bank = _bank_operator(p_turn[2:])
+    p_strich = p_turn[BUST] + p_turn[TOTALE]
+    totale = np.full((N_SEATS, N_SEATS), 50.0)
+    np.fill_diagonal(totale, -100.0)
+    struck = [np.arange(1 << N_SEATS) | (1 << seat) for seat in range(N_SEATS)]
+
+    def backup(mover, after):
+        """Value before ``mover``'s turn, from the values ``after`` it."""
+        axis = 1 + mover
+        banked = np.moveaxis(np.tensordot(bank, after, axes=(1, axis)), 0, axis)
+        return banked + p_strich * after[struck[mover]] + p_turn[TOTALE] * totale[mover]
+
+    def round_of(following, early, values):
+        """Back up one round, last seat first; ``following`` moves after it."""
+        last = np.where(finished, settled[early], following)
+        values[2] = backup(2, last)
+        values[1] = backup(1, values[2])
+        values[0] = backup(0, values[1])
+
+    table = np.empty((N_TURNS, N_SEATS, *settled[True].shape))
+    # The stationary tail: iterate the round on itself until it stops moving.
+    values = table[N_TURNS - 1]
+    values[:] = 0.0
+    while True:
+        before = values.copy()
+        round_of(values[0], False, values)
+        if np.abs(values - before).max() < _TOLERANCE:
+            break
+    for turn in range(N_TURNS - 2, -1, -1):
+        round_of(table[turn + 1, 0], True, table[turn])
+    return table
+
+
+def precompute() -> tuple[np.ndarray, np.ndarray]:
+    """Solve both tables: ``(turn outcomes, game values)``, the game values as
+    stored: before each mover's turn, the value of the seat that moved last."""
+    outcomes = turn_outcomes()
+    table = solve(outcomes[0, 0].astype(np.float64))
+    last = [(mover - 1) % N_SEATS for mover in range(N_SEATS)]
+    values = table[:, range(N_SEATS), ..., last]  # the advanced axes come first
+    return outcomes, np.moveaxis(values, 0, 1).astype(np.float16)
+
+
+def ensure_ready() -> None:
+    """Map the cached tables in, or build and save them (once per process)."""
+    global _OUTCOMES, _TABLE
+    if _TABLE is not None:
+        return
+    outcome_shape = (len(dp._CONFIGS), N_PREV, N_OUTCOMES)
+    # Stored flattened to the three dimensions the cache header records.
+    table_shape = (N_TURNS * N_SEATS << N_SEATS, N_GRID**3)
+    outcomes = dp._load_table(_OUTCOME_PATH, _OUTCOME_MAGIC, outcome_shape, np.float32)
+    table = dp._load_table(_TABLE_PATH, _TABLE_MAGIC, table_shape, np.float16)
+    if outcomes is None or table is None:
+        outcomes, table = precompute()
+        dp._save_table(_OUTCOME_PATH, _OUTCOME_MAGIC, outcomes)
+        dp._save_table(_TABLE_PATH, _TABLE_MAGIC, table.reshape(table_shape))
+    _OUTCOMES = outcomes
+    _TABLE = table.reshape(_TABLE_SHAPE)
+
+
+# --- play time ----------------------------------------------------------------- #
+def _position(state) -> tuple:
+    """The between-turn part of ``state``, seats counted from the starting player:
+    ``(scores, strich flags, turn, mover)``."""
+    n = len(state.players)
+    seats = [state.players[(state.starting_player_idx + k) % n] for k in range(n)]
+    return (
+        tuple(p.total_score for p in seats),
+        tuple(p.has_strich for p in seats),
+        state.turn_number,
+        (state.current_player_idx - state.starting_player_idx) % n,
+    )
+
+
+def _lookup(turn: int, mover: int, scores: list, strich: list) -> float:
+    """The expected remaining money of the seat before ``mover`` (the one that
+    moved last), before ``mover``'s turn, interpolated at the exact scores."""
+    mask = sum(1 << seat for seat, flag in enumerate(strich) if flag)
+    layer = _TABLE[min(turn, N_TURNS) - 1, mover, mask]
+    lower, weight = _grid_weights(scores)
+    value = 0.0
+    for corner in range(1 << N_SEATS):
+        upper = (corner >> np.arange(N_SEATS)) & 1
+        share = np.prod(np.where(upper, weight, 1 - weight))
+        if share:
+            value += share * float(layer[tuple(lower + upper)])
+    return value
+
+
+@lru_cache(maxsize=1 << 16)
+def _after_turn(position: tuple, gain: int, struck: bool = False) -> float:
+    """The mover's expected remaining money once their turn ends with ``gain``
+    banked (``struck``: with a strich). A game that ends there is settled exactly."""
+    scores, strich, turn, mover = position
+    scores, strich = list(scores), list(strich)
+    scores[mover] += gain
+    strich[mover] = strich[mover] or struck
+    if mover == N_SEATS - 1 and max(scores) >= FINAL_SCORE:
+        early = turn <= EARLY_WIN_TURN
+        return float(_settlement(np.array(scores), np.array(strich), early)[mover])
+    following = turn + 1 if mover == N_SEATS - 1 else turn
+    return _lookup(following, (mover + 1) % N_SEATS, scores, strich)
+
+
+@lru_cache(maxsize=4096)
+def _leaf_values(position: tuple) -> np.ndarray:
+    """The mover's expected remaining money for every turn outcome."""
+    bust = _after_turn(position, 0, True)
+    banked = [_after_turn(position, k * PREV_STEP) for k in range(N_PREV + 1)]
+    return np.array([bust, bust - 100.0, *banked])
+
+
+def action_value(state, action) -> float:
+    """The mover's expected final money after taking ``action`` in ``state``, the
+    rest of the turn played for expected score and the game from the table."""
+    ensure_ready()
+    future = outcome_value(_position(state), *dp._action_outcome(state, action))
+    money = state.players[state.current_player_idx].money
+    return money + _strasse_money(state, action) + future
+
+
+def outcome_value(position: tuple, config: "int | None", points: int) -> float:
+    """The mover's expected remaining money at ``position`` (see ``_position``)
+    once the turn is left at ``(config, points)`` as dp._action_outcome gives it:
+    rolling on with ``config`` kept and ``points`` banked, or ended at ``points``."""
+    if config is not None and points + score_packed(config) < T_MAX:
+        row = dp._CONFIG_INDEX[config]
+        return float(_OUTCOMES[row, points // PREV_STEP] @ _leaf_values(position))
+    total = points + (0 if config is None else score_packed(config))
+    return _after_turn(position, total)
+
+
+def outcome_values(position: tuple, outcomes) -> np.ndarray:
+    """``outcome_value`` of many ``(config, points)`` outcomes at one position,
+    every one that rolls on read in a single product with the outcome table."""
+    values = np.empty(len(outcomes))
+    rows, cols, rolling = [], [], []
+    for i, (config, points) in enumerate(outcomes):
+        if config is not None and points + score_packed(config) < T_MAX:
+            rows.append(dp._CONFIG_INDEX[config])
+            cols.append(points // PREV_STEP)
+            rolling.append(i)
+        else:
+            values[i] = outcome_value(position, config, points)
+    if rolling:
+        values[rolling] = _OUTCOMES[rows, cols] @ _leaf_values(position)
+    return values
+
+
+def _strasse_money(state, action) -> float:
+    """What the mover collects right away if ``action`` completes a Lange Strasse."""
+    kept = flatten(merge_kept(state.kept_groups, list(action.dice_to_keep)))
+    if not is_lange_strasse(kept):
+        return 0.0
+    return 200.0 if state.roll_count >= 3 else 100.0
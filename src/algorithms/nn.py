@@ -25,9 +25,16 @@ TOTAL money error, so as the heads learn to explain the money themselves,
 
 Training is Monte Carlo self-play: every decision of a game is labeled with
 that game's final events (cross-entropy) and the realized future in-game
-money (squared error).
-
-Train with:  python -m algorithms.nn [n_games] [alpha] [epsilon]
+money (squared error). ``train`` takes one SGD step per decision as it is
+labeled; ``train_replay`` instead keeps the labeled decisions in a
+``ReplayBuffer`` and fits them in minibatches (vectorized forward/backward,
+Adam), several epochs at a time, and ``dataset_from_records`` labels games
+stored by game.record for the same offline fit.
+
+Train with:  python -m algorithms.nn [n_games] [alpha] [epsilon] [batch_size]
+(a batch size switches to replay training, with ``alpha`` as Adam's step size;
+``--checkpoint-every``/``--resume`` and ``--metrics`` as for algorithms.td; the
+default metrics file is ``nn_metrics.jsonl`` beside the weights)
 """
 
 import pickle
@@ -36,6 +43,7 @@ from pathlib import Path
 import numpy as np
 
 from algorithms.td import GAME_KEYS, MONEY_SCALE, _encode
+from algorithms.training import Metrics, load_checkpoint, no_lap, save_checkpoint
 from game_state import GameState
 
 HIDDEN = 64
@@ -54,10 +62,12 @@ NN_KEYS = GAME_KEYS + [
 # fmt: on
 
 WEIGHTS_PATH = Path(__file__).with_name("nn_weights.pkl")
+CHECKPOINT_PATH = Path(__file__).with_name("nn_checkpoint.pkl")
+METRICS_PATH = Path(__file__).with_name("nn_metrics.jsonl")
 ARCH = "multihead-v1"  # bumped whenever the head layout changes
 
 nn_features = _encode(NN_KEYS)
-DIM = len(NN_KEYS) + 1  # _encode appends a constant bias input
+DIM = nn_features.dim  # _encode appends a constant bias input
 DP_IDX = NN_KEYS.index("dp_value")
 
 # --- Head layout: 12 probability outputs + 1 regression output. ------------- #
@@ -102,7 +112,8 @@ class MLP:
     The head layer (W2, b2) is zero-initialized, so at first every head is
     constant across actions and ranking falls back to pure DP; the residual's
     weights train against the total money error and fade as the heads take
-    over. Plain SGD throughout.
+    over. ``update`` is a plain SGD step on one sample; ``gradients`` gives
+    the same step directions averaged over a minibatch (for Adam).
     """
 
     def __init__(self, dim: int = DIM, hidden: int = HIDDEN, seed: int = 0):
@@ -182,23 +193,68 @@ class MLP:
         self.b_res += alpha * err_total
         return err_total
 
+    def gradients(
+        self, X: np.ndarray, Y_probs: np.ndarray, y_flow: np.ndarray, y_total: np.ndarray
+    ) -> tuple[dict[str, np.ndarray], np.ndarray]:
+        """``update``'s step directions averaged over a minibatch (one sample per
+        row), in one vectorized forward/backward pass. Returns them by parameter
+        name, plus each sample's total-value error."""
+        H = np.tanh(X @ self.W1.T + self.b1)
+        Z = H @ self.w2.T + self.b2
+        P = np.empty((X.shape[0], N_PROB))
+        E = np.exp(Z[:, :3] - Z[:, :3].max(axis=1, keepdims=True))
+        P[:, :3] = E / E.sum(axis=1, keepdims=True)
+        P[:, 3:] = 1.0 / (1.0 + np.exp(-Z[:, 3:N_PROB]))
+        values = self.w_res * X[:, DP_IDX] + self.b_res + P @ PAYOUT + Z[:, FLOW_IDX]
+
+        err = np.empty_like(Z)
+        err[:, :N_PROB] = Y_probs - P
+        err[:, FLOW_IDX] = y_flow - Z[:, FLOW_IDX]
+        dH = (err @ self.w2) * (1.0 - H * H)
+        err_total = y_total - values
+        n = X.shape[0]
+        steps = {
+            "w2": err.T @ H / n,
+            "b2": err.mean(axis=0),
+            "W1": dH.T @ X / n,
+            "b1": dH.mean(axis=0),
+            "w_res": np.mean(err_total * X[:, DP_IDX]),
+            "b_res": np.mean(err_total),
+        }
+        return steps, err_total
+
+    def state(self) -> dict:
+        """The weights as a plain dict (what ``save`` writes)."""
+        return {
+            "keys": NN_KEYS,
+            "arch": ARCH,
+            "hidden": len(self.b1),
+            "games": self.games_trained,
+            "W1": self.W1,
+            "b1": self.b1,
+            "W2": self.w2,
+            "b2": self.b2,
+            "w_res": self.w_res,
+            "b_res": self.b_res,
+        }
+
+    @classmethod
+    def from_state(cls, data: dict) -> "MLP | None":
+        """The model ``state`` describes, or None if its keys or head layout
+        are not this module's."""
+        if data.get("keys") != NN_KEYS or data.get("arch") != ARCH:
+            return None
+        model = cls(hidden=data["hidden"])
+        model.W1, model.b1 = data["W1"], data["b1"]
+        model.w2, model.b2 = data["W2"], data["b2"]
+        model.w_res = data["w_res"]
+        model.b_res = data["b_res"]
+        model.games_trained = data.get("games", 0)
+        return model
+
     def save(self, path: Path = WEIGHTS_PATH) -> None:
         with open(path, "wb") as f:
-            pickle.dump(
-                {
-                    "keys": NN_KEYS,
-                    "arch": ARCH,
-                    "hidden": len(self.b1),
-                    "games": self.games_trained,
-                    "W1": self.W1,
-                    "b1": self.b1,
-                    "W2": self.w2,
-                    "b2": self.b2,
-                    "w_res": self.w_res,
-                    "b_res": self.b_res,
-                },
-                f,
-            )
+            pickle.dump(self.state(), f)
 
     @classmethod
     def load(cls, path: Path = WEIGHTS_PATH) -> "MLP":
@@ -206,20 +262,116 @@ class MLP:
         if path.exists():
             try:
                 with open(path, "rb") as f:
-                    data = pickle.load(f)
-                if data.get("keys") == NN_KEYS and data.get("arch") == ARCH:
-                    model = cls(hidden=data["hidden"])
-                    model.W1, model.b1 = data["W1"], data["b1"]
-                    model.w2, model.b2 = data["W2"], data["b2"]
-                    model.w_res = data["w_res"]
-                    model.b_res = data["b_res"]
-                    model.games_trained = data.get("games", 0)
+                    model = cls.from_state(pickle.load(f))
+                if model is not None:
                     return model
             except (pickle.UnpicklingError, EOFError, OSError, KeyError):
                 pass  # missing/corrupt/stale -> start fresh
         return cls()
 
 
+class Adam:
+    """Adam over an MLP's parameters, following the ascent directions that
+    ``MLP.gradients`` returns."""
+
+    def __init__(self, lr: float = 1e-3, beta1=0.9, beta2=0.999, eps=1e-8):
+        self.lr, self.beta1, self.beta2, self.eps = lr, beta1, beta2, eps
+        self.t = 0
+        self.m: dict[str, np.ndarray] = {}
+        self.v: dict[str, np.ndarray] = {}
+
+    def step(self, model: MLP, steps: dict[str, np.ndarray]) -> None:
+        self.t += 1
+        correction1 = 1 - self.beta1**self.t
+        correction2 = 1 - self.beta2**self.t
+        for name, g in steps.items():
+            m = self.m.get(name, 0.0) * self.beta1 + (1 - self.beta1) * g
+            v = self.v.get(name, 0.0) * self.beta2 + (1 - self.beta2) * g * g
+            self.m[name], self.v[name] = m, v
+            delta = self.lr * (m / correction1) / (np.sqrt(v / correction2) + self.eps)
+            setattr(model, name, getattr(model, name) + delta)
+
+
+class ReplayBuffer:
+    """The most recent ``capacity`` labeled decisions (chosen afterstate features
+    and their targets), as preallocated arrays that fill like a ring."""
+
+    def __init__(self, capacity: int = 200_000, dim: int = DIM):
+        self.X = np.empty((capacity, dim))
+        self.Y_probs = np.empty((capacity, N_PROB))
+        self.y_flow = np.empty(capacity)
+        self.y_total = np.empty(capacity)
+        self.capacity = capacity
+        self.size = 0
+        self._next = 0
+
+    def add(self, X, Y_probs, y_flow, y_total) -> None:
+        """Append a batch of samples, overwriting the oldest once full."""
+        for start in range(0, len(X), self.capacity):
+            chunk = slice(start, start + self.capacity)
+            n = len(X[chunk])
+            rows = (self._next + np.arange(n)) % self.capacity
+            self.X[rows] = X[chunk]
+            self.Y_probs[rows] = Y_probs[chunk]
+            self.y_flow[rows] = y_flow[chunk]
+            self.y_total[rows] = y_total[chunk]
+            self._next = (self._next + n) % self.capacity
+            self.size = min(self.capacity, self.size + n)
+
+    def state(self) -> dict:
+        """The filled rows and the ring head as a plain dict (what a checkpoint
+        holds). The ring fills from row 0, so the filled rows are ``[:size]``."""
+        n = self.size
+        return {
+            "capacity": self.capacity,
+            "next": self._next,
+            "X": self.X[:n],
+            "Y_probs": self.Y_probs[:n],
+            "y_flow": self.y_flow[:n],
+            "y_total": self.y_total[:n],
+        }
+
+    def restore(self, state: dict) -> None:
+        """Refill from a ``state`` of a buffer of the same capacity."""
+        if state["capacity"] != self.capacity:
+            raise ValueError(
+                f"The checkpoint's replay buffer holds {state['capacity']} "
+                f"decisions, not {self.capacity}."
+            )
+        n = len(state["X"])
+        self.X[:n] = state["X"]
+        self.Y_probs[:n] = state["Y_probs"]
+        self.y_flow[:n] = state["y_flow"]
+        self.y_total[:n] = state["y_total"]
+        self.size, self._next = n, state["next"]
+
+    def fit(
+        self,
+        model: MLP,
+        optimizer: Adam,
+        epochs: int,
+        batch_size: int,
+        rng,
+        seen: "list | None" = None,
+    ) -> float:
+        """``epochs`` shuffled passes of minibatch steps over the buffer.
+        Returns the mean absolute total-value error seen while fitting; ``seen``,
+        if given, collects every minibatch's signed errors."""
+        errors = []
+        for _ in range(epochs):
+            order = rng.permutation(self.size)
+            for start in range(0, self.size, batch_size):
+                rows = order[start : start + batch_size]
+                steps, err_total = model.gradients(
+                    self.X[rows], self.Y_probs[rows], self.y_flow[rows], self.y_total[rows]
+                )
+                optimizer.step(model, steps)
+                errors.append(np.abs(err_total).mean())
+                if seen is not None:
+                    seen.append(err_total)
+        return float(np.mean(errors)) if errors else 0.0
+
+
 # --- play-time model (lazily loaded, cached) --------------------------------- #
 NN_ALGORITHMS = {"nn"}  # algorithm strings that dispatch here (see ai_player)
 
@@ -248,6 +400,11 @@ def nn_action_score(state: GameState, action) -> float:
     return _model().value(nn_features(state, action))
 
 
+def nn_action_scores(state: GameState, actions) -> np.ndarray:
+    """Values of every action of one decision, in one batched forward pass."""
+    return _model().values(nn_features.matrix(state, actions))
+
+
 def nn_head_report(state: GameState, action) -> dict[str, float]:
     """Debug view: every head's prediction for one action's afterstate."""
     return _model().head_probs(nn_features(state, action))
@@ -303,69 +460,279 @@ def _event_targets(
 
 
 # --- training --------------------------------------------------------------- #
+def _labels(
+    seat: int,
+    money_then: list[int],
+    scores: list[int],
+    has_strich: list[bool],
+    turn_number: int,
+    final_money: list[int],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Targets for ``seat``'s decisions taken at balances ``money_then``: its
+    event labels (shared by all of them), and per decision the in-game money
+    still to come (flow head) and all money still to come (residual)."""
+    settle = _final_settlement(scores, has_strich, turn_number)
+    assert sum(settle) == 0, "settlement must be zero-sum"
+    y_probs = _event_targets(seat, scores, has_strich, turn_number)
+    then = np.asarray(money_then, dtype=float)
+    final = final_money[seat]
+    # in-game flow still to come = total still to come - settlement
+    y_flow = (final - settle[seat] - then) / MONEY_SCALE
+    y_total = (final - then) / MONEY_SCALE
+    return np.tile(y_probs, (len(then), 1)), y_flow, y_total
+
+
+def _self_play_game(
+    model: MLP, epsilon: float, rng, lap=no_lap
+) -> tuple[np.ndarray, ...]:
+    """Play one epsilon-greedy self-play game; returns every decision's chosen
+    afterstate features with its labels, as arrays ``(X, Y_probs, y_flow,
+    y_total)`` grouped by seat. ``lap`` times the stages (see
+    algorithms.training.Metrics)."""
+    from env import LangeStrasseEnv  # local import to avoid an import cycle
+
+    env = LangeStrasseEnv()
+    # seat -> [(chosen afterstate features, balance at that decision), ...]
+    history: dict[int, list[tuple[np.ndarray, int]]] = {}
+    info = {}
+
+    while not env.done:
+        state = env.observe()
+        player = env.current_player_idx
+        money_now = state.players[player].money
+        actions = env.legal_actions()
+        lap("env")
+        feats = nn_features.matrix(state, actions)
+        lap("encode")
+
+        if rng.random() < epsilon:
+            choice = rng.randrange(len(actions))
+        else:
+            choice = int(np.argmax(model.values(feats)))
+        history.setdefault(player, []).append((feats[choice], money_now))
+        lap("eval")
+
+        _obs, _reward, _done, info = env.step(actions[choice])
+        lap("env")
+
+    standings = info["standings"]
+    scores = [s["score"] for s in standings]
+    has_strich = [s["has_strich"] for s in standings]
+    final_money = [s["money"] for s in standings]
+    parts = []
+    for seat, decisions in history.items():
+        rows, money_then = zip(*decisions)
+        labels = _labels(
+            seat, money_then, scores, has_strich, info["final_turn_number"], final_money
+        )
+        parts.append((np.array(rows), *labels))
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
 def train(
     alpha: float,
     epsilon: float,
     n_games: int,
     seed: "int | None" = None,
     log_every: int = 500,
+    checkpoint_every: int = 0,
+    resume: bool = False,
+    metrics_path=None,
+    metrics_every: int = 100,
 ) -> MLP:
     """Monte Carlo self-play: play a game epsilon-greedily, then label every
     decision with the game's final events and realized future in-game money.
-    Continues from saved weights; saves at end."""
+    Continues from saved weights; saves at end.
+
+    Every ``checkpoint_every`` games the run so far (weights, RNG state, games
+    played) is written atomically to CHECKPOINT_PATH, and ``resume`` picks the
+    run up from there, so an interrupted run restarted with the same arguments
+    ends exactly where the uninterrupted one would. ``metrics_path`` appends
+    telemetry lines (throughput, time split, value errors) every
+    ``metrics_every`` games (see algorithms.training)."""
     import random
 
     import log
-    from env import LangeStrasseEnv  # local import to avoid an import cycle
 
     log.VERBOSE = False  # silence game output during training
     if seed is not None:
         random.seed(seed)
 
-    model = MLP.load()
-
-    for game_i in range(1, n_games + 1):
-        env = LangeStrasseEnv()
-        # seat -> [(chosen afterstate features, balance at that decision), ...]
-        history: dict[int, list[tuple[list[float], int]]] = {}
-        info = {}
-
-        while not env.done:
-            state = env.observe()
-            player = env.current_player_idx
-            money_now = state.players[player].money
-            actions = env.legal_actions()
-            feats = [nn_features(state, a) for a in actions]
-
-            if random.random() < epsilon:
-                choice = random.randrange(len(actions))
-            else:
-                choice = int(np.argmax(model.values(feats)))
-            history.setdefault(player, []).append((feats[choice], money_now))
-
-            _obs, _reward, _done, info = env.step(actions[choice])
-
-        standings = info["standings"]
-        turn_number = info["final_turn_number"]
-        scores = [s["score"] for s in standings]
-        has_strich = [s["has_strich"] for s in standings]
-        settle = _final_settlement(scores, has_strich, turn_number)
-        assert sum(settle) == 0, "settlement must be zero-sum"
-
-        for seat, decisions in history.items():
-            y_probs = _event_targets(seat, scores, has_strich, turn_number)
-            final = standings[seat]["money"]
-            for feats_row, money_then in decisions:
-                # in-game flow still to come = total still to come - settlement
-                y_flow = (final - settle[seat] - money_then) / MONEY_SCALE
-                y_total = (final - money_then) / MONEY_SCALE
-                model.update(feats_row, y_probs, y_flow, y_total, alpha)
-
-        if log_every and game_i % log_every == 0:
-            print(f"  ...{game_i}/{n_games} games")
+    model, first_game = MLP.load(), 0
+    if resume:
+        model, first_game, _ = _resume(model, "train", n_games)
+
+    metrics = _metrics(metrics_path, metrics_every, "train", alpha)
+    lap = metrics.lap if metrics is not None else no_lap
+    try:
+        for game_i in range(first_game + 1, n_games + 1):
+            X, Y_probs, y_flow, y_total = _self_play_game(model, epsilon, random, lap)
+            errors = np.empty(len(X))
+            for i in range(len(X)):
+                errors[i] = model.update(X[i], Y_probs[i], y_flow[i], y_total[i], alpha)
+            lap("update")
+            if metrics is not None:
+                metrics.errors(errors)
+                metrics.game(game_i, len(X))
+            if checkpoint_every and game_i % checkpoint_every == 0:
+                _checkpoint(model, "train", game_i)
+                lap("checkpoint")
+
+            if log_every and game_i % log_every == 0:
+                print(f"  ...{game_i}/{n_games} games")
+    finally:
+        if metrics is not None:
+            metrics.close()
+
+    return _finish(model, n_games)
+
+
+def train_replay(
+    lr: float,
+    epsilon: float,
+    n_games: int,
+    batch_size: int = 256,
+    epochs: int = 2,
+    games_per_fit: int = 200,
+    capacity: int = 200_000,
+    seed: "int | None" = None,
+    log_every: int = 500,
+    checkpoint_every: int = 0,
+    resume: bool = False,
+    metrics_path=None,
+    metrics_every: int = 100,
+) -> MLP:
+    """Self-play into a ReplayBuffer: every ``games_per_fit`` games the buffer
+    (the most recent ``capacity`` decisions) is fitted for ``epochs`` passes of
+    Adam minibatches. Continues from saved weights; saves at end.
 
+    Checkpoints, resuming and metrics as in ``train``; a checkpoint here also
+    holds the buffer and the optimizer state."""
+    import random
+
+    import log
+
+    log.VERBOSE = False  # silence game output during training
+    rng = np.random.default_rng(seed)
+    if seed is not None:
+        random.seed(seed)
+
+    model, first_game = MLP.load(), 0
+    optimizer = Adam(lr)
+    buffer = ReplayBuffer(capacity)
+    if resume:
+        model, first_game, checkpoint = _resume(model, "train_replay", n_games)
+        if checkpoint is not None:
+            rng.bit_generator.state = checkpoint["rng"]
+            vars(optimizer).update(checkpoint["optimizer"])
+            buffer.restore(checkpoint["buffer"])
+
+    metrics = _metrics(metrics_path, metrics_every, "train_replay", lr)
+    lap = metrics.lap if metrics is not None else no_lap
+    errors = [] if metrics is not None else None
+    try:
+        for game_i in range(first_game + 1, n_games + 1):
+            game = _self_play_game(model, epsilon, random, lap)
+            buffer.add(*game)
+            if game_i % games_per_fit == 0 or game_i == n_games:
+                error = buffer.fit(model, optimizer, epochs, batch_size, rng, errors)
+                lap("update")
+                if log_every:
+                    print(f"  ...{game_i}/{n_games} games, |error| {error:.3f}")
+            if metrics is not None:
+                if errors:
+                    metrics.errors(np.concatenate(errors))
+                    errors.clear()
+                metrics.game(game_i, len(game[0]))
+            if checkpoint_every and game_i % checkpoint_every == 0:
+                _checkpoint(
+                    model,
+                    "train_replay",
+                    game_i,
+                    rng=rng.bit_generator.state,
+                    optimizer=vars(optimizer),
+                    buffer=buffer.state(),
+                )
+                lap("checkpoint")
+    finally:
+        if metrics is not None:
+            metrics.close()
+
+    return _finish(model, n_games)
+
+
+def _checkpoint(model: MLP, trainer: str, done: int, **extra) -> None:
+    import random
+
+    state = {"trainer": trainer, "model": model.state(), "done": done}
+    save_checkpoint(CHECKPOINT_PATH, {**state, "random": random.getstate(), **extra})
+
+
+def _resume(model: MLP, trainer: str, n_games: int) -> tuple[MLP, int, "dict | None"]:
+    """``(model, games done, checkpoint)`` from CHECKPOINT_PATH, restoring the
+    dice RNG; ``model``, 0 and None if there is no checkpoint."""
+    import random
+
+    checkpoint = load_checkpoint(CHECKPOINT_PATH)
+    if checkpoint is None:
+        return model, 0, None
+    if checkpoint["trainer"] != trainer:
+        raise ValueError(
+            f"{CHECKPOINT_PATH.name} is from {checkpoint['trainer']}, not {trainer}."
+        )
+    resumed = MLP.from_state(checkpoint["model"])
+    if resumed is None:
+        raise ValueError(f"{CHECKPOINT_PATH.name} is from another network layout.")
+    random.setstate(checkpoint["random"])
+    print(f"  resuming nn after {checkpoint['done']}/{n_games} games")
+    return resumed, checkpoint["done"], checkpoint
+
+
+def _metrics(path, every: int, trainer: str, lr: float) -> "Metrics | None":
+    if path is None:
+        return None
+    return Metrics(path, every, model="nn", trainer=trainer, lr=lr)
+
+
+def dataset_from_records(stem) -> tuple[np.ndarray, ...]:
+    """Label every decision of the games stored at ``stem`` (game.record) as
+    training samples ``(X, Y_probs, y_flow, y_total)``, ready for
+    ``ReplayBuffer.add``."""
+    from game.record import action_from_row, load_records, state_from_row
+
+    games, decisions = load_records(stem)
+    parts = []
+    for game in games:
+        first = int(game["first_decision"])
+        rows = decisions[first : first + int(game["n_decisions"])]
+        scores = game["scores"].tolist()
+        has_strich = [bool(int(game["strich"]) >> seat & 1) for seat in range(3)]
+        for seat in range(3):
+            mine = rows[rows["actor"] == seat]
+            if not len(mine):
+                continue
+            X = np.array(
+                [nn_features(state_from_row(r), action_from_row(r)) for r in mine]
+            )
+            labels = _labels(
+                seat,
+                mine["money"][:, seat],
+                scores,
+                has_strich,
+                int(game["turn"]),
+                game["money"].tolist(),
+            )
+            parts.append((X, *labels))
+    if not parts:
+        empty = np.empty((0, DIM)), np.empty((0, N_PROB)), np.empty(0), np.empty(0)
+        return empty
+    return tuple(np.concatenate(column) for column in zip(*parts))
+
+
+def _finish(model: MLP, n_games: int) -> MLP:
     model.games_trained += n_games
     model.save()
+    CHECKPOINT_PATH.unlink(missing_ok=True)  # finished: nothing to resume
     global _MODEL
     _MODEL = model  # so same-process evaluation uses the fresh weights
     return model
@@ -389,12 +756,22 @@ def _evaluate(games: int = 300) -> None:
         )
 
 
-def run_training(alpha: float, epsilon: float, n_games: int) -> None:
+def run_training(
+    alpha: float,
+    epsilon: float,
+    n_games: int,
+    batch_size: "int | None" = None,
+    **options,
+) -> None:
+    """Train (``options`` as for ``train``/``train_replay``), report, evaluate."""
     import time
 
     print(f"Training nn by self-play for {n_games} games...")
     start = time.perf_counter()
-    model = train(alpha, epsilon, n_games)
+    if batch_size:
+        model = train_replay(alpha, epsilon, n_games, batch_size, **options)
+    else:
+        model = train(alpha, epsilon, n_games, **options)
     print(
         f"Done in {time.perf_counter() - start:.1f}s. "
         f"Model now trained on {model.games_trained} games total, "
@@ -403,10 +780,52 @@ def run_training(alpha: float, epsilon: float, n_games: int) -> None:
     _evaluate()
 
 
-if __name__ == "__main__":
+def main(argv=None) -> None:
+    import argparse
     import sys
 
-    n_games = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
-    alpha = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
-    epsilon = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
-    run_training(alpha, epsilon, n_games)
+    parser = argparse.ArgumentParser(description="Train the nn model by self-play.")
+    parser.add_argument("games", nargs="?", type=int, default=1000)
+    parser.add_argument("alpha", nargs="?", type=float, default=0.01)
+    parser.add_argument("epsilon", nargs="?", type=float, default=0.1)
+    parser.add_argument(
+        "batch_size", nargs="?", type=int, help="switch to replay training"
+    )
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=0,
+        metavar="GAMES",
+        help="write a resumable checkpoint every GAMES games",
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="continue from the last checkpoint"
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        const=METRICS_PATH,
+        metavar="FILE",
+        help=f"append JSON-lines telemetry to FILE (default {METRICS_PATH.name})",
+    )
+    parser.add_argument("--metrics-every", type=int, default=100, metavar="GAMES")
+    args = parser.parse_args(argv)
+    try:
+        run_training(
+            args.alpha,
+            args.epsilon,
+            args.games,
+            args.batch_size,
+            seed=args.seed,
+            checkpoint_every=args.checkpoint_every,
+            resume=args.resume,
+            metrics_path=args.metrics,
+            metrics_every=args.metrics_every,
+        )
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Reach-probability solver: the chance this turn banks at least a target score.
+
+The DP in algorithms.dp maximizes the *expected* turn score, which is the right
+objective most of the time but not when one particular score matters: chasing a
+leader in the final round, or crossing 10,000 (notes.md items 1, 9, 10). There
+the question is "what is my chance of getting at least T this turn?", and the
+policy that maximizes it differs from the EV policy -- it rolls on long past the
+point where expected score says bank.
+
+This solves that optimally for every target on the 50-point grid at once. It is
+the same state graph, transition arrays and bottom-up sweep as the EV solver;
+only the payoff changes: banking ``total`` pays 1 if ``total >= target`` else 0,
+one objective per target (a bust pays 0). The result is a float32 array indexed
+``[target, kept_config, prev]``, cached on disk like the turn-value table, so a
+play-time question like "P(reach 2350) if I keep these dice" is one lookup.
+
+Targets run from 50 up to T_MAX: the solver's boundary banks any total at or
+above T_MAX, which is exact for those targets and meaningless past them.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from algorithms import dp
+
+TARGETS = np.arange(1, dp.N_PREV + 1) * dp.PREV_STEP  # 50, 100, ..., T_MAX
+
+_REACH: np.ndarray | None = None  # [target, kept_config, prev], float32
+_CACHE_PATH = Path(__file__).with_name("turn_reach_cache.bin")
+_CACHE_MAGIC = b"LSRP"
+
+
+def _reaches(totals: np.ndarray) -> np.ndarray:
+    """The payoff: 1 for every target the banked total reaches, else 0."""
+    return (totals[..., None] >= TARGETS).astype(np.float64)
+
+
+def precompute() -> np.ndarray:
+    """Solve the reach probabilities of every target for every state."""
+    values, _work = dp._solve(dp._Transitions(), _reaches)
+    return values.transpose(2, 0, 1).astype(np.float32)
+
+
+def ensure_ready() -> None:
+    """Map the cached table in, or build and save it (once per process)."""
+    global _REACH
+    if _REACH is not None:
+        return
+    shape = (len(TARGETS), len(dp._CONFIGS), dp.N_PREV)
+    _REACH = dp._load_table(_CACHE_PATH, _CACHE_MAGIC, shape, np.float32)
+    if _REACH is None:
+        _REACH = precompute()
+        dp._save_table(_CACHE_PATH, _CACHE_MAGIC, _REACH)
+
+
+def _target_index(target: int) -> int:
+    """Row of the smallest grid target >= `target` (scores are multiples of 50,
+    so reaching it is the same event)."""
+    if target > dp.T_MAX:
+        raise ValueError(f"Reach targets above T_MAX ({dp.T_MAX}) are not modelled.")
+    return -(-target // dp.PREV_STEP) - 1
+
+
+def continue_reach(config: int, prev: int, target: int) -> float:
+    """P(turn total >= `target`) rolling on with `config` kept and `prev` banked,
+    playing the rest of the turn to maximize exactly that probability."""
+    if target <= 0:
+        return 1.0
+    k = _target_index(target)
+    total = prev + dp.score_packed(config)
+    if total >= dp.T_MAX:
+        return 1.0  # banked at the boundary, which is at/above every target
+    row = dp._CONFIG_INDEX.get(config)
+    col, off_grid = divmod(prev, dp.PREV_STEP)
+    if row is None or off_grid:
+        raise ValueError(f"No reach entry for kept config {config:o} with prev {prev}.")
+    ensure_ready()
+    return float(_REACH[k, row, col])
+
+
+def reach_probability(state, action, target: int) -> float:
+    """P(this turn banks at least `target` points) if `action` is taken in `state`
+    and the rest of the turn is played to maximize that probability."""
+    config, points = dp._action_outcome(state, action)
+    if config is None:
+        return 1.0 if points >= target else 0.0
+    return continue_reach(config, points, target)
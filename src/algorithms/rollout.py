@@ -0,0 +1,298 @@
+"""Monte Carlo rollouts: value each action by playing the rest of the game out
+many times with a fast default policy and averaging the mover's final money.
+
+The learned players (nn, TD) and game_dp estimate expected final money; this
+player measures it, at the price of simulation. Every seat plays the rest of
+the game like the dp player (the first legal action of highest turn value), so
+an action's value is the mover's mean final money with dp play from then on --
+a yardstick for the learned values, e.g. in the endgame, where they are hardest
+to learn, and a player in its own right (algorithm "rollout").
+
+As a player it is one step of policy improvement on dp: it keeps dp's choice
+unless the playouts show another action clearly better. The playouts of all
+actions are dealt common dice (see _CommonDice), so an action's edge over dp's
+choice is measured playout by playout, with far less noise than two separate
+means; an action must beat dp's choice by MARGIN standard errors of that edge.
+
+Thousands of playouts per decision come from game.vec_game: the ROLLOUTS games
+of every action are one VecGame batch, loaded with the decision's state, stepped
+once with each game's action, then stepped in lockstep with the batched dp
+policy until every game is settled. The policy is a memo of dp's choice per
+(kept configuration, roll, banked points), filled on first sight, so a step
+costs one dictionary lookup per game. With WORKERS > 1 the playouts are split
+over a process pool, each shard one VecGame.
+
+``play_out`` is the same playout on the object engine, through Game.clone; the
+CLI (``python -m algorithms.rollout``) runs both on one position, to compare
+their values and speed.
+"""
+
+import multiprocessing
+import random
+import time
+
+import numpy as np
+
+from algorithms import dp
+from game.game import Game
+from game.rules import Action, action_options, pack, pack_groups, unpack, unpack_groups
+from game.vec_game import N_PLAYERS, VecGame
+from game_state import GameState, StateExtractor
+
+ROLLOUTS = 200  # playouts per action
+WORKERS = 1  # processes to spread a decision's playouts over
+MARGIN = 2.0  # standard errors an action must beat dp's choice by
+
+ROLLOUT_ALGORITHMS = {"rollout"}  # algorithm strings that dispatch here (see ai_player)
+
+_MAX_CHOICES = 1 << 20  # memoized dp choices kept before starting over
+_CHOICES: dict[tuple[int, int, int], tuple[int, bool]] = {}
+
+
+# --------------------------------------------------------------------------- #
+# The default policy: dp
+# --------------------------------------------------------------------------- #
+def _dp_choice(config: int, roll: int, prev: int) -> tuple[int, bool]:
+    """The dp player's ``(keep, stop)`` with ``config`` kept, ``roll`` to keep
+    from and ``prev`` banked: the first legal action of highest dp value."""
+    key = (config, roll, prev)
+    choice = _CHOICES.get(key)
+    if choice is None:
+        if len(_CHOICES) > _MAX_CHOICES:
+            _CHOICES.clear()
+        best = -np.inf
+        for keep, stoppable in action_options(unpack(roll), unpack_groups(config)):
+            keep = pack(keep)
+            for stop in (False, True) if stoppable else (False,):
+                value = dp.packed_action_value(config, prev, keep, stop)
+                if value > best:
+                    best, choice = value, (keep, stop)
+        _CHOICES[key] = choice
+    return choice
+
+
+def _dp_policy(vec: VecGame) -> tuple[np.ndarray, np.ndarray]:
+    """The dp player's action in every live game of ``vec``, as ``step`` takes them."""
+    live = np.flatnonzero(~vec.done)
+    states = zip(
+        vec.kept[live].tolist(),
+        vec.available[live].tolist(),
+        vec.accumulated[live].tolist(),
+    )
+    choices = [_CHOICES.get(key) or _dp_choice(*key) for key in states]
+    keep = np.zeros(vec.n_games, dtype=np.int64)
+    stop = np.zeros(vec.n_games, dtype=bool)
+    if choices:
+        keep[live], stop[live] = zip(*choices)
+    return keep, stop
+
+
+# --------------------------------------------------------------------------- #
+# Playouts
+# --------------------------------------------------------------------------- #
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64's finalizer: a bijection of uint64 arrays that scrambles every bit."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class _CommonDice(VecGame):
+    """Playout games on common random numbers: game g rolls from dice stream
+    ``streams[g]``, and a stream's dice depend only on the seat, the turn and
+    the roll's number within the turn (counted from the loaded decision). The
+    playouts of every action on one stream are dealt the same dice on every
+    later turn, however the action changed the game -- duplicate play, as in
+    play.run_matchup -- so most of the dice noise cancels out of the gaps
+    between actions."""
+
+    def __init__(self, streams: np.ndarray, seed=None):
+        self.streams = streams.astype(np.uint64)
+        self.key = np.random.default_rng(seed).integers(1 << 63, dtype=np.uint64)
+        self.turn_rolls = np.zeros(len(streams), dtype=np.uint64)
+        super().__init__(len(streams), seed)
+
+    def set_state(self, state, mask=None) -> None:
+        super().set_state(state, mask)
+        self.turn_rolls[slice(None) if mask is None else mask] = 0
+
+    def _start_turn(self, mask: np.ndarray) -> None:
+        super()._start_turn(mask)
+        self.turn_rolls[mask] = 0
+
+    def _draw(self, games: np.ndarray) -> np.ndarray:
+        turn = (self.turn[games] * N_PLAYERS + self.current[games]).astype(np.uint64)
+        place = turn << np.uint64(16) | self.turn_rolls[games]
+        self.turn_rolls[games] += np.uint64(1)
+        roll = _mix(_mix(self.streams[games] ^ self.key) ^ place)
+        bits = _mix(roll[:, None] + _GOLDEN * np.arange(1, 7, dtype=np.uint64))
+        faces = (bits >> np.uint64(32)) * np.uint64(6) >> np.uint64(32)  # 0..5
+        return faces.astype(np.int64) + 1
+
+
+def _play_outs(args) -> np.ndarray:
+    """``(state, choices, n, seed)``: play ``n`` games out after each of the
+    packed ``choices`` at ``state``, playout i of every choice on dice stream i;
+    the mover's final money, ``[choice, playout]``."""
+    state, choices, n, seed = args
+    dp.ensure_ready()
+    vec = _CommonDice(np.tile(np.arange(n), len(choices)), seed)
+    vec.set_state(state)
+    keep, stop = (np.repeat(column, n) for column in zip(*choices))
+    vec.step(keep, stop)
+    while not vec.done.all():
+        vec.step(*_dp_policy(vec))
+    money = vec.money[:, state.current_player_idx]
+    return money.reshape(len(choices), n)
+
+
+_POOL = None
+_POOL_WORKERS = 0
+
+
+def _pool(workers: int):
+    """The process pool, started on first use and kept for later decisions."""
+    global _POOL, _POOL_WORKERS
+    if _POOL is None or _POOL_WORKERS != workers:
+        if _POOL is not None:
+            _POOL.terminate()
+        _POOL = multiprocessing.Pool(workers)
+        _POOL_WORKERS = workers
+    return _POOL
+
+
+def rollout_money(
+    state: GameState, actions, n: int = ROLLOUTS, seed=None, workers: int = WORKERS
+) -> np.ndarray:
+    """The mover's final money in ``n`` playouts after every action, with dp
+    play on every seat, ``[action, playout]``; playout i of every action is
+    dealt the same dice (see _CommonDice). ``seed`` fixes the dice."""
+    choices = [(pack(a.dice_to_keep), a.stop_after) for a in actions]
+    if workers <= 1:
+        return _play_outs((state, choices, n, seed))
+    sizes = [len(part) for part in np.array_split(np.arange(n), workers) if len(part)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    shards = [(state, choices, size, s) for size, s in zip(sizes, seeds)]
+    return np.hstack(_pool(workers).map(_play_outs, shards))
+
+
+def rollout_values(
+    state: GameState, actions, n: int = ROLLOUTS, seed=None, workers: int = WORKERS
+) -> np.ndarray:
+    """Every action's value: the mover's mean final money over ``n`` playouts
+    after it, with dp play on every seat. ``seed`` fixes the dice."""
+    return rollout_money(state, actions, n, seed, workers).mean(1)
+
+
+def _dp_index(state: GameState, actions) -> int:
+    """Position of the dp player's choice among ``actions``."""
+    choice = _dp_choice(
+        pack_groups(state.kept_groups),
+        pack(state.available_dice),
+        state.turn_accumulated_score,
+    )
+    return [(pack(a.dice_to_keep), a.stop_after) for a in actions].index(choice)
+
+
+def rollout_action_values(state: GameState, actions, algorithm: str) -> np.ndarray:
+    """Values of every action of one decision (used by AIPlayer's "rollout").
+
+    dp's own choice is the baseline, worth its mean final money; every other
+    action is worth that plus its mean edge over the baseline, less MARGIN
+    standard errors of that edge (paired playout by playout, on common dice).
+    So the player leaves dp's choice only for an action the playouts clearly
+    prefer, and playout noise can't make it play worse than dp.
+
+    The playouts are seeded from the global ``random``, which a seeded matchup
+    reseeds per game (see play._play_games), so seeded games replay exactly."""
+    money = rollout_money(state, actions, seed=random.getrandbits(64))
+    base = _dp_index(state, actions)
+    edge = money - money[base]
+    error = edge.std(1, ddof=1) / np.sqrt(edge.shape[1])
+    return money[base].mean() + edge.mean(1) - MARGIN * error
+
+
+def play_out(game: Game, rng) -> list[int]:
+    """Play a clone of ``game`` to the end with dp play on every seat, rolling
+    from ``rng``; every seat's final money. The object-engine playout."""
+    game = game.clone(rng)
+    while True:
+        game.advance_to_decision()
+        if game.game_over:
+            return [p.money for p in game.players]
+        dice_set = game.dice_set
+        keep, stop = _dp_choice(
+            pack_groups(dice_set.kept_groups),
+            pack(dice_set.available),
+            dice_set.turn_accumulated_score,
+        )
+        game.apply_action(Action(unpack(keep), stop))
+
+
+# --------------------------------------------------------------------------- #
+# CLI: both engines on one position
+# --------------------------------------------------------------------------- #
+def compare_engines(n: int = ROLLOUTS, decisions: int = 40, seed: int = 0) -> None:
+    """Play a seeded dp game ``decisions`` decisions in, then value that
+    decision's actions with ``n`` playouts each on both engines."""
+    dp.ensure_ready()
+    game = Game(dice_seed=seed)
+    for _ in range(decisions):
+        game.advance_to_decision()
+        state = StateExtractor.extract_state(game)
+        config, roll = pack_groups(state.kept_groups), pack(state.available_dice)
+        keep, stop = _dp_choice(config, roll, state.turn_accumulated_score)
+        game.apply_action(Action(unpack(keep), stop))
+    game.advance_to_decision()
+    state = StateExtractor.extract_state(game)
+    actions = game.legal_actions()
+    me = state.current_player_idx
+    print(
+        f"Seat {me} to act, scores {[p.total_score for p in state.players]}, "
+        f"turn {state.turn_number}, {n} playouts per action:"
+    )
+
+    start = time.perf_counter()
+    batched = rollout_values(state, actions, n, seed)
+    vec_seconds = time.perf_counter() - start
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    objects = []
+    for action in actions:
+        money = []
+        for _ in range(n):
+            after = game.clone(rng)  # rolls on from the action with its own dice
+            after.apply_action(action)
+            money.append(play_out(after, rng)[me])
+        objects.append((np.mean(money), np.std(money) / np.sqrt(n)))
+    game_seconds = time.perf_counter() - start
+
+    print(f"  {'action':24s} {'VecGame':>9s} {'Game':>9s} {'± s.e.':>7s}")
+    for action, value, (mean, error) in zip(actions, batched, objects):
+        print(f"  {str(action):24s} {value:+9.1f} {mean:+9.1f} {error:7.1f}")
+    playouts = n * len(actions)
+    for name, seconds in (("VecGame", vec_seconds), ("Game", game_seconds)):
+        print(f"  {name:8s} {playouts / seconds:9.0f} playouts/s")
+
+
+def main(argv=None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Value one position by rollouts on both game engines."
+    )
+    parser.add_argument("--rollouts", type=int, default=ROLLOUTS, help="per action")
+    parser.add_argument(
+        "--decisions", type=int, default=40, help="dp decisions played first"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    compare_engines(args.rollouts, args.decisions, args.seed)
+
+
+if __name__ == "__main__":
+    main()
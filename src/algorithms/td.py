@@ -25,24 +25,37 @@ Variants share all of this and differ only in which afterstate atoms they encode
     scalars, no flags, no DP hint. "How far does raw data get?".
   * ``td_min``   -- only atoms that can actually shift a linear afterstate argmax.
 
-Train one with:  python -m algorithms.td [td_full|td_small|td_min] [n_games]
+Train one with:  python -m algorithms.td [variant] [n_games] [workers] [lambda]
+
+With ``workers > 1``, self-play runs in actor processes that stream transitions
+to one learner process (``train(..., workers=N)``). A ``lambda`` above 0 trains
+TD(lambda) with per-seat eligibility traces instead of TD(0); compare the two
+with  python -m algorithms.td benchmark [variant] [n_games]
+Long runs take ``--checkpoint-every N`` (resume with ``--resume``) and
+``--metrics [FILE]`` (JSON-lines throughput and TD-error telemetry, by default
+to ``<variant>_metrics.jsonl`` beside the weights); see --help.
 """
 
 import pickle
 from pathlib import Path
 
+import numpy as np
+
 from algorithms.dp import action_value
-from game_state import GameState, StateExtractor
+from algorithms.game_value import action_value as game_action_value
+from algorithms.training import Metrics, load_checkpoint, no_lap, save_checkpoint
+from game_state import AtomEncoder, GameState
 
 MONEY_SCALE = 100.0  # final money (cents) is divided by this to form the TD target
 DP_SCALE = 1000.0    # normalizer for the DP turn-value feature
 
 
 # --- feature encodings ------------------------------------------------------ #
-# Each model is an ordered list of afterstate atom names; game_state computes every
-# atom once (see StateExtractor._atom_features), and a model just picks which atoms
-# it reads. Adding a model to compare = a new key list + a VARIANTS entry; no new
-# encoder, no duplicated normalization. (fmt: off keeps the visual grouping below.)
+# Each model is an ordered list of afterstate atom names; game_state defines every
+# atom once (see StateExtractor._atom_features), and a model's encoder computes
+# just the atoms it reads. Adding a model to compare = a new key list + a VARIANTS
+# entry; no new encoder, no duplicated normalization. (fmt: off keeps the visual
+# grouping below.)
 
 # fmt: off
 # Full model: the rich encoding -- raw dice counts, grouped 1s/5s, derived scores,
@@ -106,31 +119,23 @@ TD_DP_KEYS = ["dp_value"]
 # Extra atoms that need the algorithm layer, so they can't be base atoms in
 # game_state (which stays free of the solver, and would otherwise compute these for
 # every model on every action). A model requests one just by listing its key, and it
-# is computed only when some model does. "dp_value" is the DP solver's turn-value.
+# is computed only when some model does. "dp_value" is the DP solver's turn-value;
+# "game_value" is the whole-game table's expected final money (algorithms.game_value).
 _EXTRA_ATOMS = {
     "dp_value": lambda state, action: action_value(state, action) / DP_SCALE,
+    "game_value": lambda state, action: game_action_value(state, action) / MONEY_SCALE,
 }
 
 
-def _encode(keys: list[str]):
+def _encode(keys: list[str]) -> AtomEncoder:
     """Feature function for a model defined as an ordered list of atom keys.
 
     Keys are game_state afterstate atoms, optionally plus the solver-layer atoms in
-    _EXTRA_ATOMS (e.g. "dp_value"). A trailing bias term is always added. Extra atoms
-    are computed only when the key list asks for them.
+    _EXTRA_ATOMS (e.g. "dp_value"). A trailing bias term is always added. The
+    encoder computes only the atoms the keys ask for (see game_state.AtomEncoder);
+    call it for one action's features or ``.matrix`` for a whole decision's.
     """
-    keys = list(keys)
-    extra_keys = [k for k in keys if k in _EXTRA_ATOMS]
-
-    def features(state: GameState, action) -> list[float]:
-        atoms = StateExtractor.afterstate_atoms(state, action)
-        for k in extra_keys:
-            atoms[k] = _EXTRA_ATOMS[k](state, action)
-        f = [atoms[k] for k in keys]
-        f.append(1.0)  # bias
-        return f
-
-    return features
+    return AtomEncoder(keys, _EXTRA_ATOMS, bias=True)
 
 
 # Full-model encoder, also exported as ``td_features`` for hand_eval / interp.
@@ -143,26 +148,44 @@ class LinearTD:
     def __init__(
         self, dim: int, weights: list[float] | None = None, games_trained: int = 0
     ):
-        self.w = list(weights) if weights is not None else [0.0] * dim
+        self.w = np.array(weights, dtype=float) if weights is not None else np.zeros(dim)
         self.games_trained = (
             games_trained  # cumulative self-play games behind these weights
         )
 
     def value(self, features: list[float]) -> float:
-        return sum(wi * xi for wi, xi in zip(self.w, features))
+        return float(self.w @ np.asarray(features))
+
+    def values(self, feature_rows: list[list[float]]) -> np.ndarray:
+        """Values of many feature vectors at once (one action per row)."""
+        return np.asarray(feature_rows) @ self.w
 
     def update(self, features: list[float], target: float, alpha: float) -> float:
         """One TD step of the weights toward `target`; returns the TD error."""
-        step = alpha * (target - self.value(features))
-        for i, xi in enumerate(features):
-            if xi:
-                self.w[i] += step * xi
+        x = np.asarray(features)
+        step = alpha * (target - self.w @ x)
+        self.w += step * x
         return step / alpha if alpha else 0.0
 
+    def update_traced(
+        self, trace: np.ndarray, features, target: float, alpha: float, lam: float
+    ) -> float:
+        """One TD(lambda) step: decay the eligibility ``trace`` (in place) by
+        ``lam``, add ``features`` to it, and move the weights along the trace by
+        the TD error of ``features``; returns that error. ``lam=0`` is ``update``."""
+        x = np.asarray(features)
+        trace *= lam
+        trace += x
+        error = target - self.w @ x
+        self.w += (alpha * error) * trace
+        return error
+
     def save(self, path: Path) -> None:
+        # Weights stay a plain list on disk, so interp can read them without NumPy.
         with open(path, "wb") as f:
             pickle.dump(
-                {"dim": len(self.w), "games": self.games_trained, "w": self.w}, f
+                {"dim": len(self.w), "games": self.games_trained, "w": self.w.tolist()},
+                f,
             )
 
     @classmethod
@@ -193,9 +216,11 @@ class _Variant:
     def __init__(self, name: str, keys: list[str]):
         self.name = name
         self.keys = list(keys)
-        self.features = _encode(self.keys)  # (state, action) -> list[float]
-        self.dim = len(self.keys) + 1  # + bias
+        self.features = _encode(self.keys)  # (state, action) -> feature array
+        self.dim = self.features.dim  # keys + bias
         self.path = Path(__file__).with_name(f"{name}_weights.pkl")
+        self.checkpoint_path = Path(__file__).with_name(f"{name}_checkpoint.pkl")
+        self.metrics_path = Path(__file__).with_name(f"{name}_metrics.jsonl")
 
     def load(self) -> LinearTD:
         return LinearTD.load(self.dim, self.path)
@@ -251,7 +276,82 @@ def td_action_score(state: GameState, action, variant: str) -> float:
     return _model(variant).value(v.features(state, action))
 
 
+def td_action_scores(state: GameState, actions, variant: str) -> np.ndarray:
+    """Values of every action of one decision, in one matrix-vector product."""
+    v = VARIANTS[variant]
+    return _model(variant).values(v.features.matrix(state, actions))
+
+
 # --- training --------------------------------------------------------------- #
+def _transitions(model: LinearTD, v: _Variant, epsilon: float, rng, lap=no_lap):
+    """Play one epsilon-greedy self-play game, yielding its TD transitions
+    ``(player, afterstate features, target)`` as they arise: each player's previous
+    afterstate toward the value of its next one, and at the end every player's
+    last afterstate toward its final money. A generator, so a learner that
+    updates ``model`` between yields plays on with the fresh weights. ``lap``
+    times the stages (see algorithms.training.Metrics)."""
+    from env import LangeStrasseEnv  # local import to avoid an import cycle
+
+    env = LangeStrasseEnv()
+    last_features: dict[int, np.ndarray] = {}  # player -> its last chosen afterstate
+    info = {}
+
+    while not env.done:
+        state = env.observe()
+        player = env.current_player_idx
+        actions = env.legal_actions()
+        lap("env")
+        feats = v.features.matrix(state, actions)
+        lap("encode")
+        values = model.values(feats)
+
+        if rng.random() < epsilon:
+            choice = rng.randrange(len(actions))
+        else:
+            choice = int(np.argmax(values))
+        chosen = feats[choice]
+        lap("eval")
+
+        # Bootstrap: this player's previous afterstate -> value of the new one.
+        if player in last_features:
+            yield player, last_features[player], float(values[choice])
+        last_features[player] = chosen
+
+        _obs, _reward, _done, info = env.step(actions[choice])
+        lap("env")
+
+    # Terminal: pull each player's last afterstate toward its final money.
+    for player, feats in last_features.items():
+        yield player, feats, info["standings"][player]["money"] / MONEY_SCALE
+
+
+def _learn(
+    model: LinearTD, transitions, alpha: float, lam: float, lap=no_lap
+) -> list[float]:
+    """Apply one game's ``(player, features, target)`` transitions in order;
+    returns their TD errors.
+
+    TD(0) updates each afterstate alone. With ``lam > 0`` every seat keeps an
+    eligibility trace over its own afterstates (the chain it bootstraps along),
+    so one error also corrects that seat's earlier afterstates, fading by
+    ``lam`` per step back. There is no discount, so the trace decays by ``lam``
+    alone. The traces start at zero each game."""
+    errors = []
+    if not lam:
+        for _player, features, target in transitions:
+            errors.append(model.update(features, target, alpha))
+            lap("update")
+        return errors
+    traces: dict[int, np.ndarray] = {}
+    for player, features, target in transitions:
+        trace = traces.get(player)
+        if trace is None:
+            trace = traces[player] = np.zeros(len(model.w))
+        errors.append(model.update_traced(trace, features, target, alpha, lam))
+        lap("update")
+    return errors
+
+
 def train(
     model_variant: str,
     alpha: float,
@@ -259,56 +359,256 @@ def train(
     n_games: int,
     seed: "int | None" = None,
     log_every: int = 500,
+    workers: int = 1,
+    lam: float = 0.0,
+    checkpoint_every: int = 0,
+    resume: bool = False,
+    metrics_path=None,
+    metrics_every: int = 100,
 ) -> LinearTD:
-    """Self-play TD(0) for one variant. Continues from saved weights; saves at end."""
+    """Self-play TD(lambda) for one variant (TD(0) by default). Continues from
+    saved weights; saves at end.
+
+    ``workers > 1`` plays the games in that many actor processes feeding one
+    learner (see ``_train_parallel``).
+
+    Every ``checkpoint_every`` games the run so far (weights, RNG state, games
+    played) is written atomically to the variant's checkpoint file, and
+    ``resume`` picks a run up from there: an interrupted run restarted with the
+    same arguments finishes the same ``n_games``, with the same dice as the
+    uninterrupted run when ``workers`` is 1. The checkpoint is removed once the
+    weights are saved. ``metrics_path`` appends telemetry lines (throughput,
+    time split, TD errors) every ``metrics_every`` games."""
     import random
 
-    import log
-    from env import LangeStrasseEnv  # local import to avoid an import cycle
-
     v = VARIANTS[model_variant]
-    log.VERBOSE = False  # silence game output during training
-    if seed is not None:
-        random.seed(seed)
-
     model = v.load()
+    first_game, rng_state = 0, None
+    if resume:
+        checkpoint = load_checkpoint(v.checkpoint_path)
+        if checkpoint is not None:
+            model = LinearTD(v.dim, checkpoint["w"], checkpoint["games"])
+            first_game, rng_state = checkpoint["done"], checkpoint["random"]
+            print(f"  resuming {v.name} after {first_game}/{n_games} games")
+
+    def save(done: int) -> None:
+        state = {"w": model.w.tolist(), "games": model.games_trained}
+        state.update(done=done, random=random.getstate())
+        save_checkpoint(v.checkpoint_path, state)
+
+    metrics = None
+    if metrics_path is not None:
+        metrics = Metrics(metrics_path, metrics_every, model=v.name, lam=lam)
+    try:
+        _self_play(
+            model,
+            v,
+            alpha,
+            epsilon,
+            n_games,
+            seed,
+            log_every,
+            workers,
+            lam,
+            first_game=first_game,
+            rng_state=rng_state,
+            checkpoint=save if checkpoint_every else None,
+            checkpoint_every=checkpoint_every,
+            metrics=metrics,
+        )
+    finally:
+        if metrics is not None:
+            metrics.close()
 
-    for game_i in range(1, n_games + 1):
-        env = LangeStrasseEnv()
-        last_features: dict[int, list[float]] = {}  # player -> its last chosen afterstate
-        info = {}
+    model.games_trained += n_games
+    model.save(v.path)
+    v.checkpoint_path.unlink(missing_ok=True)  # finished: nothing to resume
+    _MODELS[v.name] = model  # so same-process evaluation uses the fresh weights
+    return model
 
-        while not env.done:
-            state = env.observe()
-            player = env.current_player_idx
-            actions = env.legal_actions()
-            feats = [v.features(state, a) for a in actions]
 
-            if random.random() < epsilon:
-                choice = random.randrange(len(actions))
-            else:
-                choice = max(range(len(actions)), key=lambda j: model.value(feats[j]))  # type: ignore
-            chosen = feats[choice]
+def _self_play(
+    model,
+    v,
+    alpha,
+    epsilon,
+    n_games,
+    seed=None,
+    log_every=0,
+    workers=1,
+    lam=0.0,
+    first_game=0,
+    rng_state=None,
+    checkpoint=None,
+    checkpoint_every=0,
+    metrics=None,
+) -> None:
+    """Train ``model`` in place on self-play games ``first_game..n_games-1``,
+    calling ``checkpoint(games done)`` every ``checkpoint_every`` games."""
+    import random
 
-            # Bootstrap: this player's previous afterstate -> value of the new one.
-            if player in last_features:
-                model.update(last_features[player], model.value(chosen), alpha)
-            last_features[player] = chosen
+    import log
 
-            _obs, _reward, _done, info = env.step(actions[choice])
+    log.VERBOSE = False  # silence game output during training
+    if rng_state is not None:
+        random.setstate(rng_state)
+    elif seed is not None:
+        random.seed(seed)
 
-        # Terminal: pull each player's last afterstate toward its final money.
-        for player, feats in last_features.items():
-            target = info["standings"][player]["money"] / MONEY_SCALE
-            model.update(feats, target, alpha)
+    if workers > 1:
+        _train_parallel(
+            model,
+            v,
+            alpha,
+            epsilon,
+            n_games,
+            seed,
+            log_every,
+            workers,
+            lam,
+            first_game,
+            checkpoint,
+            checkpoint_every,
+            metrics,
+        )
+        return
+    lap = metrics.lap if metrics is not None else no_lap
+    for game_i in range(first_game + 1, n_games + 1):
+        transitions = _transitions(model, v, epsilon, random, lap)
+        errors = _learn(model, transitions, alpha, lam, lap)
+        if metrics is not None:
+            metrics.errors(errors)
+            metrics.game(game_i, len(errors))
+        if checkpoint is not None and game_i % checkpoint_every == 0:
+            checkpoint(game_i)
+            lap("checkpoint")
 
         if log_every and game_i % log_every == 0:
             print(f"  ...{game_i}/{n_games} games")
 
-    model.games_trained += n_games
-    model.save(v.path)
-    _MODELS[v.name] = model  # so same-process evaluation uses the fresh weights
-    return model
+
+# --- parallel self-play: actors play, one learner updates -------------------- #
+# Actors play with a copy of the weights, refreshed from shared memory every
+# _SYNC_EVERY games, and send each game's transitions to the learner as one
+# (players, features matrix, targets, time split) message. The learner applies
+# them in arrival order and republishes the weights after every game. Bootstrap
+# targets are computed with the actor's (slightly stale) copy -- the usual
+# actor/learner trade of a little off-policy lag for throughput that scales
+# with the actor count.
+_SYNC_EVERY = 4
+# Seconds the learner waits on the queue before checking that the actors live.
+_ACTOR_CHECK_EVERY = 5.0
+
+
+def _actor(name, epsilon, seed, shared_w, claimed, n_games, queue, timed) -> None:
+    import random
+
+    import log
+
+    log.VERBOSE = False
+    random.seed(seed)  # dice and exploration: a stream of its own per actor
+    v = VARIANTS[name]
+    model = LinearTD(v.dim)
+    weights = np.frombuffer(shared_w.get_obj())
+    metrics = Metrics() if timed else None
+    lap = metrics.lap if timed else no_lap
+    played = 0
+    while True:
+        with claimed.get_lock():
+            if claimed.value >= n_games:
+                break
+            claimed.value += 1
+        if played % _SYNC_EVERY == 0:
+            with shared_w.get_lock():
+                model.w = weights.copy()
+        rows = list(_transitions(model, v, epsilon, random, lap))
+        players, features, targets = zip(*rows)
+        seconds = metrics.take_seconds() if timed else None
+        queue.put((players, np.array(features), np.array(targets), seconds))
+        played += 1
+    queue.put(None)
+
+
+def _train_parallel(
+    model,
+    v,
+    alpha,
+    epsilon,
+    n_games,
+    seed,
+    log_every,
+    workers,
+    lam,
+    first_game=0,
+    checkpoint=None,
+    checkpoint_every=0,
+    metrics=None,
+):
+    import multiprocessing
+    import random
+    from queue import Empty
+
+    ctx = multiprocessing.get_context()
+    shared_w = ctx.Array("d", len(model.w))
+    weights = np.frombuffer(shared_w.get_obj())
+    weights[:] = model.w
+    claimed = ctx.Value("l", first_game)
+    queue = ctx.Queue(maxsize=8 * workers)
+    base = seed if seed is not None else random.randrange(2**32)
+    timed = metrics is not None
+    actors = [
+        ctx.Process(
+            target=_actor,
+            args=(v.name, epsilon, f"{base}:{i}:{first_game}", shared_w, claimed),
+            kwargs={"n_games": n_games, "queue": queue, "timed": timed},
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for actor in actors:
+        actor.start()
+
+    lap = metrics.lap if timed else no_lap
+    game_i, running = first_game, workers
+    try:
+        while running:
+            try:
+                message = queue.get(timeout=_ACTOR_CHECK_EVERY)
+            except Empty:
+                _check_actors(actors)
+                continue
+            lap("queue")
+            if message is None:
+                running -= 1
+                continue
+            players, features, targets, seconds = message
+            errors = _learn(model, zip(players, features, targets), alpha, lam, lap)
+            with shared_w.get_lock():
+                weights[:] = model.w
+            game_i += 1
+            if timed:
+                metrics.add_seconds(seconds)
+                metrics.errors(errors)
+                metrics.game(game_i, len(errors))
+            if checkpoint is not None and game_i % checkpoint_every == 0:
+                checkpoint(game_i)
+                lap("checkpoint")
+            if log_every and game_i % log_every == 0:
+                print(f"  ...{game_i}/{n_games} games")
+    finally:
+        for actor in actors:
+            actor.join(timeout=1)
+            if actor.is_alive():
+                actor.terminate()
+
+
+def _check_actors(actors) -> None:
+    """Raise if an actor died: it will never send its games or its sentinel, so
+    waiting on would hang the learner."""
+    for actor in actors:
+        if actor.exitcode not in (None, 0):
+            code = actor.exitcode
+            raise RuntimeError(f"TD actor {actor.name} died (exit code {code})")
 
 
 def _evaluate(model, games: int = 300) -> None:
@@ -326,15 +626,128 @@ def _evaluate(model, games: int = 300) -> None:
         print(f"  {algo:8s}: {wins[algo]:3d} ({wins[algo] / games:.0%})")
 
 
-def run_training(model_variant, alpha, epsilon, n_games):
+def benchmark_lambda(
+    model_variant: str = "td_min",
+    lams=(0.0, 0.5, 0.8),
+    n_games: int = 4000,
+    every: int = 500,
+    alpha: float = 0.01,
+    epsilon: float = 0.1,
+    eval_games: int = 300,
+    seed: int = 0,
+) -> dict[float, list[tuple[int, float, float]]]:
+    """Games-to-strength of TD(lambda) against TD(0): train a fresh model per
+    ``lam`` on the same self-play dice, and every ``every`` games score it
+    against dp and simple in duplicate play (the same deals at every
+    checkpoint). Strength is the model's paired ¢/game minus dp's; returns each
+    ``lam``'s curve as ``[(games, strength, interval half-width)]`` and prints
+    the first checkpoint not significantly below dp. The saved weights are not
+    touched."""
+    import log
+    import play
+    from stats import MoneyTracker
+
+    v = VARIANTS[model_variant]
+    lineup = [v.name, "dp", "simple"]
+    saved = _MODELS.get(v.name)
+    curves: dict[float, list[tuple[int, float, float]]] = {}
+    try:
+        for lam in lams:
+            model = LinearTD(v.dim)
+            _MODELS[v.name] = model  # the players below play with it
+            curve = curves[lam] = []
+            for games in range(every, n_games + 1, every):
+                chunk_seed = f"{seed}:{games}"  # the same dice for every lam
+                _self_play(model, v, alpha, epsilon, every, chunk_seed, lam=lam)
+                log.VERBOSE = False
+                tracker = MoneyTracker(lineup)
+                play.run_matchup(
+                    eval_games, lineup, seed, duplicate=True, on_game=tracker.add
+                )
+                curve.append((games, *tracker.difference(v.name, "dp")))
+    finally:
+        if saved is None:
+            _MODELS.pop(v.name, None)
+        else:
+            _MODELS[v.name] = saved
+
+    print(f"\n{v.name} ¢/game minus dp's, by self-play games trained:")
+    print("  lambda " + "".join(f"{games:>8d}" for games, *_ in curves[lams[0]]))
+    for lam, curve in curves.items():
+        reached = next((games for games, gap, half in curve if gap + half >= 0), None)
+        row = "".join(f"{gap:+8.1f}" for _, gap, _half in curve)
+        print(f"  {lam:6.2f} {row}   dp-level after: {reached or f'>{n_games}'}")
+    return curves
+
+
+def run_training(model_variant, alpha, epsilon, n_games, **options):
+    """Train (``options`` as for ``train``), report, and evaluate."""
     import time
 
     print(f"Training {model_variant} by self-play for {n_games} games...")
     start = time.perf_counter()
-    model = train(model_variant, alpha, epsilon, n_games)
+    model = train(model_variant, alpha, epsilon, n_games, **options)
     print(
         f"Done in {time.perf_counter() - start:.1f}s. "
         f"Model now trained on {model.games_trained} games total, "
         f"saved to {VARIANTS[model_variant].path.name}."
     )
     _evaluate(model_variant)
+
+
+def main(argv=None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train a TD model by self-play.")
+    parser.add_argument("variant", nargs="?", default="td_full", choices=VARIANTS)
+    parser.add_argument("games", nargs="?", type=int, default=1000)
+    parser.add_argument("workers", nargs="?", type=int, default=1)
+    parser.add_argument("lam", nargs="?", type=float, default=0.0, metavar="lambda")
+    parser.add_argument("--alpha", type=float, default=0.01)
+    parser.add_argument("--epsilon", type=float, default=0.1)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=0,
+        metavar="GAMES",
+        help="write a resumable checkpoint every GAMES games",
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="continue from the last checkpoint"
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="append JSON-lines telemetry to FILE (default <variant>_metrics.jsonl)",
+    )
+    parser.add_argument("--metrics-every", type=int, default=100, metavar="GAMES")
+    args = parser.parse_args(argv)
+    if args.metrics == "":
+        args.metrics = VARIANTS[args.variant].metrics_path
+    run_training(
+        args.variant,
+        args.alpha,
+        args.epsilon,
+        args.games,
+        seed=args.seed,
+        workers=args.workers,
+        lam=args.lam,
+        checkpoint_every=args.checkpoint_every,
+        resume=args.resume,
+        metrics_path=args.metrics,
+        metrics_every=args.metrics_every,
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:2] == ["benchmark"]:
+        model_variant = sys.argv[2] if len(sys.argv) > 2 else "td_min"
+        n_games = int(sys.argv[3]) if len(sys.argv) > 3 else 4000
+        benchmark_lambda(model_variant, n_games=n_games)
+        sys.exit()
+    main()
@@ -0,0 +1,146 @@
+"""Checkpoints and telemetry shared by the self-play trainers (td, nn).
+
+Checkpoints are pickled dicts written atomically: to a temporary file beside
+the target, flushed to disk, then renamed over it. A crash mid-write leaves the
+previous checkpoint whole, never a torn one, so a long run can always resume
+from its last checkpoint.
+
+``Metrics`` appends one JSON object per line to a file every ``every`` games:
+throughput (games/s, decisions/s), where the time went, and statistics of the
+TD errors seen since the previous line. Time is split by laps: the trainer
+calls ``lap(section)`` at each boundary, charging the time since the previous
+lap to ``section`` (``env`` stepping, feature ``encode``, model ``eval``,
+weight ``update``, ``checkpoint`` writing; a parallel learner adds ``queue``
+for waiting on actors).
+Laps cost a clock read each; a trainer without metrics passes ``no_lap``. In
+parallel training each actor times its own games (a file-less ``Metrics``) and
+the learner adds them up, so the sections are CPU seconds summed over processes.
+"""
+
+import json
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+def save_checkpoint(path: Path, data: dict) -> None:
+    """Pickle ``data`` to ``path`` atomically."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def load_checkpoint(path: Path) -> "dict | None":
+    """The checkpoint at ``path``, or None if there is none."""
+    if not path.exists():
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def no_lap(section: str) -> None:
+    """Stand-in for ``Metrics.lap`` when a run keeps no metrics."""
+
+
+class Metrics:
+    """Training telemetry as JSON lines (see the module docstring).
+
+    ``fields`` (e.g. the variant and learning rate) are repeated on every line,
+    so the lines of several runs appended to one file stay tellable apart.
+    With ``path=None`` it only collects (see ``take_seconds``).
+    """
+
+    def __init__(self, path=None, every: int = 100, **fields):
+        self.path = Path(path) if path is not None else None
+        self.every = every
+        self.fields = fields
+        self._file = open(self.path, "a") if path is not None else None
+        self._last = time.perf_counter()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._window = time.perf_counter()
+        self.seconds = dict.fromkeys(("env", "encode", "eval", "update"), 0.0)
+        self.games = 0
+        self.decisions = 0
+        self._errors: list = []
+
+    def lap(self, section: str) -> None:
+        """Charge the time since the previous lap to ``section``."""
+        now = time.perf_counter()
+        self.seconds[section] = self.seconds.get(section, 0.0) + now - self._last
+        self._last = now
+
+    def take_seconds(self) -> dict:
+        """The time split so far, restarting it from zero."""
+        seconds = self.seconds
+        self.seconds = dict.fromkeys(seconds, 0.0)
+        return seconds
+
+    def add_seconds(self, seconds: dict) -> None:
+        """Add time measured elsewhere (e.g. in an actor process)."""
+        for section, s in seconds.items():
+            self.seconds[section] = self.seconds.get(section, 0.0) + s
+
+    def errors(self, errors) -> None:
+        """Record TD errors: one float or an array of them."""
+        self._errors.append(errors)
+
+    def game(self, games_done: int, decisions: int) -> None:
+        """Count one finished game; writes a line every ``every`` games."""
+        self.games += 1
+        self.decisions += decisions
+        if games_done % self.every == 0:
+            self.write(games_done)
+
+    def write(self, games_done: int, **extra) -> None:
+        """Write the line for the games since the previous one, and start anew."""
+        elapsed = max(time.perf_counter() - self._window, 1e-9)
+        line = {
+            **self.fields,
+            "time": round(time.time(), 3),
+            "games": games_done,
+            "games_per_s": round(self.games / elapsed, 3),
+            "decisions_per_s": round(self.decisions / elapsed, 1),
+            "seconds": {k: round(s, 4) for k, s in self.seconds.items()},
+            "td_error": _error_stats(self._errors),
+            **extra,
+        }
+        self._file.write(json.dumps(line) + "\n")
+        self._file.flush()
+        self._reset()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _error_stats(errors: list) -> "dict | None":
+    if not errors:
+        return None
+    e = np.hstack(errors).astype(float)
+    return {
+        "n": len(e),
+        "mean": round(float(e.mean()), 5),
+        "mean_abs": round(float(np.abs(e).mean()), 5),
+        "rms": round(float(np.sqrt((e * e).mean())), 5),
+        "max_abs": round(float(np.abs(e).max()), 5),
+    }
@@ -12,26 +12,40 @@ multi-player and turn-based, consecutive steps may belong to different seats, so
 each ``step`` reports which seat acted (``info["actor"]``) for reward attribution.
 Forced turn-endings (dead roll / Totale) are auto-resolved so every observation
 handed back is a real decision point.
+
+``VecEnv`` is the batched counterpart for learners that want many decisions at
+once: N games on game.vec_game.VecGame, stepped in lockstep, with stacked
+observations, a padded action mask, per-game actor/reward arrays, and finished
+games restarted on the spot.
 """
 
+import numpy as np
+
 from game.game import Game
-from game.rules import Action
-from game_state import GameState, StateExtractor
+from game.rules import Action, unpack, unpack_groups
+from game.vec_game import VecGame
+from game_state import GameState, PlayerState, StateExtractor
 
 
 class LangeStrasseEnv:
     """One ``step`` == one player's single keep/stop decision."""
 
-    def __init__(self):
+    def __init__(self, recorder=None):
+        self.recorder = recorder  # optional game.record.GameRecorder
         self.reset()
 
     # ------------------------------------------------------------------ #
     # Core API
     # ------------------------------------------------------------------ #
-    def reset(self) -> GameState:
-        """Start a fresh game and return the first decision-point observation."""
-        self.game = Game()  # plain players; actions come via step()
+    def reset(self, seed=None) -> GameState:
+        """Start a fresh game and return the first decision-point observation.
+
+        With a ``seed`` the game rolls ``Game(dice_seed=seed)``'s dice, and its
+        record (if any) carries the seed to replay it by (see game.record)."""
+        self.game = Game(dice_seed=seed)  # plain players; actions come via step()
         self.game.advance_to_decision()
+        if self.recorder is not None:
+            self.recorder.begin(-1 if seed is None else seed)
         return self.observe()
 
     def observe(self) -> GameState:
@@ -57,16 +71,22 @@ class LangeStrasseEnv:
         """
         actor = self.game.current_player_idx
         money_before = self.game.players[actor].money
+        if self.recorder is not None:
+            state, actions = self.observe(), self.legal_actions()
 
         success, result = self.game.apply_action(action)
         if not success:
             raise ValueError(f"Illegal action {action} was passed to step(): {result}")
+        if self.recorder is not None:
+            self.recorder.record(state, actions, action)
 
         self.game.advance_to_decision()
 
         reward = self.game.players[actor].money - money_before
         info = {"actor": actor, "result": result}
         if self.done:
+            if self.recorder is not None:
+                self.recorder.end_game(self.game)
             info["standings"] = self.standings()
             info["final_turn_number"] = self.game.turn_number  # round-10 bonus label
             return None, reward, True, info
@@ -84,3 +104,126 @@ class LangeStrasseEnv:
             }
             for p in self.game.players
         ]
+
+
+class VecEnv:
+    """``n_envs`` games in lockstep; one ``step`` == one decision in every game.
+
+    Every slot always holds a live decision: a game that ends during ``step`` is
+    reported (``dones`` and the ``final_*`` entries of ``info``) and replaced by
+    a fresh game in the same call.
+    """
+
+    def __init__(self, n_envs: int, seed=None):
+        self.n_envs = n_envs
+        self.game = VecGame(n_envs, seed)
+        self._legal = None  # (actions, keeps, stops, mask) for the current decisions
+
+    # ------------------------------------------------------------------ #
+    # Core API
+    # ------------------------------------------------------------------ #
+    def reset(self) -> dict[str, np.ndarray]:
+        """Restart every game and return the stacked first observations."""
+        self.game.reset()
+        self._legal = None
+        return self.observe()
+
+    def observe(self) -> dict[str, np.ndarray]:
+        """The GameState fields of every game, stacked (one row per game; dice as
+        packed codes, per-seat fields as ``[game, seat]``)."""
+        g = self.game
+        return {
+            "available": g.available.copy(),
+            "kept": g.kept.copy(),
+            "accumulated": g.accumulated.copy(),
+            "roll_count": g.roll_count.copy(),
+            "scores": g.scores.copy(),
+            "money": g.money.copy(),
+            "strich": g.strich.copy(),
+            "current": g.current.copy(),
+            "turn": g.turn.copy(),
+            "final_round": g.final_round.copy(),
+        }
+
+    def states(self) -> list[GameState]:
+        """Each game's decision as a GameState, for the per-state feature encoders."""
+        g = self.game
+        return [
+            GameState(
+                available_dice=unpack(int(g.available[i])),
+                kept_groups=unpack_groups(int(g.kept[i])),
+                turn_accumulated_score=int(g.accumulated[i]),
+                roll_count=int(g.roll_count[i]),
+                players=[
+                    PlayerState(int(score), bool(strich), int(money))
+                    for score, strich, money in zip(g.scores[i], g.strich[i], g.money[i])
+                ],
+                current_player_idx=int(g.current[i]),
+                starting_player_idx=0,
+                turn_number=int(g.turn[i]),
+                is_final_round=bool(g.final_round[i]),
+            )
+            for i in range(self.n_envs)
+        ]
+
+    def legal_actions(self) -> tuple[list[list[Action]], np.ndarray]:
+        """Every game's legal actions (game.rules.legal_actions order) and the
+        ``[game, slot]`` mask of real ones, padded to the widest game."""
+        if self._legal is None:
+            options = [self.game.legal_actions(i) for i in range(self.n_envs)]
+            width = max(map(len, options))
+            keeps = np.zeros((self.n_envs, width), dtype=np.int64)
+            stops = np.zeros((self.n_envs, width), dtype=bool)
+            mask = np.zeros((self.n_envs, width), dtype=bool)
+            for i, game_options in enumerate(options):
+                n = len(game_options)
+                keeps[i, :n], stops[i, :n] = zip(*game_options)
+                mask[i, :n] = True
+            actions = [
+                [Action(unpack(keep), stop) for keep, stop in game_options]
+                for game_options in options
+            ]
+            self._legal = (actions, keeps, stops, mask)
+        actions, _keeps, _stops, mask = self._legal
+        return actions, mask
+
+    @property
+    def actors(self) -> np.ndarray:
+        """The seat to act in each game."""
+        return self.game.current.copy()
+
+    def step(self, choices):
+        """Apply action ``choices[i]`` (an index into ``legal_actions()[0][i]``)
+        in every game.
+
+        Returns ``(obs, rewards, dones, info)``: the stacked next observations
+        (fresh games where one ended), each actor's own money change, which games
+        ended, and ``info`` with ``actor`` plus -- meaningful where ``dones`` --
+        ``final_scores``, ``final_money`` (``[game, seat]``) and
+        ``final_turn_number``.
+        """
+        choices = np.asarray(choices, dtype=np.int64)
+        self.legal_actions()
+        _actions, keeps, stops, mask = self._legal
+        rows = np.arange(self.n_envs)
+        legal = (choices >= 0) & (choices < mask.shape[1])
+        legal[legal] = mask[rows[legal], choices[legal]]
+        if not legal.all():
+            bad = int(np.flatnonzero(~legal)[0])
+            raise ValueError(f"Illegal choice {choices[bad]} for game {bad}")
+
+        g = self.game
+        actor = g.current.copy()
+        delta = g.step(keeps[rows, choices], stops[rows, choices])
+        rewards = delta[rows, actor]
+        dones = g.done.copy()
+        info = {
+            "actor": actor,
+            "final_scores": g.scores.copy(),
+            "final_money": g.money.copy(),
+            "final_turn_number": g.turn.copy(),
+        }
+        if dones.any():
+            g.reset(dones)
+        self._legal = None
+        return self.observe(), rewards, dones, info
@@ -4,6 +4,7 @@ All rule questions (what may be kept, what it scores, which actions exist) are
 answered by game.rules; this module only holds state and turn/money flow.
 """
 
+import copy
 import random
 from collections import Counter
 
@@ -19,7 +20,7 @@ from game.rules import (
     score_groups,
     talheim_score,
 )
-from log import log
+from log import DEBUG, enabled, log
 
 
 class Player:
@@ -38,16 +39,21 @@ class Player:
         """Add money (can be negative for losses)."""
         self.money += cents
         if cents > 0:
-            log(f"💰 {self.name} gains {cents}¢!")
+            log("💰 %s gains %d¢!", self.name, cents, level=DEBUG)
         else:
-            log(f"💸 {self.name} loses {abs(cents)}¢!")
+            log("💸 %s loses %d¢!", self.name, -cents, level=DEBUG)
 
 
 class DiceSet:
     """The dice of one player's turn: the current roll, the kept groups, and
-    the turn's score state."""
+    the turn's score state.
 
-    def __init__(self):
+    Dice come from ``rng`` (anything with ``randint``; the global ``random``
+    module by default), which Game swaps per turn for duplicate play.
+    """
+
+    def __init__(self, rng=random):
+        self.rng = rng
         self.reset_for_new_turn()
 
     def reset_for_new_turn(self):
@@ -67,7 +73,7 @@ class DiceSet:
     # Rolling
     # ------------------------------------------------------------------ #
     def _roll(self, n):
-        self.available = [random.randint(1, 6) for _ in range(n)]
+        self.available = [self.rng.randint(1, 6) for _ in range(n)]
         self.roll_count += 1
         self._check_bust()
 
@@ -138,7 +144,7 @@ class DiceSet:
         talheim = talheim_score(kept_values)
         if talheim:
             self.turn_over = True
-            log(f"🎯 TALHEIM! Three pairs worth {talheim} points! 🎯")
+            log("🎯 TALHEIM! Three pairs worth %d points! 🎯", talheim)
             return True, f"Talheim! Turn ends with {self.total_turn_score} points"
 
         if is_lange_strasse(kept_values):
@@ -156,7 +162,7 @@ class DiceSet:
         if not self.available:
             # Hot dice: all six kept -- bank this set and roll a fresh six.
             self.turn_accumulated_score += self.current_set_score
-            log(f"All 6 dice kept! Turn total so far: {self.turn_accumulated_score}")
+            log("All 6 dice kept! Turn total so far: %d", self.turn_accumulated_score)
             self.kept_groups = []
             self.roll_count = 0
             self._roll(NUM_DICE)
@@ -185,8 +191,10 @@ class DiceSet:
 
     def display(self):
         """Log the current dice state (silent unless verbose logging is on)."""
+        if not enabled(DEBUG):
+            return
         if self.turn_over:
-            log("\nTurn over! Score: 0 points (no valid moves)")
+            log("\nTurn over! Score: 0 points (no valid moves)", level=DEBUG)
             return
 
         if self.kept_groups:
@@ -196,20 +204,37 @@ class DiceSet:
                     shown.append(f"[{', '.join(map(str, sorted(group)))}]")
                 else:
                     shown.extend(map(str, sorted(group)))
-            log(f"Kept dice: {', '.join(shown)}")
+            log(f"Kept dice: {', '.join(shown)}", level=DEBUG)
 
-        log(f"Available dice: {', '.join(map(str, sorted(self.available)))}")
+        available = ", ".join(map(str, sorted(self.available)))
+        log(f"Available dice: {available}", level=DEBUG)
         if self.turn_accumulated_score:
-            log(f"Current set score: {self.current_set_score} points")
-        log(f"🧩 Total turn score: {self.total_turn_score} points")
+            log(f"Current set score: {self.current_set_score} points", level=DEBUG)
+        log(f"🧩 Total turn score: {self.total_turn_score} points", level=DEBUG)
+
+
+def _copy_rng(rng) -> random.Random:
+    """A generator in ``rng``'s state (a ``random.Random`` or the module)."""
+    copied = random.Random()
+    copied.setstate(rng.getstate())
+    return copied
 
 
 class Game:
     """Game controller for 3-player Lange Strasse: turn order, win condition,
-    and the money economy."""
+    and the money economy.
+
+    With a ``dice_seed`` every turn rolls from its own stream, seeded by
+    ``(dice_seed, seat, turn number)``: the same deal replayed with the players
+    reseated gives each seat the same dice, turn by turn, whoever sits there and
+    however the earlier turns went (duplicate play, see play.run_matchup).
+    Without one, turns roll from ``rng`` (the global ``random`` module).
+    """
 
-    def __init__(self, players=None):
+    def __init__(self, players=None, dice_seed=None):
         self.players = players or [Player(f"Player {i + 1}") for i in range(3)]
+        self.dice_seed = dice_seed
+        self.rng = random
         self.current_player_idx = 0
         self.starting_player_idx = 0
         self.turn_number = 1
@@ -217,12 +242,36 @@ class Game:
         self.game_over = False
         self.winner = None
         self._announce_turn()
-        self.dice_set = DiceSet()
+        self.dice_set = DiceSet(self._turn_rng())
 
     @property
     def current_player(self):
         return self.players[self.current_player_idx]
 
+    def clone(self, rng=None):
+        """A copy of the game as it stands, to play on without touching this one
+        (e.g. a rollout). Cheap: the players are shallow copies, the dice lists
+        are copied, and nothing is rolled or logged. With ``rng`` the copy rolls
+        every die from it (dropping ``dice_seed``), so its future is its own;
+        without, it rolls from copies of this game's dice streams -- the dice
+        this game would roll, never drawn from its streams."""
+        game = Game.__new__(Game)
+        game.__dict__.update(self.__dict__)
+        game.players = [copy.copy(p) for p in self.players]
+        if self.winner is not None:
+            game.winner = game.players[self.players.index(self.winner)]
+        dice_set = game.dice_set = copy.copy(self.dice_set)
+        dice_set.available = list(dice_set.available)
+        dice_set.kept_groups = [group[:] for group in dice_set.kept_groups]
+        if rng is not None:
+            game.dice_seed = None
+            game.rng = dice_set.rng = rng
+        else:
+            game.rng = _copy_rng(self.rng)
+            shared = self.dice_set.rng is self.rng
+            dice_set.rng = game.rng if shared else _copy_rng(self.dice_set.rng)
+        return game
+
     # ------------------------------------------------------------------ #
     # Money
     # ------------------------------------------------------------------ #
@@ -288,12 +337,12 @@ class Game:
         if turn_score == 0:
             player.has_strich = True
 
-        log(f"\n{player.name} scored {turn_score} points this turn!")
-        log(f"{player.name}'s total score: {player.total_score}")
+        log("\n%s scored %d points this turn!", player.name, turn_score)
+        log("%s's total score: %d", player.name, player.total_score)
 
         if player.total_score >= 10000 and not self.final_round:
             self.final_round = True
-            log(f"\n{player.name} reached 10,000 points!")
+            log("\n%s reached 10,000 points!", player.name)
             log("⚡ FINAL ROUND! Everyone left gets one last turn. ⚡")
 
         next_idx = (self.current_player_idx + 1) % len(self.players)
@@ -308,9 +357,18 @@ class Game:
 
     def start_new_turn(self):
         self._announce_turn()
+        self.dice_set.rng = self._turn_rng()
         self.dice_set.reset_for_new_turn()
 
+    def _turn_rng(self):
+        if self.dice_seed is None:
+            return self.rng
+        seat, turn = self.current_player_idx, self.turn_number
+        return random.Random(f"{self.dice_seed}:{seat}:{turn}")
+
     def _announce_turn(self):
+        if not enabled():
+            return
         log(f"\n--- {self.current_player.name}'s turn ---")
         scores = ", ".join(f"{p.name}: {p.total_score}" for p in self.players)
         log(f"Current scores: {scores}")
@@ -328,28 +386,34 @@ class Game:
         self._transfer(third, winner, 70)
 
         if self.turn_number <= 10:
-            log(f"🎉 {winner.name} won by round {self.turn_number}! Early win bonus!")
+            log(
+                "🎉 %s won by round %d! Early win bonus!", winner.name, self.turn_number
+            )
             self._collect_from_others(winner, 50)
 
         no_strich_players = [p for p in self.players if not p.has_strich]
         if no_strich_players:
             log(
-                f"🍀 No-strich bonus for: {', '.join(p.name for p in no_strich_players)}"
+                lambda: "🍀 No-strich bonus for: "
+                + ", ".join(p.name for p in no_strich_players)
             )
             for player in no_strich_players:
                 self._collect_from_others(player, 50)
 
         for player in self.players:
             if player is not winner and player.total_score < 5000:
-                log(f"💸 {player.name} pays extra 50¢ for being under 5000 points!")
+                log("💸 %s pays extra 50¢ for being under 5000 points!", player.name)
                 self._transfer(player, winner, 50)
 
         self.winner = winner
         self.game_over = True
-        log(f"\n🎉 GAME OVER! {winner.name} wins! 🎉")
+        log("\n🎉 GAME OVER! %s wins! 🎉", winner.name)
         log("Final scores:")
         for i, player in enumerate(ranked, 1):
             log(
-                f"{i}. {player.describe()}: {player.total_score} points "
-                f"(Money: {player.money}¢)"
+                "%d. %s: %d points (Money: %d¢)",
+                i,
+                player.describe(),
+                player.total_score,
+                player.money,
             )
@@ -0,0 +1,263 @@
+"""Compact append-only game records, readable back as memory-mapped NumPy arrays.
+
+A record store is two files side by side, each a 16-byte header followed by
+fixed-width little-endian records:
+
+- ``<stem>.decisions``: one ``DECISION_DTYPE`` row per decision -- the full
+  decision state (dice as packed codes, see game.rules), the seat that acted,
+  and the index of the chosen action in game.rules.legal_actions order.
+- ``<stem>.games``: one ``GAME_DTYPE`` row per finished game -- its seed and
+  number, where its decisions are, and the final standings.
+
+A game's decisions are buffered and written just before its game row, so an
+interrupted writer leaves at most some unreferenced decision rows and never a
+game pointing at missing ones; a torn last row is ignored on reading.
+
+Every row is enough to rebuild the decision exactly (``state_from_row``,
+``action_from_row``), so stored games can be replayed for offline training
+without the engine. A game row's seed and number say where its dice came from:
+a game LangeStrasseEnv.reset(seed) played rolls ``Game(dice_seed=seed)``'s dice,
+which ``replay`` plays the recorded decisions on again; a game of
+play.run_matchup is game ``number`` of the matchup seeded ``seed``.
+"""
+
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from game.rules import legal_actions, pack, pack_groups, unpack, unpack_groups
+from game_state import GameState, PlayerState, StateExtractor
+
+_HEADER = struct.Struct("<4sII4x")  # magic, version, record size
+_VERSION = 1
+_DECISIONS_MAGIC = b"LSRD"
+_GAMES_MAGIC = b"LSRG"
+
+DECISION_DTYPE = np.dtype(
+    [
+        ("game", "<u4"),  # row in the games file
+        ("available", "<u4"),  # packed roll
+        ("kept", "<u8"),  # packed kept configuration
+        ("accumulated", "<i4"),  # banked earlier this turn
+        ("scores", "<i4", 3),
+        ("money", "<i4", 3),
+        ("turn", "<u2"),
+        ("roll_count", "u1"),
+        ("actor", "u1"),
+        ("strich", "u1"),  # bit per seat
+        ("final_round", "u1"),
+        ("action", "u1"),  # index into legal_actions(available, kept)
+        ("n_actions", "u1"),
+    ]
+)
+
+GAME_DTYPE = np.dtype(
+    [
+        ("seed", "<i8"),  # -1: unknown
+        ("number", "<i8"),  # the game's number under that seed (play.run_matchup's g)
+        ("first_decision", "<u8"),
+        ("n_decisions", "<u4"),
+        ("scores", "<i4", 3),
+        ("money", "<i4", 3),
+        ("turn", "<u2"),
+        ("winner", "u1"),
+        ("strich", "u1"),
+    ]
+)
+
+
+def _paths(stem) -> tuple[Path, Path]:
+    stem = Path(stem)
+    return stem.with_name(f"{stem.name}.decisions"), stem.with_name(f"{stem.name}.games")
+
+
+def _strich_bits(flags) -> int:
+    return sum(1 << seat for seat, flag in enumerate(flags) if flag)
+
+
+class GameRecorder:
+    """Appends games to the record store at ``stem`` (created if missing).
+
+    Call ``record(state, actions, action)`` at each decision and
+    ``end_game(game)`` once it is over; ``begin(seed, number)`` first tags the
+    game (and drops anything recorded for an abandoned one).
+    """
+
+    def __init__(self, stem):
+        decisions_path, games_path = _paths(stem)
+        self._decisions, self._n_decisions = _open_append(
+            decisions_path, _DECISIONS_MAGIC, DECISION_DTYPE
+        )
+        self._games, self._n_games = _open_append(games_path, _GAMES_MAGIC, GAME_DTYPE)
+        self.begin()
+
+    def begin(self, seed: int = -1, number: int = -1) -> None:
+        """Start a new game record (``number`` defaults to the game's row)."""
+        self._seed, self._number = seed, number
+        self._pending: list[tuple] = []
+
+    def record(self, state, actions, action) -> None:
+        """One decision: ``state`` (a GameState), its legal ``actions`` and the
+        one chosen (its dice in any order)."""
+        index = _action_index(actions, action)
+        self._pending.append(
+            (self._n_games, *_decision_fields(state), index, len(actions))
+        )
+
+    def end_game(self, game) -> None:
+        """Write the buffered decisions and the finished ``game``'s row."""
+        players = game.players
+        rows = np.array(self._pending, dtype=DECISION_DTYPE)
+        self._decisions.write(rows.tobytes())
+        number = self._number if self._number >= 0 else self._n_games
+        row = np.array(
+            [
+                (
+                    self._seed,
+                    number,
+                    self._n_decisions,
+                    len(rows),
+                    [p.total_score for p in players],
+                    [p.money for p in players],
+                    game.turn_number,
+                    players.index(game.winner),
+                    _strich_bits(p.has_strich for p in players),
+                )
+            ],
+            dtype=GAME_DTYPE,
+        )
+        self._games.write(row.tobytes())
+        self._n_decisions += len(rows)
+        self._n_games += 1
+        self.begin()
+
+    def flush(self) -> None:
+        self._decisions.flush()
+        self._games.flush()
+
+    def close(self) -> None:
+        self._decisions.close()
+        self._games.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _decision_fields(state) -> tuple:
+    """The ``DECISION_DTYPE`` fields that describe ``state``, in order."""
+    players = state.players
+    return (
+        pack(state.available_dice),
+        pack_groups(state.kept_groups),
+        state.turn_accumulated_score,
+        [p.total_score for p in players],
+        [p.money for p in players],
+        state.turn_number,
+        state.roll_count,
+        state.current_player_idx,
+        _strich_bits(p.has_strich for p in players),
+        state.is_final_round,
+    )
+
+
+def _action_index(actions, action) -> int:
+    """Position of ``action`` among ``actions``, comparing the kept dice as a
+    multiset: a keep may list its dice in any order."""
+    key = (pack(action.dice_to_keep), action.stop_after)
+    for i, legal in enumerate(actions):
+        if (pack(legal.dice_to_keep), legal.stop_after) == key:
+            return i
+    raise ValueError(f"{action} is not a legal action here")
+
+
+def _open_append(path: Path, magic: bytes, dtype: np.dtype):
+    """Open ``path`` for appending (writing the header if new); returns the file
+    and its number of whole rows. A torn last row is cut off first, so the
+    next row starts where a reader expects it."""
+    f = open(path, "ab")
+    if f.tell() == 0:
+        f.write(_HEADER.pack(magic, _VERSION, dtype.itemsize))
+        f.flush()
+        return f, 0
+    _check_header(path, magic, dtype)
+    n = _count(path, dtype)
+    f.truncate(_HEADER.size + n * dtype.itemsize)
+    return f, n
+
+
+def _check_header(path: Path, magic: bytes, dtype: np.dtype) -> None:
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size or _HEADER.unpack(header) != (
+        magic,
+        _VERSION,
+        dtype.itemsize,
+    ):
+        raise ValueError(f"{path} is not a version-{_VERSION} game record file.")
+
+
+def _count(path: Path, dtype: np.dtype) -> int:
+    return max(0, path.stat().st_size - _HEADER.size) // dtype.itemsize
+
+
+def _map(path: Path, magic: bytes, dtype: np.dtype) -> np.ndarray:
+    _check_header(path, magic, dtype)
+    n = _count(path, dtype)  # a torn last row is left out
+    if not n:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=_HEADER.size, shape=(n,))
+
+
+def load_records(stem) -> tuple[np.ndarray, np.ndarray]:
+    """The store at ``stem`` as read-only memory-mapped ``(games, decisions)``
+    structured arrays; game ``i``'s decisions are
+    ``decisions[games["first_decision"][i]:][:games["n_decisions"][i]]``."""
+    decisions_path, games_path = _paths(stem)
+    games = _map(games_path, _GAMES_MAGIC, GAME_DTYPE)
+    decisions = _map(decisions_path, _DECISIONS_MAGIC, DECISION_DTYPE)
+    return games, decisions
+
+
+def state_from_row(row):
+    """The GameState a decision row was recorded from."""
+    strich = int(row["strich"])
+    return GameState(
+        available_dice=unpack(int(row["available"])),
+        kept_groups=unpack_groups(int(row["kept"])),
+        turn_accumulated_score=int(row["accumulated"]),
+        roll_count=int(row["roll_count"]),
+        players=[
+            PlayerState(int(score), bool(strich >> seat & 1), int(money))
+            for seat, (score, money) in enumerate(zip(row["scores"], row["money"]))
+        ],
+        current_player_idx=int(row["actor"]),
+        starting_player_idx=0,
+        turn_number=int(row["turn"]),
+        is_final_round=bool(row["final_round"]),
+    )
+
+
+def action_from_row(row):
+    """The Action a decision row chose."""
+    available, kept = unpack(int(row["available"])), unpack_groups(int(row["kept"]))
+    return legal_actions(available, kept)[int(row["action"])]
+
+
+def replay(game, decisions):
+    """Play one recorded game's ``decisions`` (its rows, in order) on ``game``, a
+    fresh Game rolling the same dice -- ``Game(dice_seed=seed)`` for a game
+    LangeStrasseEnv.reset(seed) recorded. Every decision is checked against its
+    row on the way; returns ``game``, finished."""
+    names = DECISION_DTYPE.names[1:-2]  # the state fields, as _decision_fields
+    for i, row in enumerate(decisions):
+        game.advance_to_decision()
+        fields = _decision_fields(StateExtractor.extract_state(game))
+        if any(np.any(row[name] != value) for name, value in zip(names, fields)):
+            raise ValueError(f"Replay diverged from the record at decision {i}")
+        game.apply_action(action_from_row(row))
+    game.advance_to_decision()
+    return game
@@ -5,9 +5,9 @@ kept groups -- no game state lives here. The game, the DP solver, and the ML
 feature layer all call these same functions, so they can never disagree.
 """
 
-import itertools
-from collections import Counter
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations_with_replacement
 
 NUM_DICE = 6
 STOP_MIN = 300
@@ -21,6 +21,167 @@ INDIVIDUAL_SCORE = {1: 100, 5: 50}
 TRIPLET_BASE = {1: 1000, 5: 500}
 
 
+# --------------------------------------------------------------------------- #
+# Packed dice. The rule functions below work on ints instead of value lists: a
+# multiset of (at most six) dice is one int with each face's count in its own
+# 3-bit field -- one octal digit per face, face 1 lowest, so [1, 1, 5] is
+# 0o10002. Adding two codes adds the multisets, and because 8 = 1 (mod 7) the
+# die count is just ``code % 7``. A kept configuration packs the same way into
+# two such fields: triplet-or-larger group size per face in the low digits, and
+# loose (individually kept) dice per face above them (see pack_groups).
+# --------------------------------------------------------------------------- #
+FACE_BITS = 3
+FACE_MASK = 0o7
+ONE_EACH = 0o111111  # one of every face: the Lange Strasse pattern
+LOOSE_SHIFT = NUM_DICE * FACE_BITS  # kept configs: loose dice above group sizes
+_FIELDS = (1 << LOOSE_SHIFT) - 1
+_SHIFT = {face: FACE_BITS * (face - 1) for face in range(1, 7)}
+_SCORING_FACES = sum(FACE_MASK << _SHIFT[face] for face in INDIVIDUAL_SCORE)
+_CONSECUTIVE_TALHEIM = frozenset(0o222 << _SHIFT[low] for low in range(1, 5))
+
+
+def pack(values) -> int:
+    """Pack dice values into a multiset code (see above)."""
+    code = 0
+    for value in values:
+        code += 1 << _SHIFT[value]
+    return code
+
+
+def unpack(code: int) -> list[int]:
+    """The sorted dice values of a multiset code."""
+    return [face for face in range(1, 7) for _ in range(face_count(code, face))]
+
+
+def face_count(code: int, face: int) -> int:
+    """How many dice of ``face`` are in a multiset code."""
+    return (code >> _SHIFT[face]) & FACE_MASK
+
+
+def dice_count(code: int) -> int:
+    """How many dice are in a multiset code."""
+    return code % 7
+
+
+def _at_least(code: int, n: int) -> int:
+    """ONE_EACH-style mask of the faces with at least ``n`` (1 or 3) dice."""
+    if n == 1:
+        return (code | code >> 1 | code >> 2) & ONE_EACH
+    return (code >> 2 | (code & code >> 1)) & ONE_EACH
+
+
+def is_lange_strasse_packed(code: int) -> bool:
+    return _at_least(code, 1) == ONE_EACH
+
+
+def talheim_score_packed(code: int) -> int:
+    # Six dice whose every face count is 0 or 2 are exactly three pairs.
+    if code % 7 != NUM_DICE or code & 0o555555:
+        return 0
+    return 1000 if code in _CONSECUTIVE_TALHEIM else 500
+
+
+def pack_groups(kept_groups) -> int:
+    """Pack kept groups into a kept-configuration code (see above)."""
+    code = 0
+    for group in kept_groups:
+        if len(group) >= 3:
+            code += len(group) << _SHIFT[group[0]]
+        else:
+            for value in group:
+                code += 1 << (LOOSE_SHIFT + _SHIFT[value])
+    return code
+
+
+def unpack_groups(config: int) -> list[list[int]]:
+    """Kept groups of a kept-configuration code: triplets+ first, then loose dice."""
+    groups = [[face] * size for face in range(1, 7) if (size := face_count(config, face))]
+    groups.extend([value] for value in unpack(config >> LOOSE_SHIFT))
+    return groups
+
+
+def kept_dice(config: int) -> int:
+    """The multiset code of every die in a kept configuration."""
+    return (config & _FIELDS) + (config >> LOOSE_SHIFT)
+
+
+def merge_packed(config: int, new: int) -> int:
+    """``merge_kept`` on codes: add the dice of multiset ``new`` to ``config``."""
+    triplets, loose = config & _FIELDS, config >> LOOSE_SHIFT
+    extend = new & _at_least(triplets, 1) * FACE_MASK  # lands in an existing group
+    rest = new - extend
+    fresh = rest & _at_least(rest, 3) * FACE_MASK  # a new triplet+
+    triplets += extend + fresh
+    loose += rest - fresh
+    return triplets | loose << LOOSE_SHIFT
+
+
+@lru_cache(maxsize=None)
+def score_packed(config: int) -> int:
+    """``score_groups`` on a kept-configuration code."""
+    dice = kept_dice(config)
+    if dice % 7 == NUM_DICE:
+        talheim = talheim_score_packed(dice)
+        if talheim:
+            return talheim
+        if is_lange_strasse_packed(dice):
+            return LANGE_STRASSE_SCORE
+
+    total = 0
+    for face in range(1, 7):
+        size = face_count(config, face)
+        if size:
+            total += TRIPLET_BASE.get(face, face * 100) * 2 ** (size - 3)
+    loose = config >> LOOSE_SHIFT
+    for face, points in INDIVIDUAL_SCORE.items():
+        total += face_count(loose, face) * points
+    return total
+
+
+def _invalid_face(new: int, kept: int) -> int:
+    """The face that makes keeping multiset ``new`` illegal given the kept dice
+    ``kept`` (both multiset codes), or 0 if the keep is legal."""
+    if not new:
+        return 0
+    combined = new + kept
+    if is_lange_strasse_packed(combined) or talheim_score_packed(combined):
+        return 0
+    # Faces that are not 1s/5s need three in this keep, or a triplet already kept.
+    allowed = _SCORING_FACES | (_at_least(new, 3) | _at_least(kept, 3)) * FACE_MASK
+    stray = new & ~allowed
+    if not stray:
+        return 0
+    return next(face for face in range(1, 7) if face_count(stray, face))
+
+
+def is_valid_keep_packed(new: int, kept: int) -> bool:
+    return not _invalid_face(new, kept)
+
+
+def can_keep_any_packed(available: int, kept: int) -> bool:
+    if not available or available & _SCORING_FACES:
+        return True
+    if is_lange_strasse_packed(available + kept):
+        return True
+    if _at_least(available, 3) or _at_least(kept, 3) & _at_least(available, 1):
+        return True
+    # A Talheim needs every kept face as a pair, plus enough pairs overall.
+    if _at_least(kept, 3):
+        return False
+    kept_faces = pairs = 0
+    for face in range(1, 7):
+        have = face_count(kept, face)
+        if have + face_count(available, face) >= 2:
+            pairs += 1
+        elif have:
+            return False
+        kept_faces += have > 0
+    return kept_faces <= 3 and pairs >= 3
+
+
+# --------------------------------------------------------------------------- #
+# The same rules over value lists and kept groups (thin wrappers of the above).
+# --------------------------------------------------------------------------- #
 def flatten(groups):
     """Flatten a list of dice groups into a single list of values."""
     return [value for group in groups for value in group]
@@ -28,7 +189,7 @@ def flatten(groups):
 
 def is_lange_strasse(values):
     """True if ``values`` contains at least one of every face 1-6."""
-    return LANGE_STRASSE.issubset(values)
+    return is_lange_strasse_packed(pack(values))
 
 
 def talheim_score(values):
@@ -38,11 +199,7 @@ def talheim_score(values):
     """
     if len(values) != NUM_DICE:
         return 0
-    counts = Counter(values)
-    if len(counts) != 3 or any(count != 2 for count in counts.values()):
-        return 0
-    low, mid, high = sorted(counts)
-    return 1000 if (mid == low + 1 and high == mid + 1) else 500
+    return talheim_score_packed(pack(values))
 
 
 def merge_kept(kept_groups, new_values):
@@ -54,19 +211,7 @@ def merge_kept(kept_groups, new_values):
     of a face form their own group and stray 1s/5s stay individual. This is the single
     source of truth for how kept dice are grouped; the game and the DP solver both use it.
     """
-    groups = [list(group) for group in kept_groups]
-    for value, count in Counter(new_values).items():
-        for group in groups:
-            # Only merge into an existing triplet+ of this same value.
-            if len(group) >= 3 and len(set(group)) == 1 and group[0] == value:
-                group.extend([value] * count)
-                break
-        else:
-            if count >= 3:
-                groups.append([value] * count)  # new triplet+
-            else:
-                groups.extend([value] for _ in range(count))  # individual 1s/5s
-    return groups
+    return unpack_groups(merge_packed(pack_groups(kept_groups), pack(new_values)))
 
 
 def score_groups(kept_groups):
@@ -75,23 +220,7 @@ def score_groups(kept_groups):
     Both specials need all six dice, so for fewer than six kept dice this is
     the plain triplet/individual score (the one the STOP_MIN check cares about).
     """
-    values = flatten(kept_groups)
-
-    talheim = talheim_score(values)
-    if talheim:
-        return talheim
-    if is_lange_strasse(values):
-        return LANGE_STRASSE_SCORE
-
-    total = 0
-    for group in kept_groups:
-        for value, count in Counter(group).items():
-            if count >= 3:
-                base = TRIPLET_BASE.get(value, value * 100)
-                total += base * 2 ** (count - 3)
-            else:
-                total += count * INDIVIDUAL_SCORE.get(value, 0)
-    return total
+    return score_packed(pack_groups(kept_groups))
 
 
 def is_valid_keep(dice_values, already_kept=None):
@@ -103,57 +232,20 @@ def is_valid_keep(dice_values, already_kept=None):
     - If 3+ of a value are already kept, more of it can be added.
     - Completing a Lange Strasse or Talheim is always allowed.
     """
-    if not dice_values:
+    new = pack(dice_values)
+    value = _invalid_face(new, pack(already_kept or []))
+    if not value:
         return True, ""
-
-    already_kept = already_kept or []
-
-    # Special combinations are always legal, whatever the individual dice are.
-    combined = list(already_kept) + list(dice_values)
-    if is_lange_strasse(combined) or talheim_score(combined):
-        return True, ""
-
-    kept_counts = Counter(already_kept)
-    for value, count in Counter(dice_values).items():
-        if value in INDIVIDUAL_SCORE:
-            continue
-        if count >= 3 or kept_counts.get(value, 0) >= 3:
-            continue
-        return False, (
-            f"Cannot keep {count} die/dice with value {value}. "
-            "Need at least 3 of the same value (except 1s and 5s)."
-        )
-    return True, ""
+    return False, (
+        f"Cannot keep {face_count(new, value)} die/dice with value {value}. "
+        "Need at least 3 of the same value (except 1s and 5s)."
+    )
 
 
 def can_keep_any(available, kept):
     """True if at least one legal keep exists from ``available`` given ``kept`` values."""
-    if not available:
-        return True  # Nothing available to keep is not a dead end (all 6 already kept).
-
-    # 1s and 5s can always be kept.
-    if any(value in INDIVIDUAL_SCORE for value in available):
-        return True
-
-    # Some keep could complete a Lange Strasse (possible iff every face is present).
-    if is_lange_strasse(list(kept) + list(available)):
-        return True
-
-    # A value already has (or would reach) a keepable triplet.
-    kept_counts = Counter(kept)
-    if any(
-        count >= 3 or kept_counts.get(value, 0) >= 3
-        for value, count in Counter(available).items()
-    ):
-        return True
-
-    # Some keep could complete a Talheim (exactly six dice forming three pairs).
-    need = NUM_DICE - len(kept)
-    kept_list = list(kept)
-    return 0 < need <= len(available) and any(
-        talheim_score(kept_list + list(combo))
-        for combo in itertools.combinations(available, need)
-    )
+    # Nothing available to keep is not a dead end (all 6 already kept).
+    return can_keep_any_packed(pack(available), pack(kept))
 
 
 # --------------------------------------------------------------------------- #
@@ -171,35 +263,114 @@ class Action:
         return f"keep {dice_str}" + (" stop" if self.stop_after else "")
 
 
+def _sub_multisets(code: int) -> list[int]:
+    """Every non-empty sub-multiset of a multiset code, fewest dice first."""
+    subs = [0]
+    for face in range(1, 7):
+        unit = 1 << _SHIFT[face]
+        subs = [sub + k * unit for sub in subs for k in range(face_count(code, face) + 1)]
+    return sorted(subs[1:], key=lambda sub: (sub % 7, unpack(sub)))
+
+
 def valid_keeps(available, kept_values):
     """All distinct, legally-keepable subsets of ``available`` (as value lists)."""
-    keeps = []
-    seen = set()
-    for r in range(1, len(available) + 1):
-        for combo in itertools.combinations(available, r):
-            key = tuple(sorted(combo))  # equivalent keeps differ only in order
-            if key in seen:
-                continue
-            seen.add(key)
-            if is_valid_keep(list(combo), kept_values)[0]:
-                keeps.append(list(combo))
-    return keeps
+    kept = pack(kept_values)
+    return [
+        unpack(sub)
+        for sub in _sub_multisets(pack(available))
+        if is_valid_keep_packed(sub, kept)
+    ]
+
+
+def may_stop_packed(config: int, new: int) -> bool:
+    merged = merge_packed(config, new)
+    return kept_dice(merged) % 7 < NUM_DICE and score_packed(merged) >= STOP_MIN
 
 
 def may_stop(kept_groups, new_values):
     """True if a player may stop after also keeping ``new_values``: fewer than
     all six dice kept, and the resulting set worth at least STOP_MIN."""
-    merged = merge_kept(kept_groups, new_values)
-    return len(flatten(merged)) < NUM_DICE and score_groups(merged) >= STOP_MIN
+    return may_stop_packed(pack_groups(kept_groups), pack(new_values))
+
+
+# --------------------------------------------------------------------------- #
+# Legal-action table: enumeration above is dozens of subset checks per call,
+# but there are only a few thousand distinct decision points, so all of them are
+# worked out when the module is imported (about 0.3 s; forked worker processes
+# inherit the tables) and only looked up afterwards. A decision point no turn can
+# reach (say, a hand typed into config.py) is worked out on first use instead.
+# Keys are packed codes -- the roll plus the kept values (or configuration) -- so
+# every ordering of the dice shares one entry, and the keeps come out in one
+# canonical order whatever order the dice were rolled in: fewest dice first, then
+# by sorted values, each keep a sorted tuple. Game records store actions as
+# indices into that order (see game.record).
+# --------------------------------------------------------------------------- #
+_KEEP_TABLE: dict[tuple[int, int], tuple[tuple[int, ...], ...]] = {}
+_ACTION_TABLE: dict[tuple[int, int], tuple[tuple[tuple[int, ...], bool], ...]] = {}
+
+
+def canonical_groups(kept_groups) -> tuple[tuple[int, ...], ...]:
+    """Order-independent, hashable key for a kept configuration."""
+    return tuple(sorted(tuple(sorted(group)) for group in kept_groups))
+
+
+def keep_options(available, kept_values) -> tuple[tuple[int, ...], ...]:
+    """Table-backed ``valid_keeps``: the legal keeps of ``available`` (sorted
+    value-tuples) given the already-kept values. Empty iff the roll busts."""
+    key = (pack(available), pack(kept_values))
+    keeps = _KEEP_TABLE.get(key)
+    if keeps is None:
+        keeps = tuple(
+            tuple(unpack(sub))
+            for sub in _sub_multisets(key[0])
+            if is_valid_keep_packed(sub, key[1])
+        )
+        _KEEP_TABLE[key] = keeps
+    return keeps
+
+
+def action_options(available, kept_groups) -> tuple[tuple[tuple[int, ...], bool], ...]:
+    """Table-backed action enumeration: ``(keep, may_stop)`` per legal keep."""
+    key = (pack(available), pack_groups(kept_groups))
+    options = _ACTION_TABLE.get(key)
+    if options is None:
+        config = key[1]
+        options = tuple(
+            (keep, may_stop_packed(config, pack(keep)))
+            for keep in keep_options(available, unpack(kept_dice(config)))
+        )
+        _ACTION_TABLE[key] = options
+    return options
 
 
 def legal_actions(available, kept_groups):
     """Every legal Action at a decision point: each valid keep, plus a stopping
     variant where stopping is allowed."""
-    kept_values = flatten(kept_groups)
     actions = []
-    for keep in valid_keeps(available, kept_values):
-        actions.append(Action(dice_to_keep=keep, stop_after=False))
-        if may_stop(kept_groups, keep):
-            actions.append(Action(dice_to_keep=keep, stop_after=True))
+    for keep, stoppable in action_options(available, kept_groups):
+        actions.append(Action(dice_to_keep=list(keep), stop_after=False))
+        if stoppable:
+            actions.append(Action(dice_to_keep=list(keep), stop_after=True))
     return actions
+
+
+def _fill_tables() -> None:
+    """Work out every decision point a turn can reach: each roll at each kept
+    configuration reachable from a fresh six."""
+    rolls = {
+        n: [list(roll) for roll in combinations_with_replacement(range(1, 7), n)]
+        for n in range(1, NUM_DICE + 1)
+    }
+    configs, frontier = {0}, [0]
+    while frontier:
+        config = frontier.pop()
+        groups = unpack_groups(config)
+        for roll in rolls[NUM_DICE - kept_dice(config) % 7]:
+            for keep, _stoppable in action_options(roll, groups):
+                new = merge_packed(config, pack(keep))
+                if kept_dice(new) % 7 < NUM_DICE and new not in configs:
+                    configs.add(new)
+                    frontier.append(new)
+
+
+_fill_tables()
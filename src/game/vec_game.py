@@ -0,0 +1,368 @@
+"""Many games at once: the Game/DiceSet rules over NumPy arrays.
+
+``Game`` plays one game in Python objects, which is right for watching a game
+and for per-decision learners, but an arena of tens of thousands of games
+spends nearly all its time in that object bookkeeping. ``VecGame`` holds K
+independent 3-player games as flat arrays -- the current roll and kept
+configuration as packed codes (see game.rules), turn score, scores, money,
+strich flags, turn number, seat -- and advances every game by one decision per
+``step``: one RNG call rolls the dice for all games that need them, and the
+keep / stop / hot dice / bust / Totale / end-of-turn / settlement flow is a
+handful of masked array updates.
+
+It follows Game exactly (same rules, same money, same turn order, settlement as
+Game.finish_game), so a policy gets identical results from either engine for the
+same dice. Like LangeStrasseEnv, dead rolls and Totales are resolved inside
+``step``, so every game that isn't over is always at a real decision.
+
+The rules themselves stay in game.rules: the few per-decision questions that are
+not bit arithmetic on packed codes (a configuration's score, whether a roll
+busts) are answered by lookup tables built from those rule functions once.
+"""
+
+from functools import lru_cache
+from itertools import combinations_with_replacement
+
+import numpy as np
+
+from game.rules import (
+    FACE_BITS,
+    LOOSE_SHIFT,
+    NUM_DICE,
+    ONE_EACH,
+    action_options,
+    can_keep_any_packed,
+    keep_options,
+    kept_dice,
+    merge_packed,
+    pack,
+    pack_groups,
+    score_packed,
+    unpack,
+    unpack_groups,
+)
+
+N_PLAYERS = 3
+FINAL_SCORE = 10000  # reaching it starts the final round
+EARLY_WIN_TURN = 10  # a game won by this round pays the early-win bonus
+
+_FIELDS = (1 << LOOSE_SHIFT) - 1
+_FACE_MASK = (1 << FACE_BITS) - 1
+
+
+# --- lookup tables -------------------------------------------------------- #
+class _Tables:
+    """Every reachable kept configuration (with its score) and every roll (with,
+    per configuration, whether it busts). Rows are found by binary search, so a
+    whole batch of codes is looked up in one ``np.searchsorted``."""
+
+    def __init__(self):
+        rolls = {
+            n: [pack(roll) for roll in combinations_with_replacement(range(1, 7), n)]
+            for n in range(NUM_DICE + 1)
+        }
+        configs, frontier = {0}, [0]
+        while frontier:
+            config = frontier.pop()
+            kept = unpack(kept_dice(config))
+            if len(kept) == NUM_DICE:
+                continue  # hot dice / Talheim: the next roll is a fresh six
+            for roll in rolls[NUM_DICE - len(kept)]:
+                for keep in keep_options(unpack(roll), kept):
+                    new = merge_packed(config, pack(keep))
+                    if new not in configs:
+                        configs.add(new)
+                        frontier.append(new)
+
+        self.configs = np.array(sorted(configs), dtype=np.int64)
+        self.scores = np.array([score_packed(c) for c in self.configs], dtype=np.int64)
+        self.rolls = np.array(sorted(r for n in rolls for r in rolls[n]), dtype=np.int64)
+        self.bust = np.zeros((len(self.configs), len(self.rolls)), dtype=bool)
+        for i, config in enumerate(self.configs.tolist()):
+            dice = kept_dice(config)
+            for roll in rolls[NUM_DICE - dice % 7]:
+                j = np.searchsorted(self.rolls, roll)
+                self.bust[i, j] = not can_keep_any_packed(roll, dice)
+
+    def config_rows(self, configs: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.configs, configs)
+
+    def roll_rows(self, rolls: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.rolls, rolls)
+
+
+@lru_cache(maxsize=None)
+def _tables() -> _Tables:
+    return _Tables()
+
+
+# --- packed-code arithmetic over arrays -------------------------------------- #
+# The same bit tricks as game.rules, which already work elementwise on ints.
+def _at_least_one(codes: np.ndarray) -> np.ndarray:
+    return (codes | codes >> 1 | codes >> 2) & ONE_EACH
+
+
+def _at_least_three(codes: np.ndarray) -> np.ndarray:
+    return (codes >> 2 | (codes & codes >> 1)) & ONE_EACH
+
+
+def _merge(configs: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """``merge_packed`` elementwise."""
+    triplets, loose = configs & _FIELDS, configs >> LOOSE_SHIFT
+    extend = new & _at_least_one(triplets) * _FACE_MASK
+    rest = new - extend
+    fresh = rest & _at_least_three(rest) * _FACE_MASK
+    return (triplets + extend + fresh) | (loose + rest - fresh) << LOOSE_SHIFT
+
+
+def _kept_dice(configs: np.ndarray) -> np.ndarray:
+    return (configs & _FIELDS) + (configs >> LOOSE_SHIFT)
+
+
+def _is_talheim(dice: np.ndarray) -> np.ndarray:
+    return (dice % 7 == NUM_DICE) & ((dice & 0o555555) == 0)
+
+
+def _is_lange_strasse(dice: np.ndarray) -> np.ndarray:
+    return _at_least_one(dice) == ONE_EACH
+
+
+def settle(scores: np.ndarray, strich: np.ndarray, turn: np.ndarray) -> np.ndarray:
+    """End-of-game money per seat, ``[game, seat]``, as Game.finish_game pays it
+    (ranked by score, ties to the earlier seat as its stable sort does)."""
+    seat = np.arange(N_PLAYERS)
+    ahead = (scores[:, None, :] > scores[:, :, None]) | (
+        (scores[:, None, :] == scores[:, :, None]) & (seat < seat[:, None])
+    )
+    rank = ahead.sum(-1)
+    winner = rank == 0
+
+    money = np.select([winner, rank == 1], [120, -50], -70)
+    early = (turn <= EARLY_WIN_TURN)[:, None]
+    money += early * np.where(winner, 50 * (N_PLAYERS - 1), -50)
+    clean = ~strich
+    money += 50 * (N_PLAYERS - 1) * clean - 50 * (clean.sum(1, keepdims=True) - clean)
+    poor = ~winner & (scores < 5000)
+    money += winner * 50 * poor.sum(1, keepdims=True) - 50 * poor
+    return money
+
+
+class VecGame:
+    """K independent games of 3-player Lange Strasse, advanced in lockstep.
+
+    Per game: ``available`` (the current roll) and ``kept`` (the kept
+    configuration) as packed codes, ``accumulated`` (banked from earlier sets this
+    turn), ``roll_count``, ``scores`` / ``money`` / ``strich`` (``[game, seat]``),
+    ``turn``, ``current`` (the seat to act), ``final_round`` and ``done``.
+    Every game starts with seat 0, as Game does.
+    """
+
+    def __init__(self, n_games: int, seed=None):
+        self.n_games = n_games
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self, mask: "np.ndarray | None" = None) -> None:
+        """Start fresh games -- all K, or only those in ``mask`` -- and bring each
+        to its first decision."""
+        k = self.n_games
+        if mask is None:
+            mask = np.ones(k, dtype=bool)
+            self.available = np.zeros(k, dtype=np.int64)
+            self.kept = np.zeros(k, dtype=np.int64)
+            self.accumulated = np.zeros(k, dtype=np.int64)
+            self.roll_count = np.zeros(k, dtype=np.int64)
+            self.scores = np.zeros((k, N_PLAYERS), dtype=np.int64)
+            self.money = np.zeros((k, N_PLAYERS), dtype=np.int64)
+            self.strich = np.zeros((k, N_PLAYERS), dtype=bool)
+            self.turn = np.zeros(k, dtype=np.int64)
+            self.current = np.zeros(k, dtype=np.int64)
+            self.final_round = np.zeros(k, dtype=bool)
+            self.done = np.zeros(k, dtype=bool)
+        mask = np.asarray(mask, dtype=bool)
+        self.scores[mask] = 0
+        self.money[mask] = 0
+        self.strich[mask] = False
+        self.turn[mask] = 1
+        self.current[mask] = 0
+        self.final_round[mask] = False
+        self.done[mask] = False
+        self._start_turn(mask)
+        self._resolve(self._roll(mask))
+
+    def set_state(self, state, mask: "np.ndarray | None" = None) -> None:
+        """Put the games in ``mask`` (default: all K) at the decision ``state``, a
+        game_state.GameState of a game that started with seat 0 (as every Game
+        does), to play on from there."""
+        if state.starting_player_idx != 0:
+            raise ValueError("VecGame games start with seat 0")
+        if mask is None:
+            mask = np.ones(self.n_games, dtype=bool)
+        self.available[mask] = pack(state.available_dice)
+        self.kept[mask] = pack_groups(state.kept_groups)
+        self.accumulated[mask] = state.turn_accumulated_score
+        self.roll_count[mask] = state.roll_count
+        self.scores[mask] = [p.total_score for p in state.players]
+        self.money[mask] = [p.money for p in state.players]
+        self.strich[mask] = [p.has_strich for p in state.players]
+        self.turn[mask] = state.turn_number
+        self.current[mask] = state.current_player_idx
+        self.final_round[mask] = state.is_final_round
+        self.done[mask] = False
+
+    # ------------------------------------------------------------------ #
+    # Decisions
+    # ------------------------------------------------------------------ #
+    def legal_actions(self, game: int) -> list[tuple[int, bool]]:
+        """Game ``game``'s legal actions as ``(packed keep, stop)`` pairs, in the
+        order of game.rules.legal_actions. Empty once the game is over."""
+        if self.done[game]:
+            return []
+        groups = unpack_groups(int(self.kept[game]))
+        actions = []
+        for keep, stoppable in action_options(unpack(int(self.available[game])), groups):
+            actions.append((pack(keep), False))
+            if stoppable:
+                actions.append((pack(keep), True))
+        return actions
+
+    def step(self, keep: np.ndarray, stop: np.ndarray, check: bool = False) -> np.ndarray:
+        """Apply one action per game -- ``keep`` (packed dice) and ``stop`` -- to
+        every game that isn't over (entries of finished games are ignored).
+
+        Returns each game's money change over the step, ``[game, seat]``. The
+        actions must be legal; ``check=True`` verifies that (slowly) first.
+        """
+        live = ~self.done
+        keep = np.where(live, np.asarray(keep, dtype=np.int64), 0)
+        stop = live & np.asarray(stop, dtype=bool)
+        if check:
+            for g in np.flatnonzero(live):
+                if (int(keep[g]), bool(stop[g])) not in self.legal_actions(g):
+                    action = (unpack(int(keep[g])), bool(stop[g]))
+                    raise ValueError(f"Illegal action for game {g}: {action}")
+        money_before = self.money.copy()
+        games = np.flatnonzero(live)
+        tables = _tables()
+
+        config = _merge(self.kept[games], keep[games])
+        dice = _kept_dice(config)
+        total = self.accumulated[games] + tables.scores[tables.config_rows(config)]
+        self.kept[games] = config
+        self.available[games] -= keep[games]
+
+        # A completed Lange Strasse pays 50¢ (Super, on the 3rd+ roll: 100¢) from
+        # each opponent at once, whatever happens to the turn afterwards.
+        strasse = _is_lange_strasse(dice)
+        if strasse.any():
+            paid = games[strasse]
+            amount = np.where(self.roll_count[paid] >= 3, 100, 50)
+            self._collect(paid, amount)
+
+        # Talheim or stop ends the turn; keeping all six rolls a fresh six.
+        ends = stop[games] | _is_talheim(dice)
+        hot = ~ends & (dice % 7 == NUM_DICE)
+        rolls_on = ~ends & ~hot
+
+        self.accumulated[games[hot]] = total[hot]
+        self.kept[games[hot]] = 0
+        self.roll_count[games[hot]] = 0
+        rolling = np.zeros(self.n_games, dtype=bool)
+        rolling[games[hot | rolls_on]] = True
+
+        ended = np.zeros(self.n_games, dtype=bool)
+        ended[games[ends]] = True
+        points = np.zeros(self.n_games, dtype=np.int64)
+        points[games[ends]] = total[ends]
+        started = self._end_turn(ended, points)
+        self._start_turn(started)
+
+        self._resolve(self._roll(rolling | started))
+        return self.money - money_before
+
+    # ------------------------------------------------------------------ #
+    # Turn flow
+    # ------------------------------------------------------------------ #
+    def _roll(self, mask: np.ndarray) -> np.ndarray:
+        """Roll the unkept dice of the games in ``mask`` (one RNG call); returns
+        the mask of those whose roll busts."""
+        games = np.flatnonzero(mask)
+        busted = np.zeros(self.n_games, dtype=bool)
+        if not len(games):
+            return busted
+        n = NUM_DICE - _kept_dice(self.kept[games]) % 7
+        faces = self._draw(games)
+        used = (np.arange(NUM_DICE) < n[:, None]).astype(np.int64)
+        codes = (used << (FACE_BITS * (faces - 1))).sum(1)
+        self.available[games] = codes
+        self.roll_count[games] += 1
+        tables = _tables()
+        rows = tables.config_rows(self.kept[games])
+        busted[games] = tables.bust[rows, tables.roll_rows(codes)]
+        return busted
+
+    def _draw(self, games: np.ndarray) -> np.ndarray:
+        """Six faces for the roll of each of ``games``; a roll of n dice uses the
+        first n."""
+        return self.rng.integers(1, 7, size=(len(games), NUM_DICE))
+
+    def _start_turn(self, mask: np.ndarray) -> None:
+        """Fresh turn for the games in ``mask``: nothing kept, six dice to roll."""
+        self.kept[mask] = 0
+        self.accumulated[mask] = 0
+        self.roll_count[mask] = 0
+
+    def _resolve(self, busted: np.ndarray) -> None:
+        """Game.advance_to_decision: end busted turns (a bust on a fresh six's
+        first roll is a Totale, paying 50¢ to each opponent) until every game is
+        at a decision or over."""
+        while busted.any():
+            games = np.flatnonzero(busted)
+            totale = games[self.roll_count[games] == 1]
+            if len(totale):
+                self._collect(totale, np.full(len(totale), -50))
+            started = self._end_turn(busted, np.zeros(self.n_games, dtype=np.int64))
+            self._start_turn(started)
+            busted = self._roll(started)
+
+    def _collect(self, games: np.ndarray, amount: np.ndarray) -> None:
+        """The mover of each game collects ``amount`` from every opponent
+        (negative: pays them)."""
+        mover = self.current[games]
+        self.money[games] -= amount[:, None]
+        self.money[games, mover] += amount * N_PLAYERS
+
+    def _end_turn(self, mask: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """Game.end_turn for the games in ``mask``: bank ``points`` (0 is a strich),
+        start or finish the final round, pass the turn. Returns the mask of games
+        that go on to a new turn (the rest are settled and over)."""
+        games = np.flatnonzero(mask)
+        mover = self.current[games]
+        self.scores[games, mover] += points[games]
+        self.strich[games[points[games] == 0], mover[points[games] == 0]] = True
+        self.final_round[games] |= self.scores[games, mover] >= FINAL_SCORE
+
+        following = (mover + 1) % N_PLAYERS
+        over = self.final_round[games] & (following == 0)
+        finished = games[over]
+        if len(finished):
+            self.money[finished] += settle(
+                self.scores[finished], self.strich[finished], self.turn[finished]
+            )
+            self.done[finished] = True
+
+        going_on = games[~over]
+        self.current[going_on] = following[~over]
+        self.turn[going_on[following[~over] == 0]] += 1
+        started = np.zeros(self.n_games, dtype=bool)
+        started[going_on] = True
+        return started
+
+    # ------------------------------------------------------------------ #
+    # Results
+    # ------------------------------------------------------------------ #
+    def winners(self) -> np.ndarray:
+        """Each finished game's winning seat (Game.finish_game's ranking)."""
+        seat = np.arange(N_PLAYERS)
+        key = self.scores * N_PLAYERS + (N_PLAYERS - 1 - seat)  # ties: earlier seat
+        return key.argmax(1)
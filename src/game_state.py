@@ -9,17 +9,27 @@ name), and a model is just a list of those names (see ``select_features`` and th
 ``TD_*_KEYS`` lists in ``algorithms/td.py``).
 """
 
-from collections import Counter
+from collections import Counter, OrderedDict
 from dataclasses import dataclass
 from typing import List
 
+import numpy as np
+
 from game.rules import (
+    NUM_DICE,
     can_keep_any,
     flatten,
     is_lange_strasse,
+    is_lange_strasse_packed,
+    kept_dice,
     merge_kept,
+    merge_packed,
+    pack,
+    pack_groups,
     score_groups,
+    score_packed,
     talheim_score,
+    talheim_score_packed,
 )
 
 
@@ -111,6 +121,271 @@ Example GameState
 """
 
 
+# --------------------------------------------------------------------------- #
+# Atom sections: the feature menu, split so a model pays only for what it reads.
+# Each section computes a few related atoms from the afterstate (and whether the
+# action ended the turn) and returns them in the order of its name tuple.
+# --------------------------------------------------------------------------- #
+_PLAYER_LABELS = ("me", "p2", "p3")  # ego-centric: acting, next to act, last
+_OPP_LABELS = _PLAYER_LABELS[1:]
+
+
+def _triplet_sizes(after: GameState) -> dict[int, int]:
+    sizes = {face: 0 for face in range(1, 7)}
+    for group in after.kept_groups:
+        if len(group) >= 3:
+            sizes[group[0]] = len(group)
+    return sizes
+
+
+def _ego_players(after: GameState) -> list[PlayerState]:
+    """The players in acting order: me first, then the next to act."""
+    n = len(after.players)
+    return [after.players[(after.current_player_idx + i) % n] for i in range(n)]
+
+
+def _prospective(after: GameState) -> int:
+    """The mover's total if the turn ended right now (already banked when the turn
+    ended, else banked + points at risk)."""
+    return after.players[after.current_player_idx].total_score + after.total_turn_score
+
+
+def _groups_section(after: GameState, ends_turn: bool) -> tuple:
+    triplet_size = _triplet_sizes(after)
+    loose = {1: 0, 5: 0}
+    for group in after.kept_groups:
+        if len(group) < 3 and group[0] in loose:
+            loose[group[0]] += len(group)
+    sizes = triplet_size.values()
+    groups = (2 ** (size - 3) / 8.0 if size >= 3 else 0.0 for size in sizes)
+    return (*groups, loose[1] / 6.0, loose[5] / 6.0)
+
+
+def _turn_section(after: GameState, ends_turn: bool) -> tuple:
+    return after.turn_accumulated_score / 10000.0, after.roll_count / 6.0
+
+
+def _seat_section(after: GameState, ends_turn: bool) -> tuple:
+    # One-hot: seat order is categorical, not ordinal value.
+    n = len(after.players)
+    offset = (after.current_player_idx - after.starting_player_idx) % n
+    return tuple(1.0 if offset == k else 0.0 for k in range(n))
+
+
+def _player_section(after: GameState, ends_turn: bool) -> tuple:
+    values = []
+    for p in _ego_players(after):
+        strich = 1.0 if p.has_strich else 0.0
+        values += [p.total_score / 10000.0, strich, p.money / 1000.0]
+    return tuple(values)
+
+
+def _context_section(after: GameState, ends_turn: bool) -> tuple:
+    return (
+        max(0, 10 - after.turn_number) / 10.0,
+        1.0 if after.is_final_round else 0.0,
+        1.0 if ends_turn else 0.0,
+    )
+
+
+# --- Derived: money-rule features, each mirrors one way money changes hands ---
+def _placement_section(after: GameState, ends_turn: bool) -> tuple:
+    """Winning / placement (winner collects 50c + 70c)."""
+    prospective = _prospective(after)
+    opponents = _ego_players(after)[1:]
+    best_opp = max((p.total_score for p in opponents), default=0)
+    return (
+        prospective / 10000.0,
+        max(0, 10000 - prospective) / 10000.0,
+        1.0 if prospective >= 10000 else 0.0,
+        best_opp / 10000.0,
+        1.0 if prospective > best_opp else 0.0,
+        *((prospective - p.total_score) / 10000.0 for p in opponents),
+    )
+
+
+def _below_5000_section(after: GameState, ends_turn: bool) -> tuple:
+    """Under-5000 penalty (50c to the winner)."""
+    prospective = _prospective(after)
+    opponents = _ego_players(after)[1:]
+    below = [1.0 if p.total_score < 5000 else 0.0 for p in opponents]
+    return (
+        1.0 if prospective < 5000 else 0.0,
+        max(0, 5000 - prospective) / 5000.0,
+        *below,
+        sum(below) / len(below) if below else 0.0,
+    )
+
+
+def _bonus_section(after: GameState, ends_turn: bool) -> tuple:
+    # Win-by-round-10 bonus (50c from each player) still attainable; and whether
+    # completing the strasse on the next roll would be the 3rd+ roll: Super.
+    return (
+        1.0 if after.turn_number <= 10 else 0.0,
+        1.0 if after.can_complete_lange_strasse and after.roll_count >= 2 else 0.0,
+    )
+
+
+# --- Older hand-crafted features ---
+def _kept_section(after: GameState, ends_turn: bool) -> tuple:
+    kept_counts = Counter(flatten(after.kept_groups))
+    triplet_size = _triplet_sizes(after)
+    return (
+        *(kept_counts.get(face, 0) / 6.0 for face in range(1, 7)),
+        triplet_size[1] / 6.0,  # 1s sitting inside a triplet
+        triplet_size[5] / 6.0,  # 5s sitting inside a triplet
+    )
+
+
+def _turn_flow_section(after: GameState, ends_turn: bool) -> tuple:
+    """Turn flow (raw + derived scores)."""
+    return (
+        after.current_set_score / 2000.0,
+        after.total_turn_score / 10000.0,
+        (6 - sum(map(len, after.kept_groups))) / 6.0,
+    )
+
+
+def _flag_section(after: GameState, ends_turn: bool) -> tuple:
+    """Situation flags (derived)."""
+    return (
+        1.0 if after.can_complete_lange_strasse else 0.0,
+        1.0 if after.can_complete_talheim else 0.0,
+        1.0 if after.can_keep_any else 0.0,
+    )
+
+
+# (atom names, section) in feature-menu order.
+_SECTIONS = (
+    ((*(f"group{face}" for face in range(1, 7)), "loose1", "loose5"), _groups_section),
+    (("turn_accumulated", "roll_count"), _turn_section),
+    (tuple(f"seat{k}" for k in range(len(_PLAYER_LABELS))), _seat_section),
+    (
+        tuple(
+            f"{atom}_{label}"
+            for label in _PLAYER_LABELS
+            for atom in ("score", "strich", "money")
+        ),
+        _player_section,
+    ),
+    (("turns_to_bonus", "is_final_round", "ends_turn"), _context_section),
+    (
+        (
+            "prospective_score", "points_to_win", "crosses_10k",
+            "score_best_opp", "is_leading", *(f"gap_{label}" for label in _OPP_LABELS),
+        ),
+        _placement_section,
+    ),
+    (
+        (
+            "below_5000_me", "points_to_5000",
+            *(f"below_5000_{label}" for label in _OPP_LABELS), "opps_below_5000",
+        ),
+        _below_5000_section,
+    ),
+    (("round_bonus_alive", "flag_super_strasse"), _bonus_section),
+    (
+        (*(f"kept{face}" for face in range(1, 7)), "grouped1", "grouped5"),
+        _kept_section,
+    ),
+    (("current_set_score", "total_turn_score", "dice_left"), _turn_flow_section),
+    (("flag_lange_strasse", "flag_talheim", "flag_keep_any"), _flag_section),
+)
+# atom name -> (section index, position in that section's values)
+_ATOM_SECTION = {
+    name: (i, j)
+    for i, (names, _section) in enumerate(_SECTIONS)
+    for j, name in enumerate(names)
+}
+
+
+class AtomEncoder:
+    """A model's feature function, specialized to its key list.
+
+    Built once per model: it works out which sections the keys need and where
+    each of their atoms goes, so encoding an action runs only those sections and
+    writes the atoms straight into a float array (a model reading no base atoms
+    at all never even builds the afterstate). ``extra`` maps keys that aren't
+    base atoms to ``(state, action) -> float`` functions (the algorithm layer's
+    solver values); ``bias`` appends a constant 1.0. An unknown key raises when
+    the encoder is used, as ``select_features`` does.
+
+    Rows are memoized in a bounded LRU keyed by ``StateExtractor.afterstate_key``,
+    so actions that land in the same afterstate -- within a decision or across
+    decisions -- are encoded once. Extra atoms must therefore depend on the
+    afterstate only, as the solver values do.
+    """
+
+    def __init__(
+        self,
+        keys: list[str],
+        extra: dict | None = None,
+        bias: bool = False,
+        cache_size: int = 1 << 14,
+    ):
+        extra = extra or {}
+        self._cache: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._cache_size = cache_size
+        self.keys = list(keys)
+        self.dim = len(self.keys) + bias
+        plan: dict[int, list[tuple[int, int]]] = {}
+        self._extra = []
+        known = extra.keys() | _ATOM_SECTION.keys()
+        self._unknown = [key for key in self.keys if key not in known]
+        for slot, key in enumerate(self.keys):
+            if key in extra:
+                self._extra.append((slot, extra[key]))
+            elif key in _ATOM_SECTION:
+                i, j = _ATOM_SECTION[key]
+                plan.setdefault(i, []).append((slot, j))
+        self._plan = [(_SECTIONS[i][1], picks) for i, picks in sorted(plan.items())]
+        self._bias = self.dim - 1 if bias else None
+
+    def __call__(self, state: GameState, action, out=None) -> np.ndarray:
+        """The features of one action (into ``out``, a float row, if given)."""
+        if out is None:
+            out = np.empty(self.dim)
+        key = StateExtractor.afterstate_key(state, action)
+        return self._fill(state, action, key, out)
+
+    def matrix(self, state: GameState, actions) -> np.ndarray:
+        """The features of every action of one decision, one row each."""
+        out = np.empty((len(actions), self.dim))
+        keys = StateExtractor.afterstate_keys(state, actions)
+        for i, (action, key) in enumerate(zip(actions, keys)):
+            self._fill(state, action, key, out[i])
+        return out
+
+    def _fill(self, state: GameState, action, key: tuple, out: np.ndarray):
+        """Write ``action``'s features into ``out``: from the cache if its
+        afterstate was seen recently, else encoded (and cached)."""
+        row = self._cache.get(key)
+        if row is not None:
+            self._cache.move_to_end(key)
+            out[:] = row
+            return out
+        self._encode(state, action, out)
+        self._cache[key] = out.copy()
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return out
+
+    def _encode(self, state: GameState, action, out: np.ndarray) -> np.ndarray:
+        if self._unknown:
+            raise KeyError(self._unknown[0])
+        if self._plan:
+            after, ends_turn = StateExtractor._afterstate(state, action)
+            for section, picks in self._plan:
+                values = section(after, ends_turn)
+                for slot, j in picks:
+                    out[slot] = values[j]
+        for slot, atom in self._extra:
+            out[slot] = atom(state, action)
+        if self._bias is not None:
+            out[self._bias] = 1.0
+        return out
+
+
 class StateExtractor:
     """Build a GameState from a live game, and encode it for ML models."""
 
@@ -146,112 +421,12 @@ class StateExtractor:
         ``p3`` (last). The kept dice are offered two ways -- raw per-face counts
         (``kept{n}``, with ``grouped1``/``grouped5`` for 1s/5s inside a triplet) and
         triplet strength (``group{n}``, geometric in size, with ``loose1``/``loose5``)
-        -- because different models want different ones.
+        -- because different models want different ones. Each atom is computed by
+        one section in _SECTIONS; an AtomEncoder runs only the sections it needs.
         """
         feats: dict[str, float] = {}
-
-        # --- --- --- Core Game Features --- --- ---
-
-        # --- Groups and loose dice ---
-        triplet_size = {face: 0 for face in range(1, 7)}
-        loose = {1: 0, 5: 0}
-        for group in after.kept_groups:
-            if len(group) >= 3:
-                triplet_size[group[0]] = len(group)
-            elif group[0] in loose:
-                loose[group[0]] += len(group)
-        for face in range(1, 7):
-            size = triplet_size[face]
-            feats[f"group{face}"] = 2 ** (size - 3) / 8.0 if size >= 3 else 0.0
-        feats["loose1"] = loose[1] / 6.0
-        feats["loose5"] = loose[5] / 6.0
-
-        # --- Turn-based features ---
-        feats["turn_accumulated"] = after.turn_accumulated_score / 10000.0
-        feats["roll_count"] = after.roll_count / 6.0
-
-        # --- Seating Position ---
-        n = len(after.players)
-        offset = (after.current_player_idx - after.starting_player_idx) % n
-        for k in range(n):  # one-hot: seat order is categorical, not ordinal value
-            feats[f"seat{k}"] = 1.0 if offset == k else 0.0
-
-        # --- Player features ---
-        labels = ["me", "p2", "p3"]
-        for i in range(n):
-            p = after.players[(after.current_player_idx + i) % n]
-            label = labels[i] if i < len(labels) else f"p{i + 1}"
-            feats[f"score_{label}"] = p.total_score / 10000.0
-            feats[f"strich_{label}"] = 1.0 if p.has_strich else 0.0
-            feats[f"money_{label}"] = p.money / 1000.0
-
-        # --- Game context features ---
-        feats["turns_to_bonus"] = max(0, 10 - after.turn_number) / 10.0
-        feats["is_final_round"] = 1.0 if after.is_final_round else 0.0
-
-        # --- Ends Turn Feature ---
-        feats["ends_turn"] = 1.0 if ends_turn else 0.0
-
-        # --- --- --- Derived Features --- --- ---
-
-        # --- Money-rule features: each mirrors one way money changes hands ---
-        # Prospective score: the mover's total if the turn ended right now
-        # (already banked when the turn ended, else banked + points at risk).
-        prospective = (
-            after.players[after.current_player_idx].total_score + after.total_turn_score
-        )
-        opponents = [
-            after.players[(after.current_player_idx + i) % n] for i in range(1, n)
-        ]
-        opp_labels = [
-            labels[i] if i < len(labels) else f"p{i + 1}" for i in range(1, n)
-        ]
-        best_opp = max((p.total_score for p in opponents), default=0)
-
-        # Winning / placement (winner collects 50c + 70c).
-        feats["prospective_score"] = prospective / 10000.0
-        feats["points_to_win"] = max(0, 10000 - prospective) / 10000.0
-        feats["crosses_10k"] = 1.0 if prospective >= 10000 else 0.0
-        feats["score_best_opp"] = best_opp / 10000.0
-        feats["is_leading"] = 1.0 if prospective > best_opp else 0.0
-        for label, p in zip(opp_labels, opponents):
-            feats[f"gap_{label}"] = (prospective - p.total_score) / 10000.0
-
-        # Under-5000 penalty (50c to the winner).
-        feats["below_5000_me"] = 1.0 if prospective < 5000 else 0.0
-        feats["points_to_5000"] = max(0, 5000 - prospective) / 5000.0
-        for label, p in zip(opp_labels, opponents):
-            feats[f"below_5000_{label}"] = 1.0 if p.total_score < 5000 else 0.0
-        feats["opps_below_5000"] = (
-            sum(p.total_score < 5000 for p in opponents) / (n - 1) if n > 1 else 0.0
-        )
-
-        # Win-by-round-10 bonus (50c from each player) still attainable.
-        feats["round_bonus_alive"] = 1.0 if after.turn_number <= 10 else 0.0
-
-        # Completing the strasse on the next roll would be the 3rd+ roll: Super.
-        feats["flag_super_strasse"] = (
-            1.0 if after.can_complete_lange_strasse and after.roll_count >= 2 else 0.0
-        )
-
-        # --- Older Hand crafted features ---
-        kept_counts = Counter(flatten(after.kept_groups))
-        for face in range(1, 7):
-            feats[f"kept{face}"] = kept_counts.get(face, 0) / 6.0
-
-        feats["grouped1"] = triplet_size[1] / 6.0  # 1s sitting inside a triplet
-        feats["grouped5"] = triplet_size[5] / 6.0  # 5s sitting inside a triplet
-
-        # Turn flow (raw + derived scores).
-        feats["current_set_score"] = after.current_set_score / 2000.0
-        feats["total_turn_score"] = after.total_turn_score / 10000.0
-        feats["dice_left"] = (6 - sum(kept_counts.values())) / 6.0
-
-        # Situation flags (derived).
-        feats["flag_lange_strasse"] = 1.0 if after.can_complete_lange_strasse else 0.0
-        feats["flag_talheim"] = 1.0 if after.can_complete_talheim else 0.0
-        feats["flag_keep_any"] = 1.0 if after.can_keep_any else 0.0
-
+        for names, section in _SECTIONS:
+            feats.update(zip(names, section(after, ends_turn)))
         return feats
 
     # ------------------------------------------------------------------ #
@@ -325,6 +500,48 @@ class StateExtractor:
         )
         return after, ends_turn
 
+    @staticmethod
+    def afterstate_key(state: GameState, action) -> tuple:
+        """A hashable, canonical identity of the afterstate ``action`` leads to.
+
+        Two actions share a key exactly when ``_afterstate`` gives the same position
+        (kept dice as a packed, order-free code) *and* the same points were banked,
+        so anything computed from the afterstate plus the banked points (every atom,
+        and the solvers' values) can be shared between them.
+        """
+        return StateExtractor.afterstate_keys(state, [action])[0]
+
+    @staticmethod
+    def afterstate_keys(state: GameState, actions) -> list[tuple]:
+        """``afterstate_key`` of every action of one decision. Much cheaper than
+        building the afterstates: the decision's part is computed once, and each
+        action's part is a few operations on packed dice codes."""
+        context = (
+            tuple((p.total_score, p.has_strich, p.money) for p in state.players),
+            state.current_player_idx,
+            state.starting_player_idx,
+            state.turn_number,
+            state.is_final_round,
+        )
+        old = pack_groups(state.kept_groups)
+        prev = state.turn_accumulated_score
+        # A newly completed Lange Strasse pays out (Super on the 3rd+ roll).
+        strasse = 0 if is_lange_strasse_packed(kept_dice(old)) else 1
+        strasse += strasse and state.roll_count >= 3
+
+        keys = []
+        for action in actions:
+            config = merge_packed(old, pack(action.dice_to_keep))
+            dice = kept_dice(config)
+            pays = strasse if is_lange_strasse_packed(dice) else 0
+            if action.stop_after or talheim_score_packed(dice) > 0:
+                keys.append((context, "banked", prev + score_packed(config), pays))
+            elif dice % 7 == NUM_DICE:
+                keys.append((context, "hot", prev + score_packed(config), pays))
+            else:
+                keys.append((context, config, prev, state.roll_count, pays))
+        return keys
+
     @staticmethod
     def select_features(state: GameState, action, keys: list[str]) -> List[float]:
         """The afterstate atoms named in ``keys``, in order (an unknown key raises)."""
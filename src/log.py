@@ -2,13 +2,37 @@
 
 Game/dice/player code calls ``log(...)`` instead of ``print(...)``. Whether it
 prints is decided once, by ``VERBOSE`` in config.py: set it False to run silent
-(e.g. a big batch of simulated games), True to watch play-by-play.
+(e.g. a big batch of simulated games), True to watch play-by-play. ``LEVEL``
+then picks how much: ``DEBUG`` (the default) shows every dice display and
+transfer, ``INFO`` only turns and game events.
+
+Silence has to be free, because a simulation calls these sites millions of
+times. So a message is formatted only once it is known to print: pass the
+values as %-style arguments (``log("%s gains %d¢", name, cents)``) or a
+callable returning the text, never a ready-made f-string, and guard anything
+that builds its message in a loop with ``if enabled(): ...``.
 """
 
 from config import VERBOSE
 
+DEBUG = 10  # per-decision detail: dice, transfers, choices
+INFO = 20  # turns, specials, game end
+
+LEVEL = DEBUG
+
+
+def enabled(level: int = INFO) -> bool:
+    """Whether a message at ``level`` would print."""
+    return VERBOSE and level >= LEVEL
+
 
-def log(*args, **kwargs) -> None:
-    """print() that stays silent unless config.VERBOSE is set."""
-    if VERBOSE:
-        print(*args, **kwargs)
+def log(message, *args, level: int = INFO, **kwargs) -> None:
+    """print() that stays silent unless config.VERBOSE is set (and ``level`` is
+    at least ``LEVEL``); ``message % args`` or ``message()`` is built only then."""
+    if not (VERBOSE and level >= LEVEL):
+        return
+    if callable(message):
+        message = message()
+    elif args:
+        message = message % args
+    print(message, **kwargs)
@@ -3,39 +3,61 @@
 - AIS_PLAY = True  -> simulate N_GAMES all-AI games (with ALGOS) and report wins.
                       Set VERBOSE=True, N_GAMES=1 to watch a single game play out.
 - AIS_PLAY = False -> play one interactive game (you, optionally vs AI opponents).
+
+Run it as ``python play.py`` (``--games``, ``--algos``, ``--seed`` and
+``--workers`` override config.py for a simulation; ``--alpha`` turns ``--games``
+into a budget and stops once the ranking is significant; ``--duplicate`` plays
+every seating of each deal on the same dice; ``--record`` stores every game).
 """
 
+import argparse
+import multiprocessing
+import random
 import sys
 from collections import Counter
+from contextlib import nullcontext
+from itertools import permutations
 
 import log as log_module
 from ai_player import AIPlayer
-from config import AIS_PLAY, SEED
+from config import ALGOS, AIS_PLAY, N_GAMES, SEED
 from game.game import Game, Player
+from game.record import GameRecorder
 from game.rules import Action
 from game_state import StateExtractor
 from log import log
+from stats import MoneyTracker, SequentialTest
 
 
 # --------------------------------------------------------------------------- #
 # The one game loop (AI seats decide for themselves, human seats are prompted)
 # --------------------------------------------------------------------------- #
-def run_game(game: Game) -> Game | None:
-    """Play ``game`` to completion. Returns the finished game (None if a human quit)."""
+def run_game(game: Game, recorder=None) -> Game | None:
+    """Play ``game`` to completion. Returns the finished game (None if a human quit).
+
+    A ``recorder`` (game.record.GameRecorder) gets every AI decision and, if the
+    game is finished, the game itself.
+    """
     while not game.game_over:
         game.advance_to_decision()
         if game.game_over:
             break
-        game.dice_set.display()
+        if log_module.enabled(log_module.DEBUG):
+            game.dice_set.display()
 
         player = game.current_player
         if isinstance(player, AIPlayer):
             state = StateExtractor.extract_state(game)
-            action = player.choose_action(state, game.legal_actions())
-            log(f"\n{player.name} chooses: {action}")
+            actions = game.legal_actions()
+            action = player.choose_action(state, actions)
+            if recorder is not None:
+                recorder.record(state, actions, action)
+            log("\n%s chooses: %s", player.name, action, level=log_module.DEBUG)
             game.apply_action(action)
         elif not take_human_turn(game):
             return None  # human quit
+    if recorder is not None:
+        recorder.end_game(game)
     return game
 
 
@@ -47,45 +69,219 @@ def _progress_bar(percent: int, width: int = 10) -> str:
     return "[" + "#" * filled + " " * (width - filled) + "]"
 
 
-def run_matchup(n_games, algorithms):
-    """Run rotated-seat AI games and return win/money totals."""
-    wins = Counter()
-    money = Counter()  # cumulative end-of-game money (¢) by algorithm
+def _seatings(algorithms, duplicate: bool) -> list[list]:
+    """The seat orders games cycle through: rotations of ``algorithms``, or in
+    duplicate play every distinct permutation of them."""
+    if duplicate:
+        return [list(p) for p in dict.fromkeys(permutations(algorithms))]
     n = len(algorithms)
-    next_percent = 10
-    for g in range(n_games):
-        seat_algorithms = [algorithms[(i + g) % n] for i in range(n)]  # rotate seats
+    return [[algorithms[(i + r) % n] for i in range(n)] for r in range(n)]  # rotate
+
+
+def _play_games(
+    games: range, algorithms, seed, duplicate: bool = False, recorder=None
+) -> list[tuple[int, list[int], list[int]]]:
+    """Play the games numbered ``games``; per game, the winner's seat and every
+    seat's money and score. With a ``seed``, game g reseeds the dice (and random players)
+    from ``(seed, g)`` alone, so it plays out the same in whichever process and
+    order it is run. In duplicate play the games of one deal (one per seating)
+    share their dice instead: each seat rolls from Game's per-turn streams
+    seeded by ``(seed, deal)``. A ``recorder`` (game.record.GameRecorder) gets
+    every game, tagged with ``seed`` and its number ``g``."""
+    seatings = _seatings(algorithms, duplicate)
+    outcomes = []
+    for g in games:
+        deal, seating = divmod(g, len(seatings))
+        dice_seed = None
+        if seed is not None:
+            random.seed(f"{seed}:{g}")
+            if duplicate:
+                dice_seed = f"{seed}:{deal}"
         players = [
             AIPlayer(f"AI Player {i + 1}", algorithm)
-            for i, algorithm in enumerate(seat_algorithms)
+            for i, algorithm in enumerate(seatings[seating])
         ]
-        game = run_game(Game(players))
+        if recorder is not None:
+            recorder.begin(-1 if seed is None else seed, g)
+        game = run_game(Game(players, dice_seed), recorder)
         assert game is not None and game.winner is not None
-        wins[seat_algorithms[game.players.index(game.winner)]] += 1
-        for seat, algorithm in enumerate(seat_algorithms):
-            money[algorithm] += game.players[seat].money
+        outcomes.append(
+            (
+                game.players.index(game.winner),
+                [p.money for p in game.players],
+                [p.total_score for p in game.players],
+            )
+        )
+    return outcomes
+
+
+def _play_shard(args) -> list[tuple[int, list[int], list[int]]]:
+    return _play_games(*args)
+
+
+def _init_worker(verbose: bool) -> None:
+    log_module.VERBOSE = verbose
+
+
+def run_matchup(
+    n_games,
+    algorithms,
+    seed=None,
+    workers: int = 1,
+    on_game=None,
+    duplicate=False,
+    first_game: int = 0,
+    record=None,
+    recorder=None,
+):
+    """Run rotated-seat AI games and return win/money totals.
+
+    ``duplicate`` plays deals instead of single games, as in duplicate bridge:
+    every distinct seat permutation of ``algorithms`` plays the same dice (see
+    Game's ``dice_seed``), so the luck of the deal cancels out of the comparison
+    and far fewer games give the same confidence. ``n_games`` is then rounded up
+    to whole deals (6 games for three distinct algorithms): the totals, the
+    ``record`` calls and ``sum(wins.values())`` count every game played, so a
+    caller keeping count of games must take it from them, not from ``n_games``.
+    A ``first_game`` past 0 must start a deal (ValueError otherwise).
+
+    ``workers > 1`` shards the games over a process pool (each worker loads its
+    models once, on first use). Every game is seeded from ``seed`` and its own
+    number, and results are merged in game order, so a fixed seed gives the same
+    totals for any worker count.
+
+    ``on_game``, if given, is called after each game -- each deal, in duplicate
+    play -- in order, with its money by algorithm per game; returning True stops
+    the matchup there (see stats.SequentialTest). ``sum(wins.values())`` is then
+    the games played.
+
+    ``first_game`` skips the games numbered below it (already played with the
+    same seed, e.g. by tournament.py), and ``record``, if given, is called with
+    ``(g, seat_algorithms, winner_seat, seat_money, seat_scores)`` for each game
+    in order.
+
+    A ``recorder`` (game.record.GameRecorder) stores every game's decisions,
+    tagged with the seed and game number that replay it; it needs
+    ``workers=1``, and it makes an unseeded matchup draw a seed.
+    """
+    if recorder is not None and workers > 1:
+        raise ValueError("Recording games needs workers=1")
+    wins = Counter()
+    money = Counter()  # cumulative end-of-game money (¢) by algorithm
+    if (workers > 1 or duplicate or recorder is not None) and seed is None:
+        seed = random.randrange(2**32)  # the workers must not share one dice stream
+    seatings = _seatings(algorithms, duplicate)
+    deal_size = len(seatings) if duplicate else 1
+    if first_game % deal_size:
+        raise ValueError(f"first_game must start a deal of {deal_size} games")
+    n_games = -(-n_games // deal_size) * deal_size
+    size = 1 if workers <= 1 else max(1, n_games // (workers * 16))
+    starts = range(first_game, n_games, size)
+    shards = [range(s, min(s + size, n_games)) for s in starts]
+
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(
+            workers, initializer=_init_worker, initargs=(log_module.VERBOSE,)
+        )
+        args = [(shard, algorithms, seed, duplicate) for shard in shards]
+        results = pool.imap(_play_shard, args)
+    else:
+        results = (
+            _play_games(shard, algorithms, seed, duplicate, recorder)
+            for shard in shards
+        )
 
-        progress = int((g + 1) * 100 / n_games)
-        while next_percent <= 100 and progress >= next_percent:
-            sys.stdout.write(f"\r{_progress_bar(next_percent)} {next_percent:3d}%")
-            sys.stdout.flush()
-            next_percent += 10
+    next_percent = 10
+    stopped = False
+    deal_money = Counter()
+    try:
+        for shard, outcomes in zip(shards, results):
+            for g, (winner, seat_money, seat_scores) in zip(shard, outcomes):
+                seat_algorithms = seatings[g % len(seatings)]
+                if record is not None:
+                    record(g, seat_algorithms, winner, seat_money, seat_scores)
+                wins[seat_algorithms[winner]] += 1
+                for algorithm, cents in zip(seat_algorithms, seat_money):
+                    money[algorithm] += cents
+                    deal_money[algorithm] += cents
+                if (g + 1) % deal_size:
+                    continue
+                per_game = {a: cents / deal_size for a, cents in deal_money.items()}
+                deal_money.clear()
+                if on_game is not None and on_game(per_game):
+                    stopped = True
+                    break
+            if stopped:
+                break
+
+            progress = int(shard.stop * 100 / n_games)
+            while next_percent <= 100 and progress >= next_percent:
+                sys.stdout.write(f"\r{_progress_bar(next_percent)} {next_percent:3d}%")
+                sys.stdout.flush()
+                next_percent += 10
+    finally:
+        if pool is not None:
+            pool.terminate()  # every result we need is in; drop any still running
+            pool.join()
 
     sys.stdout.write("\n")
     return wins, money
 
 
-def simulate(n_games, algorithms, seed=None):
-    """Play ``n_games`` all-AI games and report wins and cumulative money by algorithm."""
-    wins, money = run_matchup(n_games, algorithms)
-
-    print(f"\nSimulated {n_games} game(s) with {algorithms}.")
+def simulate(
+    n_games,
+    algorithms,
+    seed=None,
+    workers: int = 1,
+    alpha=None,
+    margin: float = 0.0,
+    duplicate: bool = False,
+    record_stem=None,
+):
+    """Play ``n_games`` all-AI games and report wins and cumulative money by
+    algorithm, with confidence intervals on ¢/game.
+
+    With ``alpha``, ``n_games`` is only the budget: the matchup stops as soon as
+    the ¢/game ranking is settled at that level (stats.SequentialTest; pairs
+    within ``margin`` ¢/game count as tied). ``duplicate`` plays deals of every
+    seat permutation on shared dice (see run_matchup); the intervals are then
+    over deals. With ``record_stem`` every game is appended to that record
+    store (game.record).
+    """
+    deal_size = len(_seatings(algorithms, duplicate)) if duplicate else 1
+    deals = -(-n_games // deal_size)
+    n_games = deals * deal_size  # as run_matchup rounds it
+    tracker = MoneyTracker(algorithms)
+    if alpha is None:
+        on_game = tracker.add
+        level = 0.95
+    else:
+        every = max(1, 200 // deal_size)
+        on_game = SequentialTest(tracker, deals, alpha, margin, every)
+        level = 1 - alpha
+    recorder = GameRecorder(record_stem) if record_stem is not None else None
+    with recorder if recorder is not None else nullcontext():
+        wins, money = run_matchup(
+            n_games, algorithms, seed, workers, on_game, duplicate, recorder=recorder
+        )
+    played = sum(wins.values())
+
+    deals = f", {tracker.n} deals of {deal_size}" if duplicate else ""
+    print(f"\nSimulated {played} game(s){deals} with {algorithms}.")
     print("Wins by algorithm:")
     for algorithm, count in wins.most_common():
-        print(f"  {algorithm:8s} {count:5d}  ({count / n_games:.0%})")
-    print("Money by algorithm (settled at the end, as in real play):")
+        print(f"  {algorithm:8s} {count:5d}  ({count / played:.0%})")
+    print(f"Money by algorithm (settled at the end, as in real play; {level:.0%} CI):")
     for algorithm, total in money.most_common():
-        print(f"  {algorithm:8s} {total:+7d}¢  ({total / n_games:+.1f}¢/game)")
+        mean, half = tracker.interval(algorithm, level)
+        print(f"  {algorithm:8s} {total:+7d}¢  ({mean:+.1f} ± {half:.1f}¢/game)")
+    if alpha is not None:
+        how = "budget used up" if played >= n_games else "stopped early"
+        print(f"Ranking after {played} of {n_games} games ({how}):")
+        for a, b, verdict in on_game.verdicts():
+            mean, half = tracker.difference(a, b, on_game.level)
+            print(f"  {a} vs {b}: {verdict} ({mean:+.1f} ± {half:.1f}¢/game)")
 
 
 # --------------------------------------------------------------------------- #
@@ -197,9 +393,63 @@ def play_interactive(algorithms):
     run_game(Game(players))
 
 
-def play(n_games, algorithms):
+def play(
+    n_games,
+    algorithms,
+    seed=SEED,
+    workers: int = 1,
+    alpha=None,
+    margin=0.0,
+    duplicate: bool = False,
+    record_stem=None,
+):
     print("🎲 Welcome to 3-Player Lange Strasse! 🎲")
     if AIS_PLAY:
-        simulate(n_games, algorithms, SEED)
+        simulate(
+            n_games, algorithms, seed, workers, alpha, margin, duplicate, record_stem
+        )
     else:
         play_interactive(algorithms)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Play or simulate Lange Strasse.")
+    parser.add_argument("--games", type=int, default=N_GAMES)
+    parser.add_argument("--algos", nargs="+", default=ALGOS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="processes to spread simulated games over"
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        help="stop once the ranking is significant at this level (--games = budget)",
+    )
+    parser.add_argument(
+        "--margin", type=float, default=0.0, help="¢/game gap that counts as a tie"
+    )
+    parser.add_argument(
+        "--duplicate",
+        action="store_true",
+        help="replay each deal's dice under every seat permutation",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="STEM",
+        help="append every game to the record store STEM (needs --workers 1)",
+    )
+    args = parser.parse_args(argv)
+    play(
+        args.games,
+        args.algos,
+        args.seed,
+        args.workers,
+        args.alpha,
+        args.margin,
+        args.duplicate,
+        args.record,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Confidence intervals and sequential stopping for AI matchups.
+
+A matchup's verdict is ¢/game per algorithm, and the games are independent, so
+each algorithm's per-game money is an i.i.d. sample and a normal-approximation
+interval on its mean is all the statistics needed. Comparisons use the *paired*
+per-game difference (two algorithms in the same game share its dice and its
+zero-sum settlement), which is far less noisy than the two separate intervals.
+
+``SequentialTest`` looks at the matchup every ``every`` games and stops it once
+the ranking is settled: every neighbouring pair in the ¢/game order is either
+significantly apart, practically tied (its interval inside ``±margin``), or
+hopeless (a gap one standard error above the estimate would still not clear the
+interval the full game budget can buy). Looking repeatedly at a growing sample
+inflates the error rate, so each look is held to ``alpha / looks`` (Bonferroni
+over the planned looks) -- conservative, but simple and valid whenever it stops.
+"""
+
+from collections.abc import Mapping, Sequence
+from statistics import NormalDist
+
+import numpy as np
+
+
+def _z(level: float) -> float:
+    """Two-sided normal quantile for a ``level`` confidence interval."""
+    return NormalDist().inv_cdf(0.5 + level / 2)
+
+
+def mean_interval(values, level: float = 0.95) -> tuple[float, float]:
+    """Sample mean and the half-width of its ``level`` confidence interval."""
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return float(values.mean()) if len(values) else 0.0, float("inf")
+    half = _z(level) * values.std(ddof=1) / np.sqrt(len(values))
+    return float(values.mean()), float(half)
+
+
+class MoneyTracker:
+    """Per-game money (¢) by algorithm over a matchup, for interval estimates."""
+
+    def __init__(self, algorithms: Sequence):
+        self.algorithms = list(dict.fromkeys(algorithms))  # unique, in seat order
+        self._rows: list[list[int]] = []
+
+    @property
+    def n(self) -> int:
+        return len(self._rows)
+
+    def add(self, cents: Mapping) -> None:
+        """Record one game: each algorithm's money over all of its seats."""
+        self._rows.append([cents.get(algorithm, 0) for algorithm in self.algorithms])
+
+    def _column(self, algorithm) -> np.ndarray:
+        return np.array(self._rows, dtype=float)[:, self.algorithms.index(algorithm)]
+
+    def interval(self, algorithm, level: float = 0.95) -> tuple[float, float]:
+        """``algorithm``'s ¢/game and the half-width of its confidence interval."""
+        return mean_interval(self._column(algorithm), level)
+
+    def difference(self, a, b, level: float = 0.95) -> tuple[float, float]:
+        """Paired ¢/game of ``a`` minus ``b`` and its interval half-width."""
+        return mean_interval(self._column(a) - self._column(b), level)
+
+    def ranking(self) -> list:
+        """The algorithms by ¢/game, best first."""
+        means = np.array(self._rows, dtype=float).mean(0)
+        return [self.algorithms[i] for i in np.argsort(-means, kind="stable")]
+
+
+class SequentialTest:
+    """Interval stopping on paired per-game money (see the module docstring).
+
+    Use it as run_matchup's ``on_game`` callback: it records each game into
+    ``tracker`` and returns True once the ranking is settled.
+    """
+
+    def __init__(
+        self,
+        tracker: MoneyTracker,
+        max_games: int,
+        alpha: float = 0.05,
+        margin: float = 0.0,
+        every: int = 200,
+    ):
+        self.tracker = tracker
+        self.max_games = max_games
+        self.alpha = alpha
+        self.margin = margin
+        self.every = every
+        looks = max(1, max_games // every)
+        self.level = 1 - alpha / looks  # per-look confidence level
+
+    def __call__(self, cents: Mapping) -> bool:
+        self.tracker.add(cents)
+        n = self.tracker.n
+        return n % self.every == 0 and n < self.max_games and self.settled()
+
+    def verdict(self, a, b) -> str:
+        """``a`` (ranked above ``b``) is "ahead", "tied" (within ``margin``),
+        "hopeless" (not separable within the budget) or still "open"."""
+        mean, half = self.tracker.difference(a, b, self.level)
+        if mean - half > 0:
+            return "ahead"
+        if -self.margin < mean - half and mean + half < self.margin:
+            return "tied"
+        # Even a gap one standard error above the estimate would stay inside
+        # the interval the whole budget can buy.
+        stderr = half / _z(self.level)
+        final_half = half * np.sqrt(self.tracker.n / self.max_games)
+        if abs(mean) + stderr < final_half:
+            return "hopeless"
+        return "open"
+
+    def verdicts(self) -> list[tuple[object, object, str]]:
+        """The verdict for every neighbouring pair of the current ranking."""
+        ranking = self.tracker.ranking()
+        return [(a, b, self.verdict(a, b)) for a, b in zip(ranking, ranking[1:])]
+
+    def settled(self) -> bool:
+        return all(verdict != "open" for _a, _b, verdict in self.verdicts())
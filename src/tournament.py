@@ -0,0 +1,297 @@
+"""Round-robin tournaments with a persistent per-game results store.
+
+    python tournament.py --algos dp td_small nn simple random --games 300
+    python tournament.py --algos dp td_small nn --baselines simple random
+
+Every triple of ``--algos`` (or, with ``--baselines``, each algorithm against
+the fixed baseline pair) plays a play.run_matchup of ``--games`` games with
+rotated seats. Each game is appended to an SQLite store as it finishes, keyed
+by the lineup -- every algorithm as ``name@version``, where the version hashes
+the code (and weights file) it plays with -- plus the seed and the game number.
+Because run_matchup seeds game g from ``(seed, g)`` alone, a stored game is
+exactly the game a rerun would play, so reruns only simulate what is missing:
+more games, a new algorithm, or a retrained model (new weights, new version,
+new games). Games of stale versions stay in the store but are not rated.
+
+Ratings come from all stored games of the current versions: ¢/game per
+algorithm (with a 95% interval) and an Elo-style rating fitted to the pairwise
+results inside each game (higher final score beats lower), Bradley-Terry by
+maximum likelihood so the rating does not depend on the order games were played.
+"""
+
+import argparse
+import hashlib
+import importlib
+import sqlite3
+import sys
+from collections import defaultdict
+from contextlib import closing
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+
+import log
+import play
+from algorithms.nn import WEIGHTS_PATH as NN_WEIGHTS_PATH
+from algorithms.td import VARIANTS as TD_VARIANTS
+from config import SEED
+from stats import mean_interval
+
+STORE_PATH = Path(__file__).with_name("tournament_results.sqlite")
+
+_SRC = Path(__file__).parent
+# Every algorithm plays through these.
+_ENGINE_SOURCES = ["game/rules.py", "game/game.py", "ai_player.py"]
+# dp and game_dp value actions once per afterstate (StateExtractor.afterstate_keys).
+_DP_SOURCES = ["algorithms/dp.py", "game_state.py"]
+_GAME_DP_SOURCES = [*_DP_SOURCES, "algorithms/game_value.py"]
+_TD_SOURCES = [*_GAME_DP_SOURCES, "algorithms/td.py"]
+_SOURCES = {
+    "random": [],
+    "simple": ["algorithms/heuristic.py", "game_state.py"],
+    "dp": _DP_SOURCES,
+    "game_dp": _GAME_DP_SOURCES,
+    "nn": [*_TD_SOURCES, "algorithms/nn.py"],
+    **{name: _TD_SOURCES for name in TD_VARIANTS},
+    "rollout": [*_DP_SOURCES, "algorithms/rollout.py", "game/vec_game.py"],
+}
+_WEIGHTS = {"nn": NN_WEIGHTS_PATH, **{name: v.path for name, v in TD_VARIANTS.items()}}
+# Module settings an algorithm plays by, hashed as they are at run time (a script
+# may set them, e.g. expectimax.DEPTH = 1, without touching the source). The
+# modules are imported only to hash a lineup that plays them.
+_SEARCH_SETTINGS = (
+    "algorithms.expectimax",
+    ("DEPTH", "NETWORK_DEPTH", "NODE_BUDGET", "TIME_BUDGET"),
+)
+_SETTINGS = {"rollout": ("algorithms.rollout", ("ROLLOUTS", "WORKERS", "MARGIN"))}
+
+ELO_BASE = 1500  # the mean rating
+
+
+# --------------------------------------------------------------------------- #
+# Versions
+# --------------------------------------------------------------------------- #
+def algorithm_version(name: str) -> str:
+    """Short hash of everything ``name`` plays with: the engine, its own
+    modules, its settings, and its weights file (a missing file hashes as
+    untrained). A lookahead plays with its leaf's sources and weights, and the
+    search."""
+    if name in _SOURCES:
+        sources, weights = _SOURCES[name], _WEIGHTS.get(name)
+        settings = _SETTINGS.get(name)
+    else:
+        leaf = _lookahead_leaf(name)
+        sources = [*_SOURCES[leaf], "algorithms/expectimax.py"]
+        weights, settings = _WEIGHTS.get(leaf), _SEARCH_SETTINGS
+    digest = hashlib.sha256(name.encode())
+    for source in _ENGINE_SOURCES + sources:
+        digest.update((_SRC / source).read_bytes())
+    if settings is not None:
+        module, names = settings
+        module = importlib.import_module(module)
+        values = {setting: getattr(module, setting) for setting in names}
+        digest.update(repr(values).encode())
+    if weights is not None:
+        digest.update(weights.read_bytes() if weights.exists() else b"untrained")
+    return digest.hexdigest()[:12]
+
+
+def _lookahead_leaf(name: str) -> str:
+    """The leaf algorithm of the lookahead ``name`` (ValueError if it is none)."""
+    from algorithms.expectimax import LEAVES, PREFIX
+
+    leaf = name.removeprefix(PREFIX)
+    if leaf == name or leaf not in LEAVES:
+        raise ValueError(f"Unknown AI type: {name}")
+    return leaf
+
+
+# --------------------------------------------------------------------------- #
+# Store
+# --------------------------------------------------------------------------- #
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    matchup TEXT NOT NULL,      -- the lineup as passed to run_matchup, "|"-joined
+    seed INTEGER NOT NULL,
+    game INTEGER NOT NULL,      -- run_matchup's game number (fixes seats and dice)
+    seat0 TEXT NOT NULL,        -- name@version per seat
+    seat1 TEXT NOT NULL,
+    seat2 TEXT NOT NULL,
+    winner INTEGER NOT NULL,    -- seat
+    money0 INTEGER NOT NULL,
+    money1 INTEGER NOT NULL,
+    money2 INTEGER NOT NULL,
+    score0 INTEGER NOT NULL,
+    score1 INTEGER NOT NULL,
+    score2 INTEGER NOT NULL,
+    PRIMARY KEY (matchup, seed, game)
+)
+"""
+
+
+def open_store(path: Path = STORE_PATH) -> sqlite3.Connection:
+    db = sqlite3.connect(path)
+    db.execute(_SCHEMA)
+    return db
+
+
+def _played(db: sqlite3.Connection, matchup: str, seed: int) -> int:
+    """How many games of ``matchup`` are stored: run_matchup delivers games in
+    order, so they are always 0..k-1."""
+    row = db.execute(
+        "SELECT COUNT(*) FROM games WHERE matchup = ? AND seed = ?", (matchup, seed)
+    ).fetchone()
+    return row[0]
+
+
+# --------------------------------------------------------------------------- #
+# Scheduling and running
+# --------------------------------------------------------------------------- #
+def schedule(algorithms, baselines=None) -> list[tuple[str, str, str]]:
+    """Every triple of ``algorithms``, or each one against the ``baselines`` pair."""
+    if baselines:
+        if len(baselines) != 2:
+            raise ValueError("Baselines must be exactly two algorithms.")
+        others = [a for a in algorithms if a not in baselines]
+        if not others:
+            raise ValueError("No algorithm to play against the baselines.")
+        return [(a, *baselines) for a in others]
+    if len(set(algorithms)) < 3:
+        raise ValueError("A round robin needs at least three algorithms.")
+    return list(combinations(algorithms, 3))
+
+
+def run_tournament(
+    algorithms,
+    n_games: int,
+    baselines=None,
+    seed: int = SEED,
+    workers: int = 1,
+    store: Path = STORE_PATH,
+) -> None:
+    """Bring every scheduled matchup up to ``n_games`` stored games (playing only
+    the missing ones), then print the ratings."""
+    if seed is None:
+        # Unseeded games could not be told apart from a rerun's, nor replayed.
+        raise ValueError("A tournament needs a seed (--seed, or SEED in config.py).")
+    log.VERBOSE = False
+    names = dict.fromkeys([*algorithms, *(baselines or ())])
+    versions = {a: algorithm_version(a) for a in names}
+    with closing(open_store(store)) as db:
+        for lineup in schedule(algorithms, baselines):
+            tagged = {a: f"{a}@{versions[a]}" for a in lineup}
+            matchup = "|".join(tagged[a] for a in lineup)
+            done = _played(db, matchup, seed)
+            if done >= n_games:
+                print(f"{' vs '.join(lineup)}: {done} games stored")
+                continue
+            print(f"{' vs '.join(lineup)}: playing games {done}..{n_games - 1}")
+
+            def record(g, seat_algorithms, winner, seat_money, seat_scores):
+                db.execute(
+                    "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        matchup,
+                        seed,
+                        g,
+                        *(tagged[a] for a in seat_algorithms),
+                        winner,
+                        *seat_money,
+                        *seat_scores,
+                    ),
+                )
+                db.commit()  # an interrupted run keeps every finished game
+
+            play.run_matchup(
+                n_games, list(lineup), seed, workers, first_game=done, record=record
+            )
+        print_ratings(db, [f"{a}@{v}" for a, v in versions.items()])
+
+
+def ratings(db: sqlite3.Connection, tags) -> dict[str, dict]:
+    """¢/game and Elo per ``name@version`` in ``tags``, from the stored games
+    whose seats are all in ``tags``."""
+    tags = list(tags)
+    marks = ", ".join("?" * len(tags))
+    rows = db.execute(
+        "SELECT seat0, seat1, seat2, money0, money1, money2, score0, score1, score2 "
+        f"FROM games WHERE seat0 IN ({marks}) AND seat1 IN ({marks}) "
+        f"AND seat2 IN ({marks})",
+        tags * 3,
+    ).fetchall()
+
+    money = defaultdict(list)
+    index = {tag: i for i, tag in enumerate(tags)}
+    wins = np.zeros((len(tags), len(tags)))  # wins[i, j]: i finished above j
+    for row in rows:
+        seats, cents, scores = row[0:3], row[3:6], row[6:9]
+        for tag, c in zip(seats, cents):
+            money[tag].append(c)
+        for a, b in combinations(range(3), 2):
+            i, j = index[seats[a]], index[seats[b]]
+            if i == j:
+                continue
+            # finish_game ranks by score, ties to the earlier seat
+            if scores[a] >= scores[b]:
+                wins[i, j] += 1
+            else:
+                wins[j, i] += 1
+
+    elo = _bradley_terry(wins)
+    return {
+        tag: {
+            "games": len(money[tag]),
+            "cents": mean_interval(money[tag]) if money[tag] else (0.0, float("inf")),
+            "elo": elo[index[tag]],
+        }
+        for tag in tags
+    }
+
+
+def _bradley_terry(wins: np.ndarray, iterations: int = 500) -> np.ndarray:
+    """Elo ratings (mean ``ELO_BASE``) maximising the Bradley-Terry likelihood of
+    the pairwise ``wins``, by Hunter's MM updates. Every pair that met gets one
+    virtual draw, so an unbeaten player still has a finite rating."""
+    met = (wins + wins.T) > 0
+    wins = wins + 0.5 * met
+    games = wins + wins.T
+    strength = np.ones(len(wins))
+    for _ in range(iterations):
+        denom = (games / (strength[:, None] + strength[None, :])).sum(1)
+        strength = np.where(denom > 0, wins.sum(1) / np.maximum(denom, 1e-12), strength)
+        strength /= np.exp(np.log(strength).mean())
+    return ELO_BASE + 400 * np.log10(strength)
+
+
+def print_ratings(db: sqlite3.Connection, tags) -> None:
+    table = ratings(db, tags)
+    print("\nRatings (current versions, all stored games):")
+    print(f"  {'algorithm':24s} {'games':>6s} {'¢/game':>16s} {'Elo':>6s}")
+    for tag, r in sorted(table.items(), key=lambda item: -item[1]["elo"]):
+        mean, half = r["cents"]
+        cents = f"{mean:+.1f} ± {half:.1f}"
+        print(f"  {tag:24s} {r['games']:6d} {cents:>16s} {r['elo']:6.0f}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Round-robin AI tournament.")
+    parser.add_argument("--algos", nargs="+", required=True)
+    parser.add_argument("--games", type=int, default=300, help="games per matchup")
+    parser.add_argument(
+        "--baselines", nargs=2, help="play each algorithm against these two only"
+    )
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--store", type=Path, default=STORE_PATH)
+    args = parser.parse_args(argv)
+    try:
+        run_tournament(
+            args.algos, args.games, args.baselines, args.seed, args.workers, args.store
+        )
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""The turn DP: its table builds and its cache file."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from algorithms import dp
+
+
+class TestParallelBuild(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.trans = dp._Transitions()
+        cls.serial = dp._solve(cls.trans)[0][..., 0]
+
+    def test_parallel_table_is_the_serial_table(self):
+        parallel = dp._solve_parallel(self.trans, 2)
+        np.testing.assert_array_equal(parallel, self.serial)
+
+    def test_small_builds_stay_in_process(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "values.bin"
+            self.assertEqual(dp.build(4, path), 1)
+            self.assertTrue(dp.load_cache(path))
+            np.testing.assert_array_equal(dp._VALUES, self.serial)
+
+
+class TestTable(unittest.TestCase):
+    def test_table_is_the_recursive_solution(self):
+        """Every state the memoized recursion visits from a turn start holds the
+        value the bottom-up sweeps gave it."""
+        dp.ensure_ready()
+        index = dict(dp._CONFIG_INDEX)
+        with mock.patch.dict(dp._CONFIG_INDEX, clear=True):
+            with mock.patch.dict(dp._OFF_TABLE, clear=True):
+                start = dp._value(0, 0)
+                recursive = dict(dp._OFF_TABLE)
+        self.assertAlmostEqual(start, dp._VALUES[index[0], 0], places=9)
+        checked = 0
+        for (config, prev), value in recursive.items():
+            if config in index and prev < dp.T_MAX:
+                col = prev // dp.PREV_STEP
+                self.assertAlmostEqual(value, dp._VALUES[index[config], col], places=9)
+                checked += 1
+        self.assertGreater(checked, 1000)
+
+
+class TestCacheFile(unittest.TestCase):
+    def setUp(self):
+        dp.ensure_ready()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "values.bin"
+        dp.save_cache(self.path)
+
+    def test_round_trip(self):
+        table = dp._VALUES.copy()
+        self.assertTrue(dp.load_cache(self.path))
+        np.testing.assert_array_equal(dp._VALUES, table)
+
+    def test_stale_header(self):
+        data = bytearray(self.path.read_bytes())
+        data[4] += 1  # the format version
+        self.path.write_bytes(bytes(data))
+        self.assertFalse(dp.load_cache(self.path))
+
+    def test_rules_changed(self):
+        with mock.patch.object(dp, "_rules_checksum", return_value=0):
+            self.assertFalse(dp.load_cache(self.path))
+
+    def test_partial_file(self):
+        data = self.path.read_bytes()
+        self.path.write_bytes(data[:-8])
+        self.assertFalse(dp.load_cache(self.path))
+
+    def test_missing_file(self):
+        self.assertFalse(dp.load_cache(self.path.with_name("missing.bin")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""VecEnv's step: one decision per game, the actor's own money as reward, and a
+finished game reported and replaced in the same call."""
+
+import random
+import unittest
+
+import numpy as np
+
+from env import VecEnv
+from game.rules import Action, unpack
+
+N_ENVS = 16
+
+
+class TestVecEnv(unittest.TestCase):
+    def test_step_semantics(self):
+        env = VecEnv(N_ENVS, seed=4)
+        obs = env.reset()
+        policy = random.Random(4)
+        finished = 0
+        while finished < 2 * N_ENVS:
+            actions, mask = env.legal_actions()
+            for i, game_actions in enumerate(actions):
+                self.assertEqual(mask[i].sum(), len(game_actions))
+                self.assertTrue(mask[i, : len(game_actions)].all())
+                legal = env.game.legal_actions(i)
+                self.assertEqual(
+                    [Action(unpack(keep), stop) for keep, stop in legal], game_actions
+                )
+            choices = [policy.randrange(len(a)) for a in actions]
+            actors = env.actors
+            new_obs, rewards, dones, info = env.step(choices)
+
+            np.testing.assert_array_equal(info["actor"], actors)
+            rows = np.arange(N_ENVS)
+            live = ~dones
+            money = new_obs["money"][rows, actors] - obs["money"][rows, actors]
+            np.testing.assert_array_equal(rewards[live], money[live])
+            final = info["final_money"][rows, actors] - obs["money"][rows, actors]
+            np.testing.assert_array_equal(rewards[dones], final[dones])
+            # money only changes hands
+            self.assertTrue((info["final_money"][dones].sum(1) == 0).all())
+            # a finished game's slot already holds a fresh game's first decision
+            self.assertTrue((new_obs["scores"][dones] == 0).all())
+            self.assertTrue((new_obs["turn"][dones] == 1).all())
+            finished += int(dones.sum())
+            obs = new_obs
+
+    def test_illegal_choice(self):
+        env = VecEnv(2, seed=1)
+        env.reset()
+        _actions, mask = env.legal_actions()
+        for bad in (-1, mask.shape[1]):
+            with self.assertRaises(ValueError):
+                env.step([bad, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""With dp leaves the lookahead makes dp's choices: dp is already the exact
+optimum over the turn, so searching it deeper can't improve on it."""
+
+import random
+import unittest
+
+import numpy as np
+
+from algorithms.dp import action_value as dp_action_value
+from algorithms.expectimax import lookahead_action_values
+from game.game import Game
+from game_state import StateExtractor
+
+
+class TestDpLeaves(unittest.TestCase):
+    def test_reproduces_dp_choices(self):
+        policy = random.Random(9)
+        decisions = 0
+        for g in range(2):
+            game = Game(dice_seed=f"9:{g}")
+            while True:
+                game.advance_to_decision()
+                if game.game_over:
+                    break
+                state = StateExtractor.extract_state(game)
+                actions = game.legal_actions()
+                searched = lookahead_action_values(state, actions, "look_dp")
+                dp = np.array([dp_action_value(state, a) for a in actions])
+                # the search's choice is one of dp's best (actions can tie)
+                self.assertEqual(dp[int(np.argmax(searched))], dp.max())
+                decisions += 1
+                game.apply_action(policy.choice(actions))
+        self.assertGreater(decisions, 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""The compiled AtomEncoder gives the features of the atom dictionary, and
+actions it dedupes by afterstate key really share their features."""
+
+import random
+import unittest
+
+import numpy as np
+
+from game.game import Game
+from game_state import AtomEncoder, StateExtractor
+
+
+def _decisions(n_games=3, seed=5):
+    """(state, legal actions) of every decision of a few random games."""
+    policy = random.Random(seed)
+    decisions = []
+    for g in range(n_games):
+        game = Game(dice_seed=f"{seed}:{g}")
+        while True:
+            game.advance_to_decision()
+            if game.game_over:
+                break
+            actions = game.legal_actions()
+            decisions.append((StateExtractor.extract_state(game), actions))
+            game.apply_action(policy.choice(actions))
+    return decisions
+
+
+class TestAtomEncoder(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.decisions = _decisions()
+        cls.keys = StateExtractor.feature_menu()
+
+    def test_matches_atom_features(self):
+        keys = random.Random(0).sample(self.keys, len(self.keys))
+        subset = keys[: len(keys) // 3]
+        for picked in (keys, subset):
+            encoder = AtomEncoder(picked, bias=True)
+            for state, actions in self.decisions:
+                expected = [
+                    [*StateExtractor.select_features(state, action, picked), 1.0]
+                    for action in actions
+                ]
+                np.testing.assert_array_equal(encoder.matrix(state, actions), expected)
+                # again, now every row comes from the cache
+                np.testing.assert_array_equal(encoder.matrix(state, actions), expected)
+
+    def test_shared_keys_share_features(self):
+        shared = 0
+        for state, actions in self.decisions:
+            keys = StateExtractor.afterstate_keys(state, actions)
+            by_key = {}
+            for action, key in zip(actions, keys):
+                atoms = StateExtractor.afterstate_atoms(state, action)
+                if key in by_key:
+                    self.assertEqual(atoms, by_key[key])
+                    shared += 1
+                by_key[key] = atoms
+        self.assertGreater(shared, 0)
+
+    def test_unknown_key(self):
+        state, actions = self.decisions[0]
+        with self.assertRaises(KeyError):
+            AtomEncoder(["no_such_atom"])(state, actions[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
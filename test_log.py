@@ -0,0 +1,54 @@
+"""log() builds a message only when it prints."""
+
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+import log
+
+
+class _Loud:
+    """A value whose formatting is counted."""
+
+    formatted = 0
+
+    def __str__(self):
+        _Loud.formatted += 1
+        return "loud"
+
+
+class TestLog(unittest.TestCase):
+    def setUp(self):
+        _Loud.formatted = 0
+
+    def say(self, *args, **kwargs) -> str:
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            log.log(*args, **kwargs)
+        return out.getvalue()
+
+    def test_silent_formats_nothing(self):
+        with mock.patch.object(log, "VERBOSE", False):
+            self.assertEqual(self.say("%s", _Loud()), "")
+            self.assertEqual(self.say(lambda: f"{_Loud()}"), "")
+            self.assertFalse(log.enabled(log.INFO))
+        self.assertEqual(_Loud.formatted, 0)
+
+    def test_below_level_formats_nothing(self):
+        with mock.patch.object(log, "VERBOSE", True):
+            with mock.patch.object(log, "LEVEL", log.INFO):
+                self.assertEqual(self.say("%s", _Loud(), level=log.DEBUG), "")
+                self.assertFalse(log.enabled(log.DEBUG))
+        self.assertEqual(_Loud.formatted, 0)
+
+    def test_verbose_prints(self):
+        with mock.patch.object(log, "VERBOSE", True):
+            self.assertEqual(self.say("%s gains %d¢", _Loud(), 50), "loud gains 50¢\n")
+            self.assertEqual(self.say(lambda: f"{_Loud()}!", end=""), "loud!")
+            self.assertEqual(self.say("100% plain"), "100% plain\n")
+        self.assertEqual(_Loud.formatted, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
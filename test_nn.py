@@ -0,0 +1,76 @@
+"""The minibatch trainer takes update()'s steps, and a checkpointed replay
+buffer comes back as it was."""
+
+import copy
+import pickle
+import unittest
+
+import numpy as np
+
+from algorithms.nn import DIM, N_PROB, MLP, ReplayBuffer
+
+
+def _samples(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, DIM))
+    Y_probs = rng.integers(0, 2, size=(n, N_PROB)).astype(float)
+    return X, Y_probs, rng.normal(size=n), rng.normal(size=n)
+
+
+class TestGradients(unittest.TestCase):
+    def test_batch_of_one_is_update(self):
+        model = MLP(seed=1)
+        # non-zero heads, so every parameter's step depends on the others
+        model.w2 = np.random.default_rng(2).normal(0.0, 0.1, model.w2.shape)
+        X, Y_probs, y_flow, y_total = _samples(1)
+        alpha = 0.01
+
+        stepped = copy.deepcopy(model)
+        err = stepped.update(X[0], Y_probs[0], y_flow[0], y_total[0], alpha)
+        steps, errors = model.gradients(X, Y_probs, y_flow, y_total)
+        self.assertAlmostEqual(errors[0], err, places=12)
+        for name, step in steps.items():
+            np.testing.assert_allclose(
+                getattr(model, name) + alpha * step,
+                getattr(stepped, name),
+                rtol=1e-12,
+                atol=1e-15,
+                err_msg=name,
+            )
+
+
+class TestReplayBuffer(unittest.TestCase):
+    def _round_trip(self, n):
+        buffer = ReplayBuffer(capacity=8)
+        buffer.add(*_samples(n))
+        state = pickle.loads(pickle.dumps(buffer.state()))
+        self.assertEqual(len(state["X"]), buffer.size)
+        restored = ReplayBuffer(capacity=8)
+        restored.restore(state)
+        self.assertEqual((restored.size, restored._next), (buffer.size, buffer._next))
+        for name in ("X", "Y_probs", "y_flow", "y_total"):
+            np.testing.assert_array_equal(
+                getattr(restored, name)[: buffer.size],
+                getattr(buffer, name)[: buffer.size],
+            )
+        # both overwrite the same (oldest) rows next
+        more = _samples(3, seed=1)
+        buffer.add(*more)
+        restored.add(*more)
+        np.testing.assert_array_equal(restored.X, buffer.X)
+
+    def test_partly_filled(self):
+        self._round_trip(5)
+
+    def test_wrapped(self):
+        self._round_trip(11)
+
+    def test_other_capacity(self):
+        buffer = ReplayBuffer(capacity=8)
+        buffer.add(*_samples(3))
+        with self.assertRaises(ValueError):
+            ReplayBuffer(capacity=4).restore(buffer.state())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Seeded matchups are reproducible: the same totals for any worker count, and
+in duplicate play the same dice for every seating of a deal."""
+
+import random
+import unittest
+
+import play
+from game.game import Game
+
+ALGORITHMS = ["dp", "simple", "random"]
+
+
+class _OpeningRolls(Game):
+    """A Game that notes the opening roll of every (seat, turn)."""
+
+    def __init__(self, dice_seed):
+        self.openings = {}
+        super().__init__(dice_seed=dice_seed)
+        self._note()
+
+    def start_new_turn(self):
+        super().start_new_turn()
+        self._note()
+
+    def _note(self):
+        key = (self.current_player_idx, self.turn_number)
+        self.openings[key] = list(self.dice_set.available)
+
+
+class TestSeededMatchups(unittest.TestCase):
+    def matchup(self, n_games, **kwargs):
+        outcomes = []
+
+        def record(g, seat_algorithms, winner, seat_money, seat_scores):
+            outcomes.append((g, seat_algorithms, winner, seat_money, seat_scores))
+
+        wins, money = play.run_matchup(n_games, ALGORITHMS, record=record, **kwargs)
+        return wins, money, outcomes
+
+    def test_workers_give_the_same_totals(self):
+        serial = self.matchup(24, seed=7)
+        self.assertEqual(sum(serial[0].values()), 24)
+        self.assertEqual(self.matchup(24, seed=7, workers=2), serial)
+        self.assertNotEqual(self.matchup(24, seed=8)[2], serial[2])
+
+    def test_duplicate_matchups_repeat(self):
+        """Duplicate play is deterministic too, and rounds up to whole deals."""
+        deal_size = len(play._seatings(ALGORITHMS, duplicate=True))
+        serial = self.matchup(deal_size + 1, seed=7, duplicate=True)
+        self.assertEqual(sum(serial[0].values()), 2 * deal_size)
+        self.assertEqual(self.matchup(deal_size + 1, seed=7, duplicate=True), serial)
+        parallel = self.matchup(deal_size + 1, seed=7, duplicate=True, workers=2)
+        self.assertEqual(parallel, serial)
+
+    def test_duplicate_resumes_at_a_deal(self):
+        deal_size = len(play._seatings(ALGORITHMS, duplicate=True))
+        whole = self.matchup(2 * deal_size, seed=7, duplicate=True)[2]
+        resumed = self.matchup(
+            2 * deal_size, seed=7, duplicate=True, first_game=deal_size
+        )[2]
+        self.assertEqual(resumed, whole[deal_size:])
+        with self.assertRaises(ValueError):
+            self.matchup(2 * deal_size, seed=7, duplicate=True, first_game=1)
+
+    def test_a_deal_deals_every_seat_the_same_dice(self):
+        """However differently two games of a deal are played, each seat opens
+        every turn with the same roll."""
+        games = []
+        for policy_seed in range(2):
+            policy = random.Random(policy_seed)
+            game = _OpeningRolls(dice_seed="7:0")
+            while True:
+                game.advance_to_decision()
+                if game.game_over:
+                    break
+                game.apply_action(policy.choice(game.legal_actions()))
+            games.append(game)
+        first, second = (game.openings for game in games)
+        shared = first.keys() & second.keys()
+        self.assertGreater(len(shared), 10)
+        for key in shared:
+            self.assertEqual(first[key], second[key], key)
+        self.assertNotEqual(
+            [p.total_score for p in games[0].players],
+            [p.total_score for p in games[1].players],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
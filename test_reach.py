@@ -0,0 +1,67 @@
+"""The reach table against a direct recursion over the turn: the chance of
+banking at least a target, playing for exactly that."""
+
+import unittest
+from functools import lru_cache
+
+from algorithms import dp, reach
+from game.rules import (
+    NUM_DICE,
+    STOP_MIN,
+    kept_dice,
+    merge_packed,
+    score_packed,
+    talheim_score_packed,
+)
+
+
+@lru_cache(maxsize=None)
+def _continue(config: int, prev: int, target: int) -> float:
+    """dp.continue_value, with the payoff ``total >= target``."""
+    if prev + score_packed(config) >= dp.T_MAX:
+        return 1.0  # banked at the boundary, at/above every target
+    kept = kept_dice(config)
+    p = 0.0
+    for roll, prob in dp._roll_distribution(NUM_DICE - kept % 7):
+        keeps = dp._legal_keeps(roll, kept)
+        if keeps:
+            p += prob * max(_keep(config, prev, keep, target) for keep in keeps)
+    return p
+
+
+def _keep(config: int, prev: int, keep: int, target: int) -> float:
+    """dp._keep_value, with the payoff ``total >= target``."""
+    new = merge_packed(config, keep)
+    dice = kept_dice(new)
+    total = prev + score_packed(new)
+    if talheim_score_packed(dice) > 0:
+        return float(total >= target)
+    if dice % 7 == NUM_DICE:
+        return _continue(0, total, target)
+    if total - prev >= STOP_MIN and total >= target:
+        return 1.0
+    return _continue(new, prev, target)
+
+
+class TestReach(unittest.TestCase):
+    def test_matches_recursion(self):
+        for target in (350, 1500):
+            for prev in (0, 500):
+                self.assertAlmostEqual(
+                    reach.continue_reach(0, prev, target),
+                    _continue(0, prev, target),
+                    places=5,
+                    msg=(prev, target),
+                )
+
+    def test_off_grid_target_is_the_next_grid_target(self):
+        self.assertEqual(reach.continue_reach(0, 0, 320), reach.continue_reach(0, 0, 350))
+
+    def test_falls_with_the_target(self):
+        probs = [reach.continue_reach(0, 0, t) for t in reach.TARGETS]
+        self.assertEqual(probs, sorted(probs, reverse=True))
+        self.assertTrue(0.0 < probs[-1] < probs[0] < 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Game records: what LangeStrasseEnv and play.run_matchup store replays to the
+same game, decision by decision."""
+
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+import play
+from env import LangeStrasseEnv
+from game.game import Game
+from game.record import GameRecorder, load_records, replay, state_from_row
+from game.rules import Action
+
+ALGORITHMS = ["dp", "simple", "random"]
+
+
+def _game_rows(games, decisions, i):
+    return decisions[games["first_decision"][i] :][: games["n_decisions"][i]]
+
+
+class TestRecordReplay(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.stem = Path(directory.name) / "games"
+
+    def assert_replays(self, games, decisions, i, game):
+        """Game ``i`` of the store replays on ``game`` to its recorded end."""
+        game = replay(game, _game_rows(games, decisions, i))
+        self.assertTrue(game.game_over)
+        row = games[i]
+        self.assertEqual([p.total_score for p in game.players], row["scores"].tolist())
+        self.assertEqual([p.money for p in game.players], row["money"].tolist())
+        self.assertEqual(game.players.index(game.winner), row["winner"])
+        self.assertEqual(game.turn_number, row["turn"])
+
+    def test_env_round_trip(self):
+        """Seeded env games, keeps given in any dice order, replay exactly; a
+        rejected action leaves no row behind."""
+        rng = random.Random(0)
+        seeds = [11, 12, 13]
+        with GameRecorder(self.stem) as recorder:
+            env = LangeStrasseEnv(recorder=recorder)
+            n_steps = []
+            for seed in seeds:
+                state, done, steps = env.reset(seed=seed), False, 0
+                while not done:
+                    with self.assertRaises(ValueError):
+                        env.step(Action([2] * 7, False))
+                    action = rng.choice(env.legal_actions())
+                    keep = list(reversed(action.dice_to_keep))
+                    decision = state
+                    state, _, done, _ = env.step(Action(keep, action.stop_after))
+                    steps += 1
+                n_steps.append(steps)
+
+        games, decisions = load_records(self.stem)
+        self.assertEqual(games["seed"].tolist(), seeds)
+        self.assertEqual(games["n_decisions"].tolist(), n_steps)
+        self.assertEqual(len(decisions), sum(n_steps))
+        last = state_from_row(decisions[-1])
+        self.assertEqual(last.available_dice, sorted(decision.available_dice))
+        self.assertEqual(last.players, decision.players)
+        for i, seed in enumerate(seeds):
+            self.assert_replays(games, decisions, i, Game(dice_seed=seed))
+
+    def test_matchup_round_trip(self):
+        """A duplicate matchup's games carry its seed and their numbers, and
+        replay on their deal's dice."""
+        seed = 5
+        with GameRecorder(self.stem) as recorder:
+            wins, money = play.run_matchup(
+                6, ALGORITHMS, seed=seed, duplicate=True, recorder=recorder
+            )
+        games, decisions = load_records(self.stem)
+        deal_size = len(play._seatings(ALGORITHMS, duplicate=True))
+        self.assertEqual(len(games), 6)
+        self.assertEqual(games["seed"].tolist(), [seed] * 6)
+        self.assertEqual(games["number"].tolist(), list(range(6)))
+        self.assertEqual(int(games["money"].sum()), sum(money.values()))
+        for i, g in enumerate(games["number"].tolist()):
+            deal = g // deal_size
+            self.assert_replays(games, decisions, i, Game(dice_seed=f"{seed}:{deal}"))
+
+    def test_diverging_replay_is_caught(self):
+        with GameRecorder(self.stem) as recorder:
+            env = LangeStrasseEnv(recorder=recorder)
+            env.reset(seed=3)
+            done = False
+            while not done:
+                _, _, done, _ = env.step(env.legal_actions()[0])
+        games, decisions = load_records(self.stem)
+        with self.assertRaisesRegex(ValueError, "diverged"):
+            replay(Game(dice_seed=4), _game_rows(games, decisions, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""The rollout player: playouts on common dice, and dp's choice as the baseline."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from algorithms import rollout
+from game.game import Game
+from game.rules import Action
+from game_state import StateExtractor
+
+
+def _decision(seed=1, min_actions=4):
+    """The first decision of a seeded game (playing each first action) with at
+    least ``min_actions`` legal actions."""
+    game = Game(dice_seed=seed)
+    while True:
+        game.advance_to_decision()
+        actions = game.legal_actions()
+        if len(actions) >= min_actions:
+            return StateExtractor.extract_state(game), actions
+        game.apply_action(actions[0])
+
+
+class TestRollouts(unittest.TestCase):
+    def test_common_dice(self):
+        """The same action twice is the same playouts, and a seed repeats them."""
+        state, actions = _decision()
+        twice = [actions[0], Action(list(reversed(actions[0].dice_to_keep)), False)]
+        money = rollout.rollout_money(state, twice + actions[1:], 30, seed=4)
+        np.testing.assert_array_equal(money[0], money[1])
+        again = rollout.rollout_money(state, twice + actions[1:], 30, seed=4)
+        np.testing.assert_array_equal(money, again)
+        self.assertFalse((money[2] == money[0]).all())
+
+    def test_dice_are_fair(self):
+        vec = rollout._CommonDice(np.arange(30000), seed=0)
+        faces = vec._draw(np.arange(30000))
+        share = np.bincount(faces.ravel(), minlength=7)[1:] / faces.size
+        np.testing.assert_allclose(share, 1 / 6, atol=0.005)
+
+    def test_dp_choice_is_the_baseline(self):
+        state, actions = _decision()
+        base = rollout._dp_index(state, actions)
+        with mock.patch("random.getrandbits", return_value=7):
+            values = rollout.rollout_action_values(state, actions, "rollout")
+            money = rollout.rollout_money(state, actions, seed=7)
+        self.assertEqual(values[base], money[base].mean())
+        with mock.patch.object(rollout, "MARGIN", 1e9):
+            values = rollout.rollout_action_values(state, actions, "rollout")
+        self.assertEqual(int(np.argmax(values)), base)
+
+
+if __name__ == "__main__":
+    unittest.main()
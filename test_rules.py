@@ -0,0 +1,285 @@
+"""The packed-code rules against the original list-based rules.
+
+game.rules answers every rule question with bit arithmetic on packed codes,
+and its list functions are thin wrappers of that. The reference below is the
+list implementation the packed one replaced (less its error messages). The
+test walks every kept configuration reachable in a turn and checks the two
+agree on every roll there."""
+
+import itertools
+import unittest
+from collections import Counter
+from itertools import combinations_with_replacement
+
+from game import rules
+from game.rules import (
+    NUM_DICE,
+    can_keep_any_packed,
+    canonical_groups,
+    is_lange_strasse_packed,
+    kept_dice,
+    merge_packed,
+    pack,
+    pack_groups,
+    score_packed,
+    talheim_score_packed,
+    unpack_groups,
+)
+
+
+# --------------------------------------------------------------------------- #
+# Reference: the list-based rules
+# --------------------------------------------------------------------------- #
+def _flatten(groups):
+    return [value for group in groups for value in group]
+
+
+def _is_lange_strasse(values):
+    return rules.LANGE_STRASSE.issubset(values)
+
+
+def _talheim_score(values):
+    if len(values) != NUM_DICE:
+        return 0
+    counts = Counter(values)
+    if len(counts) != 3 or any(count != 2 for count in counts.values()):
+        return 0
+    low, mid, high = sorted(counts)
+    return 1000 if (mid == low + 1 and high == mid + 1) else 500
+
+
+def _merge_kept(kept_groups, new_values):
+    groups = [list(group) for group in kept_groups]
+    for value, count in Counter(new_values).items():
+        for group in groups:
+            if len(group) >= 3 and len(set(group)) == 1 and group[0] == value:
+                group.extend([value] * count)
+                break
+        else:
+            if count >= 3:
+                groups.append([value] * count)
+            else:
+                groups.extend([value] for _ in range(count))
+    return groups
+
+
+def _score_groups(kept_groups):
+    values = _flatten(kept_groups)
+    talheim = _talheim_score(values)
+    if talheim:
+        return talheim
+    if _is_lange_strasse(values):
+        return rules.LANGE_STRASSE_SCORE
+    total = 0
+    for group in kept_groups:
+        for value, count in Counter(group).items():
+            if count >= 3:
+                base = rules.TRIPLET_BASE.get(value, value * 100)
+                total += base * 2 ** (count - 3)
+            else:
+                total += count * rules.INDIVIDUAL_SCORE.get(value, 0)
+    return total
+
+
+def _is_valid_keep(dice_values, already_kept):
+    if not dice_values:
+        return True
+    combined = list(already_kept) + list(dice_values)
+    if _is_lange_strasse(combined) or _talheim_score(combined):
+        return True
+    kept_counts = Counter(already_kept)
+    for value, count in Counter(dice_values).items():
+        if value in rules.INDIVIDUAL_SCORE:
+            continue
+        if count >= 3 or kept_counts.get(value, 0) >= 3:
+            continue
+        return False
+    return True
+
+
+def _can_keep_any(available, kept):
+    if not available:
+        return True
+    if any(value in rules.INDIVIDUAL_SCORE for value in available):
+        return True
+    if _is_lange_strasse(list(kept) + list(available)):
+        return True
+    kept_counts = Counter(kept)
+    if any(
+        count >= 3 or kept_counts.get(value, 0) >= 3
+        for value, count in Counter(available).items()
+    ):
+        return True
+    need = NUM_DICE - len(kept)
+    return 0 < need <= len(available) and any(
+        _talheim_score(list(kept) + list(combo))
+        for combo in itertools.combinations(available, need)
+    )
+
+
+def _valid_keeps(available, kept_values):
+    keeps, seen = [], set()
+    for r in range(1, len(available) + 1):
+        for combo in itertools.combinations(available, r):
+            key = tuple(sorted(combo))
+            if key not in seen:
+                seen.add(key)
+                if _is_valid_keep(list(combo), kept_values):
+                    keeps.append(list(combo))
+    return keeps
+
+
+def _may_stop(kept_groups, new_values):
+    merged = _merge_kept(kept_groups, new_values)
+    return len(_flatten(merged)) < NUM_DICE and _score_groups(merged) >= rules.STOP_MIN
+
+
+def _legal_actions(available, kept_groups):
+    actions = []
+    for keep in _valid_keeps(available, _flatten(kept_groups)):
+        actions.append((keep, False))
+        if _may_stop(kept_groups, keep):
+            actions.append((keep, True))
+    return actions
+
+
+# --------------------------------------------------------------------------- #
+# Tests
+# --------------------------------------------------------------------------- #
+def _reachable_configs():
+    """Every kept configuration a turn can reach, as reference kept groups (one
+    per canonical configuration), found by playing every keep of every roll."""
+    found = {(): []}
+    frontier = [[]]
+    while frontier:
+        groups = frontier.pop()
+        kept = _flatten(groups)
+        if len(kept) == NUM_DICE:
+            continue
+        for roll in combinations_with_replacement(range(1, 7), NUM_DICE - len(kept)):
+            for keep in _valid_keeps(list(roll), kept):
+                merged = _merge_kept(groups, keep)
+                key = canonical_groups(merged)
+                if key not in found:
+                    found[key] = merged
+                    frontier.append(merged)
+    return list(found.values())
+
+
+class TestPackedRulesMatchListRules(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.configs = _reachable_configs()
+
+    def test_configurations(self):
+        """Packing, scoring and the specials of every reachable configuration."""
+        self.assertGreater(len(self.configs), 100)
+        for groups in self.configs:
+            with self.subTest(groups=groups):
+                config = pack_groups(groups)
+                values = _flatten(groups)
+                self.assertEqual(
+                    canonical_groups(unpack_groups(config)), canonical_groups(groups)
+                )
+                self.assertEqual(pack(values), kept_dice(config))
+                self.assertEqual(score_packed(config), _score_groups(groups))
+                self.assertEqual(rules.score_groups(groups), _score_groups(groups))
+                self.assertEqual(rules.talheim_score(values), _talheim_score(values))
+                if len(values) == NUM_DICE:
+                    self.assertEqual(
+                        talheim_score_packed(pack(values)), _talheim_score(values)
+                    )
+                self.assertEqual(
+                    is_lange_strasse_packed(pack(values)), _is_lange_strasse(values)
+                )
+
+    def test_every_roll(self):
+        """Busts, legal actions and the merged result of every keep, for every
+        roll at every reachable configuration."""
+        for groups in self.configs:
+            config, kept = pack_groups(groups), _flatten(groups)
+            if len(kept) == NUM_DICE:
+                continue
+            n = NUM_DICE - len(kept)
+            for roll in combinations_with_replacement(range(1, 7), n):
+                roll = list(roll)
+                with self.subTest(groups=groups, roll=roll):
+                    expected = _can_keep_any(roll, kept)
+                    self.assertEqual(rules.can_keep_any(roll, kept), expected)
+                    packed = can_keep_any_packed(pack(roll), pack(kept))
+                    self.assertEqual(packed, expected)
+
+                    actions = _legal_actions(roll, groups)
+                    legal = rules.legal_actions(roll, groups)
+                    self.assertEqual(
+                        [(a.dice_to_keep, a.stop_after) for a in legal], actions
+                    )
+                    self.assertEqual(bool(actions), expected)
+
+                    for keep, stop in actions:
+                        if stop:
+                            continue
+                        merged = _merge_kept(groups, keep)
+                        self.assertEqual(
+                            merge_packed(config, pack(keep)), pack_groups(merged)
+                        )
+                        self.assertEqual(
+                            canonical_groups(rules.merge_kept(groups, keep)),
+                            canonical_groups(merged),
+                        )
+                        self.assertTrue(rules.is_valid_keep(keep, kept)[0])
+
+    def test_invalid_keeps(self):
+        """is_valid_keep rejects exactly what the reference rejects."""
+        for groups in self.configs:
+            kept = _flatten(groups)
+            if len(kept) == NUM_DICE:
+                continue
+            for n in range(1, NUM_DICE - len(kept) + 1):
+                for keep in combinations_with_replacement(range(1, 7), n):
+                    keep = list(keep)
+                    self.assertEqual(
+                        rules.is_valid_keep(keep, kept)[0],
+                        _is_valid_keep(keep, kept),
+                        (groups, keep),
+                    )
+
+
+class TestLegalActionOrder(unittest.TestCase):
+    """Game records store actions by index, so the order is part of the format."""
+
+    ROLL = [5, 3, 1, 3, 3, 2]
+    EXPECTED = [
+        ([1], False),
+        ([5], False),
+        ([1, 5], False),
+        ([3, 3, 3], False),
+        ([3, 3, 3], True),
+        ([1, 3, 3, 3], False),
+        ([1, 3, 3, 3], True),
+        ([3, 3, 3, 5], False),
+        ([3, 3, 3, 5], True),
+        ([1, 3, 3, 3, 5], False),
+        ([1, 3, 3, 3, 5], True),
+    ]
+
+    def actions(self, roll, kept_groups=()):
+        legal = rules.legal_actions(list(roll), list(kept_groups))
+        return [(a.dice_to_keep, a.stop_after) for a in legal]
+
+    def test_canonical_order(self):
+        """Fewest dice first, then by sorted values; each keep sorted, its stop
+        variant right after it."""
+        self.assertEqual(self.actions(self.ROLL), self.EXPECTED)
+
+    def test_independent_of_dice_order(self):
+        for roll in set(itertools.permutations(self.ROLL)):
+            self.assertEqual(self.actions(roll), self.EXPECTED, roll)
+        kept = [[4, 4, 4], [1]]
+        self.assertEqual(
+            self.actions([5, 2, 1], kept), self.actions([1, 5, 2], kept[::-1])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""SequentialTest on synthetic matchups: it stops once the ranking is settled --
+a clear winner, a tie inside the margin, a gap the budget can't resolve -- and
+plays on while it is open."""
+
+import unittest
+
+import numpy as np
+
+from stats import MoneyTracker, SequentialTest, mean_interval
+
+
+def _feed(test: SequentialTest, cents) -> int:
+    """Play the games (``a``'s money each; ``b`` pays it) until ``test`` stops
+    the matchup; the games played."""
+    for n, c in enumerate(cents, 1):
+        if test({"a": c, "b": -c}):
+            return n
+    return len(cents)
+
+
+def _alternating(d: float, n: int) -> list[float]:
+    """Zero-mean games of exactly ``±d``."""
+    return [d, -d] * (n // 2)
+
+
+class TestMeanInterval(unittest.TestCase):
+    def test_interval(self):
+        mean, half = mean_interval([1.0, 3.0], level=0.95)
+        self.assertEqual(mean, 2.0)
+        # the sd and sqrt(n) are both sqrt(2)
+        self.assertAlmostEqual(half, 1.959964, places=5)
+        self.assertEqual(mean_interval([5.0]), (5.0, float("inf")))
+
+
+class TestSequentialTest(unittest.TestCase):
+    def test_clear_winner_stops_at_the_first_look(self):
+        test = SequentialTest(MoneyTracker("ab"), 10_000, every=100)
+        cents = np.random.default_rng(0).normal(100, 100, 10_000)
+        self.assertEqual(_feed(test, cents), 100)
+        self.assertEqual(test.verdicts(), [("a", "b", "ahead")])
+
+    def test_tie_inside_the_margin_stops(self):
+        test = SequentialTest(MoneyTracker("ab"), 10_000, margin=20, every=100)
+        self.assertEqual(_feed(test, _alternating(5, 10_000)), 100)
+        self.assertEqual(test.verdicts()[0][2], "tied")
+
+    def test_open_plays_on(self):
+        test = SequentialTest(MoneyTracker("ab"), 10_000, every=100)
+        # (until ~830 games, when the budget could no longer separate them)
+        self.assertEqual(_feed(test, _alternating(100, 800)), 800)
+        self.assertEqual(test.verdicts()[0][2], "open")
+
+    def test_hopeless_within_the_budget_stops(self):
+        """With 150 games the interval can only shrink by sqrt(1.5) more: an
+        estimate of 0 ± a standard error can't be separated."""
+        test = SequentialTest(MoneyTracker("ab"), 150, every=100)
+        self.assertEqual(_feed(test, _alternating(100, 150)), 100)
+        self.assertEqual(test.verdicts()[0][2], "hopeless")
+
+    def test_never_stops_at_the_budget(self):
+        """The budget ends the matchup anyway; the test doesn't claim it."""
+        test = SequentialTest(MoneyTracker("ab"), 100, every=100)
+        cents = np.random.default_rng(0).normal(100, 100, 100)
+        self.assertFalse(any(test({"a": c, "b": -c}) for c in cents))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""TD models: weights load as saved, a decision scored in one batch is each action
+scored alone, parallel self-play learns every game (and stops if an actor
+dies), lambda 0 is TD(0), traces stay with their seat, and an interrupted
+td.train run, resumed from its checkpoint, ends with the weights of the run
+that was never interrupted."""
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from algorithms import td
+from env import LangeStrasseEnv
+
+VARIANT = "td_min"
+
+
+class TestLinearTD(unittest.TestCase):
+    def test_batch_scores_are_single_values(self):
+        v = td.VARIANTS["td_dp"]
+        model = td.LinearTD(v.dim, np.random.default_rng(0).normal(size=v.dim).tolist())
+        env = LangeStrasseEnv()
+        policy = random.Random(0)
+        with mock.patch.dict(td._MODELS, {"td_dp": model}):
+            for _ in range(30):
+                state, actions = env.observe(), env.legal_actions()
+                scores = td.td_action_scores(state, actions, "td_dp")
+                single = [model.value(v.features(state, a)) for a in actions]
+                np.testing.assert_allclose(scores, single, rtol=1e-12)
+                env.step(policy.choice(actions))
+
+    def test_save_and_load(self):
+        model = td.LinearTD(3, [0.5, -1.0, 2.0], games_trained=7)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "weights.pkl"
+            model.save(path)
+            loaded = td.LinearTD.load(3, path)
+            self.assertEqual(loaded.w.tolist(), [0.5, -1.0, 2.0])
+            self.assertEqual(loaded.games_trained, 7)
+            # a file for another layout is ignored
+            self.assertEqual(td.LinearTD.load(4, path).w.tolist(), [0.0] * 4)
+
+
+def _dying_actor(*args, **kwargs):
+    os._exit(3)
+
+
+class TestParallel(unittest.TestCase):
+    def self_play(self, n_games, done):
+        v = td.VARIANTS[VARIANT]
+        td._self_play(
+            td.LinearTD(v.dim),
+            v,
+            0.01,
+            0.1,
+            n_games,
+            seed=1,
+            workers=2,
+            checkpoint=done.append,
+            checkpoint_every=1,
+        )
+
+    def test_learns_every_game(self):
+        done = []
+        self.self_play(5, done)
+        self.assertEqual(done, [1, 2, 3, 4, 5])
+
+    def test_dead_actor_stops_the_learner(self):
+        with mock.patch.object(td, "_actor", _dying_actor):
+            with mock.patch.object(td, "_ACTOR_CHECK_EVERY", 0.1):
+                with self.assertRaises(RuntimeError):
+                    self.self_play(5, [])
+
+
+class TestLambda(unittest.TestCase):
+    def test_lambda_zero_is_td0(self):
+        v = td.VARIANTS[VARIANT]
+        model = td.LinearTD(v.dim)
+        transitions = list(td._transitions(model, v, 0.2, random.Random(2)))
+        self.assertGreater(len(transitions), 10)
+        td0, traced = td.LinearTD(v.dim), td.LinearTD(v.dim)
+        td._learn(td0, transitions, 0.01, 0.0)
+        traces = {}
+        for player, features, target in transitions:
+            trace = traces.setdefault(player, np.zeros(v.dim))
+            traced.update_traced(trace, features, target, 0.01, 0.0)
+        self.assertEqual(traced.w.tobytes(), td0.w.tobytes())
+
+    def test_traces_stay_with_their_seat(self):
+        x0, x1, x2 = np.eye(3)
+        model = td.LinearTD(3)
+        # seat 0, seat 1, then seat 0 again; every target 1, so every error 1
+        td._learn(model, [(0, x0, 1.0), (1, x1, 1.0), (0, x2, 1.0)], 0.5, 0.5)
+        # the third step moves along seat 0's trace 0.5 * x0 + x2, not x1
+        np.testing.assert_array_equal(model.w, [0.5 + 0.25, 0.5, 0.5])
+
+
+class TestResume(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        v = td.VARIANTS[VARIANT]
+        for name in ("path", "checkpoint_path"):
+            patch = mock.patch.object(v, name, Path(tmp.name) / getattr(v, name).name)
+            patch.start()
+            self.addCleanup(patch.stop)
+        patch = mock.patch.dict(td._MODELS)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.variant = v
+
+    def train(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return td.train(VARIANT, 0.01, 0.1, 6, seed=3, checkpoint_every=2, **kwargs)
+
+    def test_resumed_run_is_the_uninterrupted_run(self):
+        whole = self.train().w.copy()
+        self.variant.path.unlink()
+
+        transitions = td._transitions
+        played = []
+
+        def interrupted(*args, **kwargs):
+            if len(played) == 4:  # the fifth game, after the checkpoint at 4
+                raise KeyboardInterrupt
+            played.append(1)
+            return transitions(*args, **kwargs)
+
+        with mock.patch.object(td, "_transitions", interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                self.train()
+        self.assertTrue(self.variant.checkpoint_path.exists())
+        self.assertFalse(self.variant.path.exists())
+
+        resumed = self.train(resume=True)
+        self.assertEqual(resumed.w.tobytes(), whole.tobytes())
+        self.assertEqual(resumed.games_trained, 6)
+        self.assertFalse(self.variant.checkpoint_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
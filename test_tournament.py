@@ -0,0 +1,97 @@
+"""The tournament store: games are stored once, a rerun plays only the missing
+ones (and the same ones a single run would), and the ratings fit the results."""
+
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+import tournament
+
+ALGORITHMS = ["dp", "simple", "random"]
+
+
+def _games(store: Path) -> list[tuple]:
+    with contextlib.closing(tournament.open_store(store)) as db:
+        return db.execute("SELECT * FROM games ORDER BY matchup, game").fetchall()
+
+
+def _run(store: Path, n_games: int) -> None:
+    with contextlib.redirect_stdout(io.StringIO()):
+        tournament.run_tournament(ALGORITHMS, n_games, seed=11, store=store)
+
+
+class TestSchedule(unittest.TestCase):
+    def test_round_robin(self):
+        self.assertEqual(len(tournament.schedule(["a", "b", "c", "d"])), 4)
+
+    def test_against_baselines(self):
+        self.assertEqual(
+            tournament.schedule(["a", "b", "c"], ["b", "c"]), [("a", "b", "c")]
+        )
+
+    def test_too_few_algorithms(self):
+        with self.assertRaises(ValueError):
+            tournament.schedule(["a", "b"])
+        with self.assertRaises(ValueError):
+            tournament.schedule(["b", "c"], ["b", "c"])
+
+
+class TestStore(unittest.TestCase):
+    def test_resume_plays_only_the_missing_games(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            resumed, single = Path(tmp) / "resumed.db", Path(tmp) / "single.db"
+            _run(resumed, 2)
+            first = _games(resumed)
+            _run(resumed, 4)
+            _run(single, 4)
+            games = _games(resumed)
+            self.assertEqual([g[2] for g in games], [0, 1, 2, 3])
+            self.assertEqual(games[:2], first)
+            self.assertEqual(games, _games(single))
+
+    def test_ratings(self):
+        db = tournament.open_store(":memory:")
+        rows = [
+            # seat0..2, winner, money, scores; "c@0" is not rated
+            ("a@1", "b@1", "a@2", 0, 30, -10, -20, 10000, 4000, 3000),
+            ("b@1", "a@2", "a@1", 1, -40, 50, -10, 2000, 10000, 6000),
+            ("a@1", "c@0", "b@1", 1, -5, 10, -5, 5000, 10000, 1000),
+        ]
+        for g, row in enumerate(rows):
+            db.execute(
+                "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ("m", 0, g, *row),
+            )
+        self.assertEqual(tournament._played(db, "m", 0), 3)
+        table = tournament.ratings(db, ["a@1", "a@2", "b@1"])
+        self.assertEqual([table[t]["games"] for t in table], [2, 2, 2])
+        self.assertEqual(table["a@1"]["cents"][0], 10.0)
+        self.assertEqual(table["b@1"]["cents"][0], -25.0)
+        # a@1 finished above b@1 twice and split with a@2, who split with b@1
+        elo = [table[t]["elo"] for t in ("a@1", "a@2", "b@1")]
+        self.assertEqual(elo, sorted(elo, reverse=True))
+
+
+class TestBradleyTerry(unittest.TestCase):
+    def test_recovers_strengths(self):
+        elo = np.array([0.0, 100.0, 250.0])
+        strength = 10 ** (elo / 400)
+        wins = 1e6 * strength[:, None] / (strength[:, None] + strength[None, :])
+        np.fill_diagonal(wins, 0)
+        fitted = tournament._bradley_terry(wins)
+        self.assertAlmostEqual(fitted.mean(), tournament.ELO_BASE)
+        np.testing.assert_allclose(fitted - fitted[0], elo, atol=0.1)
+
+    def test_unbeaten_player_is_finite(self):
+        wins = np.array([[0.0, 5.0], [0.0, 0.0]])
+        fitted = tournament._bradley_terry(wins)
+        self.assertTrue(np.isfinite(fitted).all())
+        self.assertGreater(fitted[0], fitted[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""VecGame against Game in lockstep: fed the same dice and the same actions,
+the two engines must agree at every decision."""
+
+import random
+import unittest
+from collections import deque
+
+import numpy as np
+
+from game.game import Game
+from game.rules import Action, pack, unpack
+from game.vec_game import VecGame
+
+
+class _QueuedDice:
+    """A Game rng that hands out the dice a VecGame rolled, in order."""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def randint(self, low, high):
+        return self.queue.popleft()
+
+
+class _RecordingVecGame(VecGame):
+    """A VecGame that queues every game's rolled dice for its Game twin."""
+
+    def __init__(self, n_games, seed=None):
+        self.queues = [deque() for _ in range(n_games)]
+        super().__init__(n_games, seed)
+
+    def _roll(self, mask):
+        busted = super()._roll(mask)
+        for g in np.flatnonzero(mask):
+            self.queues[g].extend(unpack(int(self.available[g])))
+        return busted
+
+
+class TestVecGameMatchesGame(unittest.TestCase):
+    N_GAMES = 300
+
+    def setUp(self):
+        self.vec = _RecordingVecGame(self.N_GAMES, seed=0)
+        self.games = []
+        for queue in self.vec.queues:
+            game = Game()
+            game.rng = game.dice_set.rng = _QueuedDice(queue)
+            game.dice_set.reset_for_new_turn()  # the VecGame's opening roll
+            game.advance_to_decision()
+            self.games.append(game)
+
+    def assert_same(self, g):
+        vec, game = self.vec, self.games[g]
+        self.assertEqual(vec.scores[g].tolist(), [p.total_score for p in game.players])
+        self.assertEqual(vec.money[g].tolist(), [p.money for p in game.players])
+        self.assertEqual(bool(vec.done[g]), game.game_over)
+        self.assertEqual(int(vec.turn[g]), game.turn_number)
+        self.assertEqual(int(vec.current[g]), game.current_player_idx)
+        self.assertFalse(self.vec.queues[g], "Game left VecGame dice unrolled")
+        if game.game_over:
+            self.assertEqual(vec.winners()[g], game.players.index(game.winner))
+        else:
+            dice_set = game.dice_set
+            self.assertEqual(int(vec.accumulated[g]), dice_set.turn_accumulated_score)
+            self.assertEqual(unpack(int(vec.available[g])), sorted(dice_set.available))
+
+    def test_lockstep(self):
+        rng = random.Random(0)
+        vec = self.vec
+        for g in range(self.N_GAMES):
+            self.assert_same(g)
+        while not vec.done.all():
+            keep = np.zeros(self.N_GAMES, dtype=np.int64)
+            stop = np.zeros(self.N_GAMES, dtype=bool)
+            chosen = {}
+            for g in np.flatnonzero(~vec.done):
+                game = self.games[g]
+                actions = vec.legal_actions(g)
+                legal = game.legal_actions()
+                expected = [(pack(a.dice_to_keep), a.stop_after) for a in legal]
+                self.assertEqual(actions, expected)
+                keep[g], stop[g] = chosen[g] = rng.choice(actions)
+            vec.step(keep, stop)
+            for g, (dice, stop_after) in chosen.items():
+                game = self.games[g]
+                success, message = game.apply_action(Action(unpack(dice), stop_after))
+                self.assertTrue(success, message)
+                game.advance_to_decision()
+                self.assert_same(g)
+
+
+if __name__ == "__main__":
+    unittest.main()